@@ -0,0 +1,1934 @@
+import argparse
+import asyncio
+import csv
+import http.client
+import ipaddress
+import json
+import os
+import pstats
+import random
+import re
+import shlex
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from types import SimpleNamespace
+
+import matplotlib.colors as mcolors
+import numpy as np
+import paramiko
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from collector41 import (CLOCK_PARSERS, DEFAULT_SCORE_MODEL, EXEC_STATS_COMMAND, HISTORY_FIELDS, METRIC_FAMILIES,
+                         ROLLUP_COLUMNS, ROLLUP_DURATION, ROLLUP_WEIGHT, SAMPLE_COLUMNS, FleetCollector, HistoryStore,
+                         HostMonitor, MetricAccumulator, MetricsExporter, ReplayPlayer, SSHManager, SampleRecorder,
+                         SampleStore, SessionScorer, StageProfiler, StatsCollector, append_history_csv,
+                         build_stream_command, cpu_usage_vector, fetch_all_stats, jiffies_matrix, load_config,
+                         load_recording, parse_stats_frame, percentile, sweep_ssh_hosts)
+from dashboard41 import (GROUPINGS, SUMMARY_NUMERIC, App, ChartRenderer, ComparisonChart, LiveChart, VirtualTable,
+                         comparison_data, comparison_fields)
+
+def report(name, values, unit="ms"):
+    if not values:
+        print(f"{name:<40} aucune mesure")
+        return
+    print(f"{name:<40} moy {statistics.mean(values):8.2f} {unit}  p50 {percentile(values, 50):8.2f}  "
+          f"p95 {percentile(values, 95):8.2f}  max {max(values):8.2f}  (n={len(values)})")
+
+def remote_busy_jiffies(manager):
+    values = list(map(int, manager.execute_command("grep '^cpu ' /proc/stat").split()[1:]))
+    idle = values[3] + values[4] if len(values) >= 5 else values[3]
+    return sum(values) - idle, sum(values)
+
+def remote_cpu_percent(manager, run, duration):
+    busy_start, total_start = remote_busy_jiffies(manager)
+    run(duration)
+    busy_end, total_end = remote_busy_jiffies(manager)
+    total = total_end - total_start
+    return (busy_end - busy_start) / total * 100 if total > 0 else 0.0
+
+def bench_stream(args):
+    manager = SSHManager(args.host, 22, "root", args.password)
+    if not manager.client:
+        print("❌ Connexion SSH échouée.")
+        return
+    exec_latencies = []
+    stream_build = []
+    stream_gaps = []
+
+    def idle(duration):
+        time.sleep(duration)
+
+    def exec_mode(duration):
+        deadline = time.time() + duration
+        while time.time() < deadline:
+            started = time.perf_counter()
+            fetch_all_stats(manager)
+            manager.execute_command("echo test")
+            exec_latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(max(0.0, args.interval - (time.perf_counter() - started)))
+
+    def stream_mode(duration):
+        manager.start_stream(args.interval)
+        deadline = time.time() + duration
+        last = None
+        while time.time() < deadline:
+            stats = manager.read_stream_sample()
+            if stats is not None:
+                now = time.perf_counter()
+                if last is not None:
+                    stream_gaps.append((now - last) * 1000)
+                last = now
+                stream_build.append(manager.stream_last_build_us / 1000)
+            time.sleep(0.005)
+        manager.stop_stream()
+
+    print(f"Hôte {args.host}, intervalle {args.interval}s, {args.duration}s par mode")
+    baseline = remote_cpu_percent(manager, idle, args.duration)
+    exec_cpu = remote_cpu_percent(manager, exec_mode, args.duration)
+    stream_cpu = remote_cpu_percent(manager, stream_mode, args.duration)
+    print(f"{'CPU distant (repos)':<40} {baseline:6.2f} %")
+    print(f"{'CPU distant (exec_command)':<40} {exec_cpu:6.2f} %  (+{exec_cpu - baseline:.2f})")
+    print(f"{'CPU distant (streaming)':<40} {stream_cpu:6.2f} %  (+{stream_cpu - baseline:.2f})")
+    report("Latence exec_command (aller-retour)", exec_latencies)
+    report("Construction trame agent", stream_build)
+    report("Écart entre trames reçues", stream_gaps)
+    manager.close()
+
+def process_cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+def local_hires_run(rate, duration):
+    process = subprocess.Popen(shlex.split(build_stream_command(1.0, rate)), stdout=subprocess.PIPE, text=True)
+    rows, payload, frame = 0, 0, None
+    deadline = time.time() + duration
+    for line in process.stdout:
+        line = line.rstrip()
+        if line.startswith("@@BEGIN"):
+            frame = []
+        elif line.startswith("@@END") and frame is not None:
+            batch = parse_stats_frame(frame).get("hires")
+            if batch is not None:
+                rows += len(batch)
+                payload += sum(len(l) for l in frame if l.startswith("hires "))
+            frame = None
+            if time.time() >= deadline:
+                break
+        elif frame is not None:
+            frame.append(line)
+    cpu = process_cpu_seconds(process.pid)
+    process.kill()
+    process.wait()
+    return rows, payload, cpu
+
+def remote_hires_run(manager, rate, duration):
+    result = {"rows": 0, "payload": 0}
+
+    def run(length):
+        manager.start_stream(1.0, rate)
+        deadline = time.time() + length
+        while time.time() < deadline:
+            stats = manager.read_stream_sample()
+            if stats is not None and stats.get("hires") is not None:
+                result["rows"] += len(stats["hires"])
+                result["payload"] += stats["hires"].nbytes
+            time.sleep(0.02)
+        manager.stop_stream()
+
+    cpu = remote_cpu_percent(manager, run, duration)
+    return result["rows"], result["payload"], cpu
+
+def bench_hires(args):
+    manager = None
+    if args.host:
+        manager = SSHManager(args.host, 22, "root", args.password)
+        if not manager.client:
+            print("❌ Connexion SSH échouée.")
+            return
+        print(f"Hôte {args.host}, {args.duration}s par fréquence (CPU = charge système distante)")
+    else:
+        print(f"Agent local, {args.duration}s par fréquence (CPU = processus agent)")
+    for rate in args.rates:
+        if manager:
+            rows, payload, cpu = remote_hires_run(manager, rate, args.duration)
+        else:
+            rows, payload, cpu_seconds = local_hires_run(rate, args.duration)
+            cpu = cpu_seconds / args.duration * 100
+        sustained = rows / args.duration
+        print(f"{f'{rate:g} Hz demandés':<40} {sustained:7.1f} éch/s soutenus  CPU {cpu:6.2f} %"
+              f"  {payload / args.duration:8.0f} o/s {'décompressés' if manager else 'compressés'}")
+    if manager:
+        manager.close()
+
+def make_chart():
+    fig = Figure(figsize=(3, 2), dpi=100, facecolor="#121212")
+    ax = fig.add_subplot(111, facecolor="#121212")
+    ax.set_xticklabels([])
+    line, = ax.plot([], [], color="lime")
+    return FigureCanvasAgg(fig), ax, line
+
+def bench_render(args):
+    histories = [deque(maxlen=60) for _ in range(args.charts)]
+    levels = [random.uniform(5, 80) for _ in range(args.charts)]
+
+    def feed():
+        for i, history in enumerate(histories):
+            levels[i] = min(100.0, max(0.0, levels[i] + random.uniform(-3, 3)))
+            history.append(levels[i])
+
+    legacy = [make_chart() for _ in range(args.charts)]
+    legacy_times = []
+    for _ in range(args.ticks):
+        feed()
+        started = time.perf_counter()
+        for (canvas, ax, line), history in zip(legacy, histories):
+            line.set_data(range(len(history)), list(history))
+            ax.set_xlim(0, max(59, len(history) - 1))
+            ax.set_ylim(0, max(history, default=100) * 1.1)
+            canvas.draw()
+        legacy_times.append((time.perf_counter() - started) * 1000)
+
+    renderer = ChartRenderer()
+    for i in range(args.charts):
+        renderer.add(str(i), LiveChart(*make_chart()))
+    blit_times = []
+    for _ in range(args.ticks):
+        feed()
+        started = time.perf_counter()
+        for i, history in enumerate(histories):
+            renderer.update(str(i), history)
+        renderer.flush()
+        blit_times.append((time.perf_counter() - started) * 1000)
+
+    print(f"{args.charts} graphiques, {args.ticks} ticks (Agg, sans Tk)")
+    report("draw() complet par graphique", legacy_times)
+    report("Blit + hystérésis", blit_times)
+    print(f"{'Redessins complets / blits':<40} {renderer.full_draws} / {renderer.blits}")
+
+def synthetic_stats_lines(jiffies, game, idle=False):
+    for core in jiffies:
+        busy = random.randint(2, 4) if idle else random.randint(5, 90)
+        core[0] += busy
+        core[3] += 100 - busy
+    total = [sum(column) for column in zip(*jiffies)]
+    lines = ["cpu  " + " ".join(map(str, total))]
+    lines.extend(f"cpu{i} " + " ".join(map(str, core)) for i, core in enumerate(jiffies))
+    lines.append(f"mem 921 {random.randint(300, 600)}")
+    if idle:
+        lines.extend([f"temp {random.uniform(44.8, 45.2):.1f}", "emulator ", "game "])
+        return lines
+    lines.append(f"temp {random.uniform(40, 60):.1f}")
+    lines.append("emulator fbneo_libretro")
+    lines.append(f"game /usr/bin/retroarch -L /usr/lib/libretro/fbneo_libretro.so /recalbox/share/roms/fbneo/{game}.zip")
+    return lines
+
+LOAD_PROFILES = {
+    "idle": lambda tick, core, rng: rng.uniform(1, 4),
+    "steady": lambda tick, core, rng: rng.uniform(30, 60),
+    "spiky": lambda tick, core, rng: 100.0 if rng.random() < 0.1 else rng.uniform(10, 30),
+    "killer": lambda tick, core, rng: rng.uniform(95, 100) if core == 0 else rng.uniform(5, 20),
+    "ramp": lambda tick, core, rng: min(100.0, tick % 600 / 6 + rng.uniform(0, 5)),
+    "thermal": lambda tick, core, rng: rng.uniform(85, 100) if tick % 120 < 80 else rng.uniform(20, 40),
+}
+
+class FakeRecalboxHost:
+    def __init__(self, profile="steady", cores=4, session_ticks=600, seed=41):
+        self.profile = profile
+        self.rng = random.Random(seed)
+        self.jiffies = [[0] * 8 for _ in range(cores)]
+        self.session_ticks = session_ticks
+        self.tick = 0
+        self.load = [0.0] * cores
+        self.threads = [[1234, "retroarch", 0, 0], [1236, "audio", 0, 1], [1237, "video", 0, 2 % cores],
+                        [1238, "input", 0, 3 % cores]]
+        self.switches = 0
+        self.temp = 40.0
+        self.freq = 600
+        self.volts = 0.85
+        self.throttled = 0
+        self.advance()
+
+    def advance(self):
+        self.tick += 1
+        self.load = [LOAD_PROFILES[self.profile](self.tick, i, self.rng) for i in range(len(self.jiffies))]
+        for core, busy in zip(self.jiffies, self.load):
+            busy = int(round(busy))
+            core[0] += busy * 3 // 4
+            core[2] += busy - busy * 3 // 4
+            core[3] += 100 - busy
+        shares = [self.load[0] * 0.95, 4, self.load[2 % len(self.load)] * 0.6, 1]
+        for thread, share in zip(self.threads, shares):
+            thread[2] += int(round(share))
+        self.switches += self.rng.randint(200, 400)
+        average = sum(self.load) / len(self.load)
+        self.temp = 40 + average * 0.35 + self.rng.uniform(-0.5, 0.5)
+        if self.temp >= 70:
+            self.throttled |= 0xE000E
+            self.freq = 1500
+        else:
+            self.throttled &= ~0xF
+            self.freq = 2000 if average > 5 else 600
+        self.volts = 0.95 if self.freq == 2000 else 0.85
+
+    def game(self):
+        if self.profile == "idle":
+            return None
+        return GAMES[self.tick // self.session_ticks % len(GAMES)]
+
+    def proc_stat(self):
+        total = [sum(column) for column in zip(*self.jiffies)]
+        lines = ["cpu  " + " ".join(map(str, total))]
+        lines.extend(f"cpu{i} " + " ".join(map(str, core)) for i, core in enumerate(self.jiffies))
+        lines.extend([f"intr {self.tick * 5000} 0 0", f"ctxt {self.tick * 9000}", "btime 1700000000",
+                      f"processes {self.tick + 800}", "procs_running 2", "procs_blocked 0"])
+        return "\n".join(lines)
+
+    def free_m(self):
+        used = int(250 + sum(self.load) / len(self.load) * 4 + self.rng.uniform(-10, 10))
+        return ("               total        used        free      shared  buff/cache   available\n"
+                f"Mem:            921 {used:11d} {921 - used - 120:11d}          12         120 {921 - used:11d}\n"
+                "Swap:             0           0           0")
+
+    def vcgencmd(self):
+        return f"temp={self.temp:.1f}'C"
+
+    def measure_clock(self):
+        return f"frequency(48)={self.freq * 1000000}"
+
+    def get_throttled(self):
+        return f"throttled={self.throttled:#x}"
+
+    def measure_volts(self):
+        return f"volt={self.volts:.4f}V"
+
+    def thermal_zone(self):
+        return f"{self.temp * 1000:.0f}"
+
+    def ps_aux(self):
+        lines = ["USER       PID %CPU %MEM    VSZ   RSS TTY      STAT START   TIME COMMAND",
+                 "root         1  0.0  0.1   2940  1720 ?        Ss   10:00   0:01 init",
+                 "root       412  0.3  2.1  84000 19800 ?        Sl   10:00   0:42 /usr/bin/EmulationStation"]
+        game = self.game()
+        if game:
+            emulator = EMULATORS[GAMES.index(game) % len(EMULATORS)]
+            lines.append(f"root      1234 {sum(self.load):4.1f} 12.3 312000 110000 ?      Sl   10:05   5:12 "
+                         f"/usr/bin/retroarch -L /usr/lib/libretro/{emulator}_libretro.so "
+                         f"--config /recalbox/share/system/configs/retroarch/retroarchcustom.cfg "
+                         f"/recalbox/share/roms/{emulator}/{game} (World).zip")
+        lines.append("root      2001  0.0  0.0   2100   480 ?        S    10:05   0:00 grep retroarch")
+        return "\n".join(lines)
+
+    def task_stat(self, tid, name, jiffies, processor):
+        fields = ["S"] + ["0"] * 49
+        fields[1], fields[11], fields[12], fields[17], fields[21], fields[36] = (
+            "1", str(jiffies * 3 // 4), str(jiffies - jiffies * 3 // 4), str(len(self.threads)), "27500", str(processor))
+        return f"{tid} ({name}) " + " ".join(fields)
+
+    def process_lines(self):
+        if not self.game():
+            return []
+        main = self.threads[0]
+        lines = ["pstat " + self.task_stat(main[0], main[1], sum(thread[2] for thread in self.threads), main[3])]
+        lines.extend(f"pstatus {key} {value}" for key, value in (
+            ("VmRSS", "110000 kB"), ("Threads", len(self.threads)), ("Cpus_allowed_list", f"0-{len(self.jiffies) - 1}"),
+            ("voluntary_ctxt_switches", self.switches // 3), ("nonvoluntary_ctxt_switches", self.switches - self.switches // 3)))
+        lines.extend("tstat " + self.task_stat(*thread) for thread in self.threads)
+        return lines
+
+    def stats_output(self):
+        lines = [line for line in self.proc_stat().splitlines() if line.startswith("cpu")]
+        lines.extend(f"mem {parts[1]} {parts[2]}" for parts in map(str.split, self.free_m().splitlines())
+                     if parts and parts[0] == "Mem:")
+        lines.append("temp " + re.search(r"[0-9]*\.[0-9]*", self.vcgencmd()).group(0))
+        lines.append("freq " + self.measure_clock().split("=")[1])
+        lines.append("throttled " + self.get_throttled().split("=")[1])
+        lines.append("volts " + re.search(r"[0-9.]+", self.measure_volts()).group(0))
+        lines.append("zone " + self.thermal_zone())
+        processes = [line for line in self.ps_aux().splitlines() if "retroarch" in line]
+        emulators = [match.group(0) for line in processes for match in re.finditer(r"[a-zA-Z0-9_]+_libretro", line)]
+        lines.append("emulator " + (emulators[0] if emulators else ""))
+        games = ["".join(field + " " for field in line.split()[10:]) for line in processes if "grep" not in line]
+        lines.append("game " + (games[0] if games else ""))
+        lines.extend(self.process_lines())
+        return "\n".join(lines)
+
+    def run(self, command):
+        outputs = {
+            EXEC_STATS_COMMAND: self.stats_output,
+            "cat /proc/stat": self.proc_stat,
+            "grep '^cpu' /proc/stat": lambda: "\n".join(l for l in self.proc_stat().splitlines() if l.startswith("cpu")),
+            "grep '^cpu ' /proc/stat": lambda: self.proc_stat().splitlines()[0],
+            "free -m": self.free_m,
+            "vcgencmd measure_temp": self.vcgencmd,
+            "vcgencmd measure_clock arm": self.measure_clock,
+            "vcgencmd get_throttled": self.get_throttled,
+            "vcgencmd measure_volts core": self.measure_volts,
+            "cat /sys/class/thermal/thermal_zone0/temp": self.thermal_zone,
+            "ps aux": self.ps_aux,
+            "nproc": lambda: str(len(self.jiffies)),
+        }
+        if command.startswith("echo test"):
+            return "test", 0
+        if command not in outputs:
+            return "", 127
+        if command == EXEC_STATS_COMMAND:
+            self.advance()
+        return outputs[command](), 0
+
+class FakeSSHManager:
+    def __init__(self, hostname, latency=0.02, cores=4, idle=False):
+        self.hostname = hostname
+        self.port = 22
+        self.username = "root"
+        self.password = "recalboxroot"
+        self.client = object()
+        self.stream_channel = None
+        self.latency = latency
+        self.jiffies = [[0] * 8 for _ in range(cores)]
+        self.idle = idle
+        self.calls = 0
+        self.call_times = []
+
+    def execute_command(self, command):
+        self.calls += 1
+        self.call_times.append(time.perf_counter())
+        time.sleep(self.latency)
+        return "\n".join(synthetic_stats_lines(self.jiffies, self.hostname, self.idle))
+
+    def health(self):
+        return {"connected": True, "failures": 0, "retry_in": 0.0, "latency_ms": self.latency * 1000,
+                "commands": self.calls, "errors": 0, "timeouts": 0, "last_success": time.time()}
+
+    def close(self):
+        pass
+
+class FakeRecalboxServer(paramiko.ServerInterface):
+    def __init__(self, latency=0.0, cores=4, profile="steady", session_ticks=600):
+        self.latency = latency
+        self.hang = False
+        self.host_key = paramiko.RSAKey.generate(1024)
+        self.port = 0
+        self.listener = None
+        self.transports = []
+        self.host = FakeRecalboxHost(profile, cores, session_ticks)
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.connections = 0
+        self.commands = 0
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        if (username, password) == ("root", "recalboxroot"):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(self, channel, command):
+        self.requests[channel] = command
+        return True
+
+    def answer(self, channel):
+        deadline = time.time() + 5
+        while channel not in self.requests and time.time() < deadline:
+            time.sleep(0.001)
+        command = self.requests.pop(channel, b"")
+        time.sleep(self.latency)
+        while self.hang and not channel.closed:
+            time.sleep(0.05)
+        with self.lock:
+            self.commands += 1
+            output, status = self.host.run(command.decode(errors="replace"))
+        try:
+            channel.sendall((output + "\n").encode())
+            channel.send_exit_status(status)
+            channel.close()
+        except (OSError, EOFError, paramiko.SSHException):
+            pass
+
+    def start(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(("127.0.0.1", self.port))
+        listener.listen(16)
+        self.port = listener.getsockname()[1]
+        self.listener = listener
+        threading.Thread(target=self.accept_loop, args=(listener,), daemon=True).start()
+
+    def accept_loop(self, listener):
+        while True:
+            try:
+                client, _ = listener.accept()
+            except OSError:
+                return
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            transport = paramiko.Transport(client)
+            transport.add_server_key(self.host_key)
+            try:
+                transport.start_server(server=self)
+            except (paramiko.SSHException, EOFError):
+                continue
+            self.transports.append(transport)
+            self.connections += 1
+            threading.Thread(target=self.drain_channels, args=(transport,), daemon=True).start()
+
+    def drain_channels(self, transport):
+        while transport.is_active():
+            channel = transport.accept(timeout=1)
+            if channel is not None:
+                threading.Thread(target=self.answer, args=(channel,), daemon=True).start()
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.shutdown(socket.SHUT_RDWR)
+            self.listener.close()
+            self.listener = None
+        for transport in self.transports:
+            transport.close()
+        self.transports = []
+
+def legacy_core_usage(lines, previous):
+    usages = []
+    for i, line in enumerate(lines):
+        values = list(map(int, line.split()[1:]))
+        total = sum(values)
+        idle = values[3] + values[4] if len(values) >= 5 else values[3]
+        if previous[i] is not None:
+            prev_total, prev_idle = previous[i]
+            total_diff = total - prev_total
+            idle_diff = idle - prev_idle
+            usages.append((total_diff - idle_diff) / total_diff * 100 if total_diff > 0 else 0.0)
+        else:
+            usages.append(0.0)
+        previous[i] = (total, idle)
+    return usages
+
+def bench_cores(args):
+    print(f"Calcul de la charge par core, {args.ticks} ticks")
+    for cores in args.cores:
+        manager = FakeSSHManager("bench", latency=0, cores=cores)
+        ticks = [fetch_all_stats(manager) for _ in range(args.ticks)]
+        previous = [None] * (cores + 1)
+        legacy = timed(lambda: [legacy_core_usage([stats["cpu"]] + stats["cores"], previous) for stats in ticks], 1)
+        state = {"previous": None}
+
+        def vector_tick(stats):
+            usage, state["previous"] = cpu_usage_vector(jiffies_matrix([stats["cpu"]] + stats["cores"]), state["previous"])
+            return usage
+
+        vector = timed(lambda: [vector_tick(stats) for stats in ticks], 1)
+        report(f"{cores} cores : boucle par ligne", [value * 1000 / args.ticks for value in legacy], "µs")
+        report(f"{cores} cores : matrice NumPy", [value * 1000 / args.ticks for value in vector], "µs")
+
+def legacy_parse(output):
+    lines = output.splitlines()
+    return {
+        "cpu": lines[0] if len(lines) > 0 else "",
+        "cores": lines[1:5] if len(lines) > 4 else [""] * 4,
+        "mem": lines[5] if len(lines) > 5 else "",
+        "temp": lines[6] if len(lines) > 6 else "0.0",
+        "emulator": lines[7] if len(lines) > 7 else "Aucun",
+        "game": lines[8] if len(lines) > 8 else ""
+    }
+
+def legacy_output(keyed):
+    lines = []
+    for line in keyed:
+        key, _, value = line.partition(" ")
+        if key == "mem":
+            lines.append(f"Mem:            {value.split()[0]}         {value.split()[1]}         300          10         200         700")
+        elif key in ("temp", "emulator", "game"):
+            lines.append(value)
+        else:
+            lines.append(line)
+    return lines
+
+def mutate(keyed, kind):
+    keyed = list(keyed)
+    legacy = legacy_output(keyed)
+    if kind == "capteur temp en échec":
+        index = next(i for i, line in enumerate(keyed) if line.startswith("temp "))
+        keyed[index] = "temp "
+        legacy = legacy[:index]
+    elif kind == "aucun émulateur":
+        index = next(i for i, line in enumerate(keyed) if line.startswith("emulator "))
+        keyed[index] = "emulator "
+        legacy = legacy[:index]
+    elif kind == "message d'erreur parasite":
+        index = random.randint(1, len(keyed) - 1)
+        keyed.insert(index, "sh: vcgencmd: not found")
+        legacy.insert(index, "sh: vcgencmd: not found")
+    elif kind == "sortie tronquée":
+        index = random.randint(1, len(keyed) - 1)
+        keyed, legacy = keyed[:index], legacy[:index]
+    elif kind == "lignes mélangées":
+        order = list(range(len(keyed)))
+        random.shuffle(order)
+        keyed = [keyed[i] for i in order]
+        legacy = [legacy[i] for i in order]
+    return "\n".join(keyed), "\n".join(legacy)
+
+def field_matches(parsed, expected):
+    matches = {
+        "cpu": parsed["cpu"] == expected["cpu"],
+        "cores": parsed["cores"] == expected["cores"],
+        "mem": parsed["mem"].split()[1:3] == expected["mem"].split()[1:3],
+        "temp": parsed["temp"] == expected["temp"],
+        "emulator": parsed["emulator"] == expected["emulator"],
+        "game": parsed["game"] == expected["game"],
+    }
+    return matches
+
+def bench_parser(args):
+    random.seed(args.seed)
+    jiffies = [[0] * 8 for _ in range(4)]
+    recorded = [synthetic_stats_lines(jiffies, f"jeu{i}") for i in range(args.samples)]
+    keyed_outputs = ["\n".join(lines) for lines in recorded]
+    legacy_outputs = ["\n".join(legacy_output(lines)) for lines in recorded]
+    for name, parse, outputs in (("positionnel (ancien)", legacy_parse, legacy_outputs),
+                                 ("étiqueté (parse_stats_frame)", lambda output: parse_stats_frame(output.splitlines()),
+                                  keyed_outputs)):
+        started = time.perf_counter()
+        for output in outputs:
+            parse(output)
+        elapsed = time.perf_counter() - started
+        print(f"{'Débit ' + name:<40} {len(outputs) / elapsed:10.0f} trames/s")
+    kinds = ["intacte", "capteur temp en échec", "aucun émulateur", "message d'erreur parasite",
+             "sortie tronquée", "lignes mélangées"]
+    print(f"{'Mutation':<28} {'champs justes (ancien / étiqueté)':>36} {'CPU exploitable (ancien / étiqueté)':>38}")
+    for kind in kinds:
+        legacy_fields = keyed_fields = legacy_usable = keyed_usable = 0
+        for lines in recorded:
+            expected = parse_stats_frame(lines)
+            keyed, legacy = mutate(lines, kind)
+            legacy_match = field_matches(legacy_parse(legacy), expected)
+            keyed_match = field_matches(parse_stats_frame(keyed.splitlines()), expected)
+            if kind == "capteur temp en échec":
+                legacy_match["temp"] = keyed_match["temp"] = True
+            if kind == "aucun émulateur":
+                legacy_match["emulator"] = keyed_match["emulator"] = True
+            legacy_fields += sum(legacy_match.values())
+            keyed_fields += sum(keyed_match.values())
+            legacy_usable += legacy_match["cpu"] and legacy_match["cores"]
+            keyed_usable += keyed_match["cpu"] and keyed_match["cores"]
+        total = len(recorded) * 6
+        print(f"{kind:<28} {legacy_fields / total * 100:17.1f} % / {keyed_fields / total * 100:6.1f} %"
+              f" {legacy_usable / len(recorded) * 100:19.1f} % / {keyed_usable / len(recorded) * 100:6.1f} %")
+
+def bench_fleet(args):
+    config = dict(load_config(), stream_mode=False, refresh_interval=int(args.interval * 1000))
+    collectors = {f"pi-{i:02d}": StatsCollector(FakeSSHManager(f"pi-{i:02d}", args.latency), config, discover=False)
+                  for i in range(args.hosts)}
+    fleet = FleetCollector(collectors, config)
+    active = next(iter(collectors.values()))
+    fleet.start()
+    tick_times = []
+    overview_times = []
+    deadline = time.time() + args.duration
+    next_overview = time.time()
+    while time.time() < deadline:
+        started = time.perf_counter()
+        active.latest()
+        tick_times.append((time.perf_counter() - started) * 1000)
+        if time.time() >= next_overview:
+            started = time.perf_counter()
+            fleet.snapshot()
+            overview_times.append((time.perf_counter() - started) * 1000)
+            next_overview += 1.0
+        time.sleep(0.1)
+    fleet.stop()
+    rates = [collector.monitor.version / args.duration for collector in collectors.values()]
+    print(f"{args.hosts} hôtes simulés, latence {args.latency * 1000:.0f} ms, intervalle {args.interval}s, "
+          f"{config.get('fleet_workers', 8)} workers, {args.duration}s")
+    report("Tick UI (hôte affiché)", tick_times)
+    report("Snapshot vue flotte (1 Hz)", overview_times)
+    report("Échantillons / s par hôte", rates, unit="Hz")
+
+def bench_ssh(args):
+    server = FakeRecalboxServer(latency=args.latency)
+    server.start()
+    config = dict(load_config(), stream_mode=False, adaptive_refresh=False, refresh_interval=int(args.interval * 1000),
+                  ssh_keepalive=1, ssh_command_timeout=args.timeout, reconnect_base_delay=args.base_delay,
+                  reconnect_max_delay=args.max_delay, ssh_max_channels=args.channels)
+    manager = SSHManager("127.0.0.1", server.port, "root", "recalboxroot", config)
+    print(f"Serveur SSH simulé 127.0.0.1:{server.port}, latence {args.latency * 1000:.0f} ms, "
+          f"délai commande {args.timeout}s, {args.channels} canaux")
+    report("Commande séquentielle", timed(lambda: fetch_all_stats(manager), args.commands))
+
+    def worker(count):
+        for _ in range(count):
+            fetch_all_stats(manager)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(args.commands // args.channels,)) for _ in range(args.channels)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    print(f"{'Commandes concurrentes':<40} {args.commands / elapsed:8.1f} cmd/s sur {server.connections} transport(s)")
+    server.hang = True
+    report("Commande bloquée (échéance)", timed(lambda: manager.execute_command("uptime"), 3))
+    server.hang = False
+    collector = StatsCollector(manager, config, discover=False)
+    collector.start()
+    for outage in args.outages:
+        time.sleep(2 * args.interval)
+        server.stop()
+        time.sleep(outage)
+        server.start()
+        restarted = time.time()
+        while collector.ssh_manager.last_success < restarted and time.time() - restarted < 120:
+            time.sleep(0.01)
+        print(f"{f'Coupure de {outage:g}s':<40} reprise {collector.ssh_manager.last_success - restarted:6.2f}s "
+              f"après redémarrage")
+    collector.stop()
+    server.stop()
+    health = manager.health()
+    print(f"{'Santé finale':<40} {health['commands']} commandes, {health['errors']} erreurs, {health['timeouts']} échéances, "
+          f"{server.connections} connexions")
+
+STARTUP_PROBE = """
+import sys, time
+def memory(field):
+    with open("/proc/self/status") as status:
+        return next(line.split()[1] for line in status if line.startswith(field))
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter() - started
+rss_import = memory("VmRSS:")
+from collector41 import SSHManager, StatsCollector, load_config
+config = dict(load_config(), stream_mode=False, adaptive_refresh=False, refresh_interval=200)
+manager = SSHManager("127.0.0.1", {port}, "root", "recalboxroot", config)
+collector = StatsCollector(manager, config, discover=False)
+collector.start()
+time.sleep({duration})
+collector.stop()
+gui = sorted(name for name in ("tkinter", "customtkinter", "matplotlib") if name in sys.modules)
+print(imported * 1000, rss_import, memory("VmHWM:"), collector.monitor.version,
+      ",".join(gui) or "-")
+"""
+
+def bench_startup(args):
+    server = FakeRecalboxServer()
+    server.start()
+    root = os.path.dirname(os.path.abspath(__file__))
+    print(f"Démarrage et mémoire, {args.repeat} lancements, collecte de {args.duration:g}s contre un serveur simulé")
+    for label, module in (("Sans interface (collector41)", "collector41"), ("Interface (dashboard41)", "dashboard41")):
+        probe = STARTUP_PROBE.format(module=module, port=server.port, duration=args.duration)
+        imports, rss_imports, rss_runs, totals = [], [], [], []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True,
+                                    env=dict(os.environ, PYTHONPATH=root)).stdout.split()
+            totals.append((time.perf_counter() - started - args.duration) * 1000)
+            imports.append(float(output[0]))
+            rss_imports.append(int(output[1]) / 1024)
+            rss_runs.append(int(output[2]) / 1024)
+            samples, gui = int(output[3]), output[4]
+        print(label)
+        report("  import du module", imports)
+        report("  processus complet (hors collecte)", totals)
+        report("  RSS après import", rss_imports, "Mo")
+        report("  RSS max après collecte", rss_runs, "Mo")
+        print(f"{'  échantillons / modules GUI chargés':<40} {samples} / {gui}")
+    server.stop()
+
+def cadence_gaps(managers, started, ended):
+    gaps = []
+    for manager in managers:
+        times = [t for t in manager.call_times if started <= t <= ended]
+        gaps.extend((b - a) * 1000 for a, b in zip(times, times[1:]))
+    return gaps
+
+def bench_metrics(args):
+    config = dict(load_config(), stream_mode=False, adaptive_refresh=False, refresh_interval=int(args.interval * 1000),
+                  metrics_port=0)
+    managers = [FakeSSHManager(f"recalbox-{i}", latency=args.latency) for i in range(args.hosts)]
+    collectors = {manager.hostname: StatsCollector(manager, config, discover=False) for manager in managers}
+    for collector in collectors.values():
+        collector.start()
+    exporter = MetricsExporter(collectors, config)
+    exporter.start()
+    port = exporter.server.server_port
+    time.sleep(3 * args.interval)
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request("GET", "/metrics")
+    response = connection.getresponse()
+    body = response.read().decode()
+    families = [line.split()[2] for line in body.splitlines() if line.startswith("# TYPE")]
+    valid = (body.endswith("# EOF\n") and families == [name for name, _, _ in METRIC_FAMILIES]
+             and "openmetrics-text" in response.getheader("Content-Type"))
+    print(f"Export OpenMetrics : {args.hosts} hôtes à {args.interval * 1000:.0f} ms, {len(body)} octets, "
+          f"{len(body.splitlines())} lignes, format {'valide' if valid else 'INVALIDE'}")
+    started = time.perf_counter()
+    time.sleep(args.duration)
+    ended = time.perf_counter()
+    baseline = cadence_gaps(managers, started, ended)
+    baseline_calls = sum(started <= t <= ended for manager in managers for t in manager.call_times)
+    latencies = []
+    errors = []
+    stop = threading.Event()
+
+    def scraper():
+        client = http.client.HTTPConnection("127.0.0.1", port)
+        period = args.threads / args.rate
+        next_due = time.perf_counter()
+        while not stop.is_set():
+            begin = time.perf_counter()
+            try:
+                client.request("GET", "/metrics")
+                client.getresponse().read()
+                latencies.append((time.perf_counter() - begin) * 1000)
+            except (OSError, http.client.HTTPException) as e:
+                errors.append(e)
+                client.close()
+                client = http.client.HTTPConnection("127.0.0.1", port)
+            next_due += period
+            time.sleep(max(0.0, next_due - time.perf_counter()))
+        client.close()
+
+    threads = [threading.Thread(target=scraper) for _ in range(args.threads)]
+    scraped = exporter.scrapes
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    ended = time.perf_counter()
+    loaded = cadence_gaps(managers, started, ended)
+    loaded_calls = sum(started <= t <= ended for manager in managers for t in manager.call_times)
+    print(f"{'Débit de scrape obtenu':<40} {(exporter.scrapes - scraped) / (ended - started):8.1f} req/s "
+          f"(cible {args.rate}, {args.threads} clients, {len(errors)} erreurs)")
+    report("Latence de scrape", latencies)
+    print(f"{'  p99':<40} {percentile(latencies, 99):8.2f} ms")
+    report("Cadence d'échantillonnage sans scrape", baseline)
+    report("Cadence d'échantillonnage sous charge", loaded)
+    print(f"{'Commandes SSH/s sans scrape / sous charge':<40} {baseline_calls / args.duration:8.1f} / "
+          f"{loaded_calls / (ended - started):.1f}")
+    exporter.stop()
+    for collector in collectors.values():
+        collector.stop()
+
+def write_recording(path, hosts, samples, session_length, seed):
+    random.seed(seed)
+    recorder = SampleRecorder(path)
+    jiffies = {f"recalbox-{i}": [[0] * 8 for _ in range(4)] for i in range(hosts)}
+    started = 1_700_000_000.0
+    for n in range(samples):
+        for host, host_jiffies in jiffies.items():
+            recorder.write(host, started + n, synthetic_stats_lines(host_jiffies, f"Jeu {n // session_length}"))
+    recorder.close()
+
+def replay_fingerprint(player):
+    fingerprint = []
+    for host, collector in sorted(player.collectors.items()):
+        monitor = collector.monitor
+        fingerprint.append((host, monitor.version, monitor.sessions_exported, round(monitor.core_imbalance, 6),
+                            tuple(round(value, 6) for value in monitor.accumulators["cpu_usage"].summary())))
+    return fingerprint
+
+def bench_replay(args):
+    config = load_config()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.jsonl")
+        write_recording(path, args.hosts, args.samples, args.session, args.seed)
+        size = os.path.getsize(path)
+        started = time.perf_counter()
+        entries = load_recording(path)
+        loaded = time.perf_counter() - started
+    print(f"Enregistrement : {len(entries)} échantillons ({args.hosts} hôtes x {args.samples} s), "
+          f"{size / 2**20:.1f} Mo, chargé en {loaded * 1000:.0f} ms")
+    fingerprints = []
+    for _ in range(2):
+        player = ReplayPlayer(entries, config, speed=0)
+        started = time.perf_counter()
+        for entry in entries:
+            player.feed(entry)
+        elapsed = time.perf_counter() - started
+        fingerprints.append(replay_fingerprint(player))
+    print(f"{'Rejeu max (parse + traitement)':<40} {len(entries) / elapsed:8.0f} échantillons/s  "
+          f"({elapsed * 1000:.0f} ms)")
+    print(f"{'Résultat déterministe':<40} {'oui' if fingerprints[0] == fingerprints[1] else 'NON'} "
+          f"({sum(item[2] for item in fingerprints[0])} sessions exportées)")
+    player = ReplayPlayer(entries, config, speed=0)
+    renderer = ChartRenderer()
+    names = ["cpu_load", "ram_usage", "cpu_temp", "imbalance", "core1", "core2", "core3", "core4"]
+    for name in names:
+        renderer.add(name, LiveChart(*make_chart()))
+    monitor_host = entries[0][1]
+    rendered = 0
+    started = time.perf_counter()
+    for entry in entries[:args.render_samples]:
+        player.feed(entry)
+        if entry[1] != monitor_host:
+            continue
+        monitor = player.collectors[monitor_host].monitor
+        renderer.update("cpu_load", monitor.cpu_load_history, monitor.envelopes["cpu_load"])
+        renderer.update("ram_usage", monitor.ram_usage_history)
+        renderer.update("cpu_temp", monitor.cpu_temp_history, monitor.envelopes["cpu_temp"])
+        renderer.update("imbalance", monitor.imbalance_history)
+        for i, history in enumerate(monitor.core_histories):
+            renderer.update(f"core{i + 1}", history, monitor.envelopes[f"core{i + 1}"])
+        renderer.flush()
+        rendered += 1
+    elapsed = time.perf_counter() - started
+    print(f"{'Rejeu max avec rendu Agg (8 graphiques)':<40} {rendered / elapsed:8.0f} images/s  "
+          f"({renderer.full_draws} redessins, {renderer.blits} blits)")
+    player = ReplayPlayer(entries, config, speed=0)
+    for entry in entries:
+        player.feed(entry)
+    middle = player.start_time + (player.end_time - player.start_time) / 2
+    report("Retour arrière au milieu", timed(lambda: (player.seek(player.end_time), player.seek(middle)), 3))
+    player = ReplayPlayer(entries, config, speed=args.speed)
+    player.start()
+    started = time.perf_counter()
+    time.sleep(args.duration)
+    player.pause()
+    elapsed = time.perf_counter() - started
+    player.stop()
+    expected = args.speed * elapsed * args.hosts
+    print(f"{f'Rejeu x{args.speed:g} pendant {args.duration:g}s':<40} {player.played} échantillons "
+          f"(attendu {expected:.0f}), position {player.position - player.start_time:.1f}s")
+
+def bench_adaptive(args):
+    print(f"{args.hosts} hôtes simulés, intervalle {args.interval}s, {args.duration}s par scénario")
+    for label, adaptive, idle in (("fixe, consoles au menu", False, True),
+                                  ("adaptatif, consoles au menu", True, True),
+                                  ("adaptatif, consoles en jeu", True, False)):
+        config = dict(load_config(), stream_mode=False, refresh_interval=int(args.interval * 1000),
+                      adaptive_refresh=adaptive)
+        managers = {f"pi-{i:02d}": FakeSSHManager(f"pi-{i:02d}", args.latency, idle=idle) for i in range(args.hosts)}
+        collectors = {host: StatsCollector(manager, config, discover=False) for host, manager in managers.items()}
+        fleet = FleetCollector(collectors, config)
+        fleet.start()
+        time.sleep(args.duration)
+        fleet.stop()
+        calls = [manager.calls / args.duration for manager in managers.values()]
+        samples = [collector.monitor.version / args.duration for collector in collectors.values()]
+        modes = {collector.scheduler.mode for collector in collectors.values()}
+        print(f"{label:<40} SSH {statistics.mean(calls):5.2f} cmd/s/hôte  rendus {statistics.mean(samples):5.2f} Hz/hôte"
+              f"  total {sum(calls):6.1f} cmd/s  mode {', '.join(sorted(modes))}")
+
+async def fake_ssh_responders(addresses, port, delay):
+    async def handle(reader, writer):
+        await asyncio.sleep(delay)
+        writer.write(b"SSH-2.0-OpenSSH_8.9 fake-recalbox\r\n")
+        await writer.drain()
+        writer.close()
+    return [await asyncio.start_server(handle, address, port) for address in addresses]
+
+def bench_discovery(args):
+    async def run():
+        for subnet in args.subnets:
+            hosts = [str(ip) for ip in ipaddress.ip_network(subnet).hosts()]
+            responders = random.sample(hosts, min(args.responders, len(hosts)))
+            servers = await fake_ssh_responders(responders, args.port, args.banner_delay)
+            times = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                found = await sweep_ssh_hosts(hosts, args.port, args.timeout, args.concurrency)
+                times.append((time.perf_counter() - started) * 1000)
+            for server in servers:
+                server.close()
+                await server.wait_closed()
+            report(f"Scan {subnet} ({len(found)}/{len(responders)} trouvés)", times)
+    print(f"Port {args.port}, timeout {args.timeout}s, concurrence {args.concurrency}, "
+          f"délai bannière {args.banner_delay * 1000:.0f} ms")
+    asyncio.run(run())
+
+def synthetic_samples(count):
+    now = time.time()
+    for i in range(count):
+        sample = {column: random.uniform(0, 100) for column in SAMPLE_COLUMNS}
+        sample["timestamp"] = now + i
+        yield sample
+
+def legacy_aggregate(session_data):
+    def agg(metric):
+        values = [d[metric] for d in session_data]
+        avg = sum(values)/len(values) if values else 0
+        return avg, min(values) if values else 0, max(values) if values else 0
+    return [agg(metric) for metric in SAMPLE_COLUMNS]
+
+def bench_export(args):
+    print(f"Agrégation à l'export d'une session, {args.repeat} répétitions")
+    for count in args.sizes:
+        samples = list(synthetic_samples(count))
+        session_data = deque(samples, maxlen=3600)
+        accumulators = {metric: MetricAccumulator() for metric in SAMPLE_COLUMNS}
+        started = time.perf_counter()
+        for sample in samples:
+            for metric, accumulator in accumulators.items():
+                accumulator.add(sample[metric])
+        add_time = (time.perf_counter() - started) / count * 1e6
+        def summarize():
+            for accumulator in accumulators.values():
+                accumulator.summary()
+            for metric in ("cpu_usage", "ram_usage", "cpu_temp"):
+                accumulators[metric].std()
+                for pct in (50, 95, 99):
+                    accumulators[metric].quantile(pct / 100)
+        report(f"{count} échantillons : agg() sur deque", timed(lambda: legacy_aggregate(session_data), args.repeat))
+        report(f"{count} échantillons : accumulateurs", timed(summarize, args.repeat))
+        print(f"{'  coût par échantillon (accumulateurs)':<40} {add_time:8.2f} µs"
+              f"  couverture deque {len(session_data)}/{count}")
+
+def bench_store(args):
+    samples = list(synthetic_samples(args.samples))
+    tracemalloc.start()
+    started = time.perf_counter()
+    session_data = deque()
+    for sample in samples:
+        session_data.append({key: value + 0.0 for key, value in sample.items()})
+    dict_time = time.perf_counter() - started
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del session_data
+    with tempfile.TemporaryDirectory() as directory:
+        tracemalloc.start()
+        store = SampleStore(directory)
+        session_id = store.begin_session()
+        started = time.perf_counter()
+        for sample in samples:
+            store.append(session_id, sample)
+        store.flush()
+        store_time = time.perf_counter() - started
+        store_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        disk_bytes = sum(os.path.getsize(store.path(name)) for name in store.dtypes)
+        started = time.perf_counter()
+        window = store.read(samples[-3600]["timestamp"], samples[-1]["timestamp"])
+        window["cpu_usage"].mean()
+        read_time = time.perf_counter() - started
+        started = time.perf_counter()
+        store.session(session_id)["cpu_usage"].max()
+        session_time = time.perf_counter() - started
+        store.close()
+    print(f"{args.samples} échantillons")
+    print(f"{'deque de dicts':<40} {args.samples / dict_time:10.0f} ajouts/s  {dict_bytes / args.samples:7.1f} o/échantillon (RAM)")
+    print(f"{'SampleStore':<40} {args.samples / store_time:10.0f} ajouts/s  {store_bytes / args.samples:7.1f} o/échantillon (RAM)"
+          f"  {disk_bytes / args.samples:5.1f} o/échantillon (disque)")
+    print(f"{'Lecture fenêtre 1 h + moyenne':<40} {read_time * 1000:10.2f} ms")
+    print(f"{'Lecture session complète + max':<40} {session_time * 1000:10.2f} ms")
+
+GAMES = ["aof2", "lastblad", "crswd2bl", "joyjoy", "mslug", "kof98", "sf2", "ffight", "ddonpach", "tekken3"]
+EMULATORS = ["fbneo", "mame2003_plus", "pcsx_rearmed", "mupen64plus_next", "snes9x"]
+
+def synthetic_history_row(i):
+    start = time.time() - 86400 * 365 + i * 300
+    row = {field: round(random.uniform(0, 100), 1) for field in HISTORY_FIELDS}
+    row.update({
+        "game": random.choice(GAMES),
+        "emulator": random.choice(EMULATORS),
+        "session_start": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start)),
+        "session_end": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start + 200)),
+        "core_killer": "Oui" if random.random() < 0.05 else "Non",
+    })
+    return row
+
+def summary_values_csv(filename):
+    values = []
+    with open(filename, mode="r", newline="") as csvfile:
+        for row in csv.DictReader(csvfile):
+            values.append((row["game"], row["emulator"], row["session_start"], row["session_end"],
+                           f"{row['avg_cpu']}/{row['min_cpu']}/{row['max_cpu']}",
+                           f"{row['avg_ram']}/{row['min_ram']}/{row['max_ram']}",
+                           f"{row['avg_cpu_temp']}°C", row.get("core_imbalance", "0.0"),
+                           "KILLER" if row.get("core_killer", "Non") == "Oui" else "Non"))
+    return values
+
+def timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+def bench_history(args):
+    print(f"Chargement du résumé (hors insertion Treeview), {args.repeat} répétitions")
+    for count in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "historique_centralise.csv")
+            with open(filename, mode="w", newline="") as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=HISTORY_FIELDS)
+                writer.writeheader()
+                for i in range(count):
+                    writer.writerow(synthetic_history_row(i))
+            history = HistoryStore(os.path.join(directory, "historique.db"))
+            started = time.perf_counter()
+            history.import_csv(filename)
+            import_time = (time.perf_counter() - started) * 1000
+            last_id = history.rows()[-1]["id"]
+            row = synthetic_history_row(count)
+            append_history_csv(filename, row)
+            history.insert(row)
+            report(f"{count} sessions : CSV DictReader", timed(lambda: summary_values_csv(filename), args.repeat))
+            report(f"{count} sessions : SQLite complet", timed(lambda: history.summary_rows(), args.repeat))
+            report(f"{count} sessions : SQLite incrémental", timed(lambda: history.summary_rows(last_id), args.repeat))
+            report(f"{count} sessions : SQLite filtre jeu (index)",
+                   timed(lambda: history.rows(where="game = ?", params=("aof2",)), args.repeat))
+            print(f"{'  import CSV initial':<40} {import_time:8.2f} ms")
+            history.close()
+
+class FakeTreeview:
+    def __init__(self, columns, height=15):
+        self.options = {"columns": columns, "height": height}
+        self.items = {}
+        self.children = []
+        self.selected = ()
+        self.counter = 0
+
+    def __getitem__(self, key):
+        return self.options[key]
+
+    def insert(self, parent, index, values=(), tags=()):
+        self.counter += 1
+        iid = f"I{self.counter:05d}"
+        self.items[iid] = {"values": tuple(values), "tags": tags}
+        self.children.append(iid)
+        return iid
+
+    def item(self, iid, values=None, tags=None):
+        if values is not None:
+            self.items[iid]["values"] = tuple(values)
+        if tags is not None:
+            self.items[iid]["tags"] = tags
+        return self.items[iid]
+
+    def set(self, iid, column):
+        return self.items[iid]["values"][self.options["columns"].index(column)]
+
+    def get_children(self):
+        return tuple(self.children)
+
+    def move(self, iid, parent, index):
+        self.children.remove(iid)
+        self.children.insert(index, iid)
+
+    def delete(self, iid):
+        self.children.remove(iid)
+        del self.items[iid]
+
+    def selection_set(self, items):
+        self.selected = tuple(items)
+
+    def selection(self):
+        return self.selected
+
+SUMMARY_COLUMNS = ("game", "emulator", "session_start", "session_end",
+                   "CPU (A/M/X)", "RAM (A/M/X)", "CPU Temp (A)", "Core Imbalance", "Core Killer")
+
+def legacy_sort(tree, column, key_func):
+    items = [(tree.set(item, column), item) for item in tree.get_children()]
+    items.sort(key=lambda x: key_func(x[0]))
+    return [item for _, item in items]
+
+def summary_display_rows(count):
+    rows = []
+    for i in range(count):
+        cpu = random.uniform(5, 95)
+        ram = random.uniform(10, 80)
+        rows.append((f"Jeu Numero {i}", random.choice(["snes9x", "pcsx_rearmed", "mame2003"]), "2024-01-01 10:00:00",
+                     "2024-01-01 11:00:00", f"{cpu:.1f}/{cpu / 2:.1f}/{min(100.0, cpu * 1.5):.1f}",
+                     f"{ram:.1f}/{ram / 2:.1f}/{ram * 1.2:.1f}", f"{random.uniform(40, 80):.1f}°C",
+                     f"{random.uniform(0, 60):.1f}", "KILLER" if i % 4 == 0 else "Non"))
+    return rows
+
+LEGACY_COMPARISON_METRICS = [
+    ("CPU Min (%)", lambda x: float(x[4].split('/')[1])),
+    ("CPU Moyen (%)", lambda x: float(x[4].split('/')[0])),
+    ("CPU Max (%)", lambda x: float(x[4].split('/')[2])),
+    ("RAM Min (%)", lambda x: float(x[5].split('/')[1])),
+    ("RAM Moyen (%)", lambda x: float(x[5].split('/')[0])),
+    ("RAM Max (%)", lambda x: float(x[5].split('/')[2])),
+    ("Temp CPU Moyenne (°C)", lambda x: float(x[6][:-2])),
+    ("Core Imbalance (%)", lambda x: float(x[7])),
+]
+
+LEGACY_SCORE_MODEL = {field: {"weight": 1.0, "best": 0, "worst": 100}
+                      for field in ("avg_cpu", "avg_ram", "avg_cpu_temp", "core_imbalance")}
+
+def legacy_scores(rows):
+    scores = {}
+    for row in rows:
+        score = (float(row[5].split('/')[0]) + float(row[6].split('/')[0]) + float(row[7][:-2]) + float(row[8])) / 4
+        scores[row[0]] = 100 - score
+    return scores
+
+def legacy_comparison_data(rows):
+    games = [row[0] for row in rows]
+    colors = list(mcolors.TABLEAU_COLORS.values())[:len(games)]
+    if len(colors) < len(games):
+        colors += ["#" + ''.join([random.choice('0123456789ABCDEF') for _ in range(6)])
+                   for _ in range(len(games) - len(colors))]
+    metrics = {name: [extract(row) for row in rows] for name, extract in LEGACY_COMPARISON_METRICS}
+    scores = {}
+    for i, game in enumerate(games):
+        score = (metrics["CPU Moyen (%)"][i] + metrics["RAM Moyen (%)"][i] + metrics["Temp CPU Moyenne (°C)"][i]
+                 + metrics["Core Imbalance (%)"][i]) / 4
+        scores[game] = 100 - score
+    sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    ranking = [(game, note, games.index(game)) for game, note in sorted_scores[:3] + sorted_scores[-3:][::-1]]
+    return {"games": games, "colors": dict(zip(games, colors)), "metrics": metrics, "scores": scores,
+            "short_names": [" ".join(name.split()[:2]) for name in games], "ranking": ranking}
+
+def legacy_comparison(rows, bg_color="#121212", fg_color="#e0e0e0"):
+    data = legacy_comparison_data([row[1:10] for row in rows])
+    canvases = []
+    for name, _ in LEGACY_COMPARISON_METRICS:
+        fig = Figure(figsize=(3.5, 2.5), dpi=100, facecolor=bg_color)
+        ax = fig.add_subplot(111, facecolor=bg_color)
+        values = data["metrics"][name]
+        bars = ax.bar(range(len(values)), values, color=[data["colors"][game] for game in data["games"]], edgecolor="white")
+        ax.set_title(name, color=fg_color, fontsize=12)
+        ax.set_xticks(range(len(values)))
+        ax.set_xticklabels([])
+        max_val = max(values) * 1.2 if max(values) > 0 else 100
+        for bar, short_name in zip(bars, data["short_names"]):
+            if bar.get_height() > max_val * 0.3:
+                ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() / 2, short_name,
+                        ha="center", va="center", rotation=90, color="white", fontsize=8)
+        ax.set_ylim(0, max_val)
+        for j, val in enumerate(values):
+            ax.text(j, val + max_val * 0.05, f"{val:.1f}", ha="center", va="bottom", color=fg_color, fontsize=8)
+        canvas = FigureCanvasAgg(fig)
+        canvas.draw()
+        canvases.append(canvas)
+    fig_ranking = Figure(figsize=(3.5, 2.5), dpi=100, facecolor=bg_color)
+    ax_ranking = fig_ranking.add_subplot(111, facecolor=bg_color)
+    ax_ranking.axis('off')
+    for i, (game, note, _) in enumerate(data["ranking"]):
+        ax_ranking.text(0.05, 0.9 - i * 0.1, f"{game} - {note:.1f}", ha="left", va="top", color=fg_color, fontsize=7)
+    canvas = FigureCanvasAgg(fig_ranking)
+    canvas.draw()
+    canvases.append(canvas)
+    return canvases
+
+def bench_comparison(args):
+    with tempfile.TemporaryDirectory() as directory:
+        history = HistoryStore(os.path.join(directory, "historique.db"))
+        scorer = SessionScorer(history, LEGACY_SCORE_MODEL)
+        fields = comparison_fields(scorer)
+        for i in range(max(args.sizes)):
+            history.insert(synthetic_history_row(i))
+        pool = history.summary_rows()
+        selections = [random.sample(pool[:50], random.randint(2, args.games)) for _ in range(args.opens)]
+        print(f"Fenêtre de comparaison, {args.opens} sélections de 2 à {args.games} sessions (rendu Agg)")
+        canvas = FigureCanvasAgg(Figure(figsize=(10.5, 7.5), dpi=100, facecolor="#121212"))
+        chart = ComparisonChart(canvas.figure, "#e0e0e0", "#121212")
+
+        def update(rows, group_by=None):
+            chart.update(comparison_data(history.columns(fields, [row[0] for row in rows]), scorer, group_by))
+            canvas.draw()
+
+        for label, func in (("Figures recréées à chaque ouverture", legacy_comparison), ("Figure unique mise à jour", update)):
+            retained = []
+            selection = iter(selections)
+            report(label, timed(lambda: retained.append(func(next(selection))), args.opens))
+            retained.clear()
+            tracemalloc.start()
+            for rows in selections[:args.memory_opens]:
+                retained.append(func(rows))
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            figures = sum(len(item) for item in retained if item) or 1
+            print(f"{'  figures / mémoire après ' + str(args.memory_opens) + ' ouvertures':<40} {figures} / "
+                  f"{memory / 2**20:.1f} Mo")
+        print(f"Moteur de comparaison : chaînes affichées re-parsées contre colonnes typées, {args.repeat} répétitions")
+        for size in args.sizes:
+            rows = pool[:size]
+            ids = [row[0] for row in rows]
+            report(f"{size} sessions : chaînes + boucle", timed(lambda: legacy_comparison_data([row[1:10] for row in rows]),
+                                                                args.repeat))
+            report(f"{size} sessions : colonnes typées", timed(lambda: history.columns(fields, ids), args.repeat))
+            columns = history.columns(fields, ids)
+            for name, group_by in GROUPINGS.items():
+                report(f"{size} sessions : moteur ({name.lower()})",
+                       timed(lambda: comparison_data(columns, scorer, group_by), args.repeat))
+            data = comparison_data(columns, scorer)
+            legacy = legacy_comparison_data([row[1:10] for row in rows])
+            expected = np.array([100 - (row[10] + row[11] + row[12] + row[13]) / 4 for row in rows])
+            print(f"{'✅' if np.allclose(data['scores'], expected) else '❌'} {len(data['scores'])} scores calculés, "
+                  f"l'ancien dictionnaire n'en gardait que {len(legacy['scores'])} (homonymes écrasés)")
+            for name, group_by in GROUPINGS.items():
+                report(f"{size} sessions : rendu ({name.lower()})", timed(lambda: update(rows, group_by), 5))
+        history.close()
+
+def bench_summary(args):
+    print(f"Tri du résumé : Treeview complet contre table virtuelle, {args.repeat} répétitions")
+    key_func = lambda x: float(x.split('/')[0])
+    for count in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            history = HistoryStore(os.path.join(directory, "historique.db"))
+            for i in range(count):
+                history.insert(synthetic_history_row(i))
+            rows = history.summary_rows()
+            legacy = FakeTreeview(SUMMARY_COLUMNS)
+            report(f"{count} sessions : insertion complète",
+                   timed(lambda: [legacy.insert("", "end", values=row[1:10]) for row in rows], 1))
+            report(f"{count} sessions : tri CPU (lambdas)",
+                   timed(lambda: legacy_sort(legacy, "CPU (A/M/X)", key_func), args.repeat))
+            table = VirtualTable(FakeTreeview(SUMMARY_COLUMNS), rowheight=25,
+                                 numeric=("CPU (A/M/X)", "RAM (A/M/X)", "CPU Temp (A)", "Core Imbalance"))
+            report(f"{count} sessions : chargement virtuel", timed(lambda: table.append([row[1:] for row in rows], [("killer",) if row[9] == "KILLER" else () for row in rows]), 1))
+            report(f"{count} sessions : tri CPU (virtuel)", timed(lambda: table.sort("CPU (A/M/X)"), args.repeat))
+            report(f"{count} sessions : défilement d'une page",
+                   timed(lambda: table.scroll_to(table.offset + table.visible), args.repeat))
+            print(f"{'  lignes matérialisées':<40} {len(legacy.children)} contre {len(table.slots)}")
+            history.close()
+
+def bench_rollup(args):
+    game = GAMES[0]
+    print(f"Agrégats par jeu et par émulateur : température moyenne de {game}, {args.repeat} répétitions")
+    for count in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "historique.db")
+            history = HistoryStore(path)
+            rows = [history.convert(synthetic_history_row(i)) for i in range(count)]
+            placeholders = ", ".join("?" for _ in history.fields)
+            with history.lock, history.conn:
+                history.conn.executemany(f"INSERT INTO sessions ({', '.join(history.fields)}) VALUES ({placeholders})", rows)
+                history.update_rollups(0)
+            filename = os.path.join(directory, "historique.csv")
+            history.export_csv(filename)
+
+            def scan_csv():
+                total = weight = 0.0
+                with open(filename, mode="r", newline="") as csvfile:
+                    for row in csv.DictReader(csvfile):
+                        if row["game"] == game:
+                            duration = max(time.mktime(time.strptime(row["session_end"], "%Y-%m-%d %H:%M:%S")) -
+                                           time.mktime(time.strptime(row["session_start"], "%Y-%m-%d %H:%M:%S")), 1)
+                            total += float(row["avg_cpu_temp"]) * duration
+                            weight += duration
+                return total / weight
+
+            def group_by():
+                with history.lock:
+                    return history.conn.execute(
+                        f"SELECT total(avg_cpu_temp * {ROLLUP_WEIGHT}) / total({ROLLUP_WEIGHT}) "
+                        f"FROM (SELECT *, {ROLLUP_DURATION} AS duration FROM sessions WHERE game = ?)",
+                        (game,)).fetchone()[0]
+
+            def lookup():
+                return next(row["avg_cpu_temp"] for row in history.rollups("game") if row["name"] == game)
+
+            results = []
+            report(f"{count} sessions : parcours du CSV", timed(lambda: results.append(scan_csv()), args.repeat))
+            report(f"{count} sessions : GROUP BY sur sessions", timed(lambda: results.append(group_by()), args.repeat))
+            report(f"{count} sessions : table d'agrégats", timed(lambda: results.append(lookup()), args.repeat))
+            print(f"{'✅' if np.allclose(results, results[-1], atol=0.05) else '❌'} {game} : "
+                  f"{results[-1]:.2f}°C par les trois chemins")
+
+            extra = [synthetic_history_row(count + i) for i in range(args.inserts)]
+            raw = iter(extra)
+
+            def insert_raw():
+                with history.lock, history.conn:
+                    history.conn.execute(f"INSERT INTO sessions ({', '.join(history.fields)}) VALUES ({placeholders})",
+                                         history.convert(next(raw)))
+
+            report(f"{count} sessions : INSERT seul", timed(insert_raw, args.inserts))
+            with history.lock, history.conn:
+                history.conn.execute("DELETE FROM sessions WHERE id > ?", (count,))
+            upsert = iter(extra)
+            report(f"{count} sessions : INSERT + agrégats", timed(lambda: history.insert(next(upsert)), args.inserts))
+
+            query = f"SELECT kind, name, {', '.join(name for name, _, _ in ROLLUP_COLUMNS)} FROM rollups ORDER BY 1, 2"
+            with history.lock:
+                incremental = [tuple(row) for row in history.conn.execute(query)]
+            with history.lock, history.conn:
+                history.conn.execute("DELETE FROM rollups")
+                history.update_rollups(0)
+                full = [tuple(row) for row in history.conn.execute(query)]
+            same = len(incremental) == len(full) and all(
+                a[:2] == b[:2] and np.allclose([float(x or 0) for x in a[2:] if not isinstance(x, str)],
+                                               [float(x or 0) for x in b[2:] if not isinstance(x, str)])
+                for a, b in zip(incremental, full))
+            print(f"{'✅' if same else '❌'} {len(full)} agrégats incrémentaux identiques au recalcul complet")
+            history.close()
+            report(f"{count} sessions : réouverture", timed(lambda: HistoryStore(path).close(), args.repeat))
+
+            def rebuild():
+                connection = sqlite3.connect(path)
+                with connection:
+                    connection.execute("DROP TABLE rollups")
+                connection.close()
+                started = time.perf_counter()
+                HistoryStore(path).close()
+                return (time.perf_counter() - started) * 1000
+
+            report(f"{count} sessions : reconstruction", [rebuild() for _ in range(max(1, args.repeat // 5))])
+
+def bench_score(args):
+    print(f"Modèle de score : boucle sur les chaînes du résumé contre passe vectorisée en cache, {args.repeat} répétitions")
+    for count in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            history = HistoryStore(os.path.join(directory, "historique.db"))
+            rows = [history.convert(synthetic_history_row(i)) for i in range(count)]
+            placeholders = ", ".join("?" for _ in history.fields)
+            with history.lock, history.conn:
+                history.conn.executemany(f"INSERT INTO sessions ({', '.join(history.fields)}) VALUES ({placeholders})", rows)
+            report(f"{count} sessions : boucle sur les chaînes",
+                   timed(lambda: legacy_scores([row[:10] for row in history.summary_rows()]), args.repeat))
+            report(f"{count} sessions : passe complète",
+                   timed(lambda: SessionScorer(history).refresh(), args.repeat))
+            scorer = SessionScorer(history)
+            scorer.refresh()
+            report(f"{count} sessions : cache sans changement", timed(scorer.refresh, args.repeat))
+            extra = iter(synthetic_history_row(count + i) for i in range(args.repeat))
+            report(f"{count} sessions : une session ajoutée",
+                   timed(lambda: (history.insert(next(extra)), scorer.refresh()), args.repeat))
+            report(f"{count} sessions : poids modifiés",
+                   timed(lambda: (scorer.set_model(LEGACY_SCORE_MODEL), scorer.refresh()), args.repeat))
+            scorer.set_model(json.loads(json.dumps(DEFAULT_SCORE_MODEL)))
+            ids, scores = scorer.refresh()
+            selection = np.sort(np.random.choice(ids, 20, replace=False))
+            report(f"{count} sessions : 20 scores par id", timed(lambda: scorer.lookup(selection), args.repeat))
+            report(f"{count} sessions : classement complet", timed(lambda: np.argsort(-scores, kind="stable"), args.repeat))
+            fresh_ids, fresh = SessionScorer(history).refresh()
+            print(f"{'✅' if np.array_equal(ids, fresh_ids) and np.allclose(scores, fresh) else '❌'} "
+                  f"{len(ids)} scores incrémentaux identiques à une passe complète")
+            summary = history.summary_rows()
+            expected = legacy_scores([(row[0],) + row[1:10] for row in summary])
+            legacy = SessionScorer(history, LEGACY_SCORE_MODEL).lookup(np.array([row[0] for row in summary]))
+            same = np.allclose(legacy, [expected[row[0]] for row in summary], atol=0.1)
+            print(f"{'✅' if same else '❌'} le modèle à poids égaux reproduit l'ancienne formule")
+            history.clear()
+            print(f"{'✅' if len(scorer.refresh()[0]) == 0 else '❌'} cache invalidé par l'effacement de l'historique")
+            history.close()
+
+PIPELINE_STAGES = [
+    ("parse_stats_frame", None),
+    ("update_cpu_usage", lambda monitor, stats: monitor.update_cpu_usage(stats["cpu"], stats["cores"])),
+    ("update_process", lambda monitor, stats: monitor.update_process(stats.get("process"))),
+    ("update_ram_usage", lambda monitor, stats: monitor.update_ram_usage(stats["mem"])),
+    ("update_cpu_temp_usage", lambda monitor, stats: monitor.update_cpu_temp_usage(stats["temp"])),
+    ("update_clock", lambda monitor, stats: monitor.update_clock(stats)),
+    ("update_game", lambda monitor, stats: monitor.update_game(stats["game"])),
+    ("update_emulator", lambda monitor, stats: monitor.update_emulator(stats["emulator"])),
+    ("update_envelopes", lambda monitor, stats: monitor.update_envelopes(stats.get("hires"))),
+    ("update_misc", lambda monitor, stats: monitor.update_misc()),
+]
+
+def write_history(filename, count):
+    with open(filename, mode="w", newline="") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=HISTORY_FIELDS)
+        writer.writeheader()
+        for i in range(count):
+            writer.writerow(synthetic_history_row(i))
+
+def pipeline_monitor(directory, count, clock):
+    history_csv = os.path.join(directory, "historique_centralise.csv")
+    write_history(history_csv, count)
+    history = HistoryStore(os.path.join(directory, "historique.db"))
+    history.import_csv(history_csv)
+    store = SampleStore(os.path.join(directory, "samples"))
+    return HostMonitor("recalbox", store, history, history_csv, clock), store, history
+
+def compare_baseline(results, filename, tolerance, floor):
+    with open(filename) as f:
+        baseline = json.load(f)
+    regressions = 0
+    print(f"Comparaison avec {filename} (tolérance {tolerance:g} % et {floor:g} ms)")
+    for name, result in results.items():
+        value, unit = result["p50"], result["unit"]
+        if name not in baseline:
+            print(f"{name:<40} {value:8.2f} {unit}  (nouveau)")
+            continue
+        reference = baseline[name]["p50"]
+        delta = (value - reference) / reference * 100 if reference > 0 else 0.0
+        regressed = delta > tolerance and (value - reference) * (0.001 if unit == "µs" else 1) > floor
+        regressions += regressed
+        print(f"{'❌' if regressed else '✅'} {name:<38} {reference:8.2f} -> {value:8.2f} {unit}  ({delta:+6.1f} %)")
+    return regressions
+
+def bench_pipeline(args):
+    random.seed(args.seed)
+    results = {}
+
+    def case(name, values, unit="ms"):
+        report(name, values, unit)
+        if values:
+            results[name] = {"p50": percentile(values, 50), "unit": unit}
+
+    server = FakeRecalboxServer(latency=args.latency, profile=args.profile, session_ticks=args.session)
+    server.start()
+    config = dict(load_config(), stream_mode=False, ssh_command_timeout=5)
+    manager = SSHManager("127.0.0.1", server.port, "root", "recalboxroot", config)
+    print(f"Pipeline d'échantillonnage, profil {args.profile}, intervalle {args.interval * 1000:.0f} ms, "
+          f"hôte simulé 127.0.0.1:{server.port} (latence {args.latency * 1000:.0f} ms)")
+    fetches = timed(lambda: fetch_all_stats(manager), args.fetches)
+    valid = fetch_all_stats(manager)
+    manager.close()
+    server.stop()
+    if not valid or not valid["cpu"] or not valid["game"] and args.profile != "idle":
+        print("❌ Sortie de l'hôte simulé illisible.")
+        return 1
+    case("fetch_all_stats (SSH)", fetches)
+
+    host = FakeRecalboxHost(args.profile, session_ticks=args.session, seed=args.seed)
+    now = [time.time()]
+    clock = lambda: now[0]
+    stage_times = {name: [] for name, _ in PIPELINE_STAGES}
+    process_times = []
+    with tempfile.TemporaryDirectory() as directory:
+        monitor, store, history = pipeline_monitor(directory, 0, clock)
+        reference = HostMonitor("reference", history_csv=None, clock=clock)
+        for _ in range(args.ticks):
+            now[0] += args.interval
+            output = host.run(EXEC_STATS_COMMAND)[0]
+            started = time.perf_counter()
+            stats = parse_stats_frame(output.splitlines())
+            stage_times["parse_stats_frame"].append((time.perf_counter() - started) * 1e6)
+            for name, stage in PIPELINE_STAGES[1:]:
+                started = time.perf_counter()
+                stage(monitor, stats)
+                stage_times[name].append((time.perf_counter() - started) * 1e6)
+                if name == "update_cpu_temp_usage":
+                    monitor.imbalance_history.append(monitor.core_imbalance)
+            started = time.perf_counter()
+            reference.process(stats)
+            process_times.append((time.perf_counter() - started) * 1e6)
+        print(f"{args.ticks} ticks, {monitor.sessions_exported} sessions exportées en route, "
+              f"alerte tueur de core : {'oui' if monitor.core_killer_alert else 'non'}")
+        for name, _ in PIPELINE_STAGES:
+            case(name, stage_times[name], "µs")
+        case("HostMonitor.process", process_times, "µs")
+        store.close()
+        history.close()
+
+    tick = [fetch + process / 1000 for fetch, process in zip(fetches * (args.ticks // len(fetches) + 1), process_times)]
+    budget = args.interval * 1000
+    print(f"{'✅' if percentile(tick, 95) < budget else '❌'} {'Budget par tick (fetch + process)':<38} "
+          f"p50 {percentile(tick, 50):.2f} ms  p95 {percentile(tick, 95):.2f} ms  sur {budget:.0f} ms "
+          f"({percentile(tick, 95) / budget * 100:.1f} %)")
+
+    for count in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            monitor, store, history = pipeline_monitor(directory, count, clock)
+            host = FakeRecalboxHost(args.profile, session_ticks=args.session * 10, seed=args.seed)
+            for _ in range(args.session):
+                now[0] += args.interval
+                monitor.process(parse_stats_frame(host.run(EXEC_STATS_COMMAND)[0].splitlines()))
+            case(f"export_current_session ({count})", timed(monitor.export_current_session, args.repeat))
+            view = SimpleNamespace(tabview=SimpleNamespace(tab=lambda name: None), history=history, summary_last_id=0,
+                                   scorer=SessionScorer(history),
+                                   summary_table=VirtualTable(FakeTreeview(SUMMARY_COLUMNS + ("Score",)), rowheight=25,
+                                                              numeric=SUMMARY_NUMERIC))
+            case(f"update_summary_tab complet ({count})",
+                 timed(lambda: App.update_summary_tab(view, full=True), args.repeat))
+            incremental = []
+            for _ in range(args.repeat):
+                monitor.export_current_session()
+                incremental.extend(timed(lambda: App.update_summary_tab(view, full=False), 1))
+            case(f"update_summary_tab incrémental ({count})", incremental)
+            store.close()
+            history.close()
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Référence enregistrée dans {args.save}")
+    if args.compare:
+        regressions = compare_baseline(results, args.compare, args.tolerance, args.floor)
+        print(f"{'❌' if regressions else '✅'} {regressions} régression(s) au-delà de {args.tolerance:g} %")
+        return 1 if regressions else 0
+    return 0
+
+def bench_profiler(args):
+    config = dict(load_config(), stream_mode=False, adaptive_refresh=False)
+    probe = StageProfiler(trace_path="trace.json")
+    bare = timed(lambda: [time.perf_counter() for _ in range(args.calls)], 5)
+    recorded = timed(lambda: [probe.record("probe", time.perf_counter()) for _ in range(args.calls)], 5)
+    print(f"Profileur par étapes : {args.ticks} ticks de collecte (exec, hôte simulé sans latence)")
+    print(f"{'Coût de record() avec trace':<40} {(min(recorded) - min(bare)) / args.calls * 1e6:8.0f} ns")
+    with tempfile.TemporaryDirectory() as directory:
+        trace_path = os.path.join(directory, "trace.json")
+        variants = {"sans profileur": None, "compteurs": StageProfiler(),
+                    "compteurs + trace": StageProfiler(trace_path=trace_path)}
+        collectors = {label: StatsCollector(FakeSSHManager("recalbox", latency=0), config,
+                                            HostMonitor("recalbox", history_csv=None), discover=False, profiler=profiler)
+                      for label, profiler in variants.items()}
+        times = {label: [] for label in variants}
+        for _ in range(args.ticks):
+            for label, collector in collectors.items():
+                started = time.perf_counter()
+                collector.collect_once()
+                times[label].append((time.perf_counter() - started) * 1e6)
+        for label in variants:
+            report(f"collect_once {label}", times[label], "µs")
+        profiler = variants["compteurs + trace"]
+        renderer = ChartRenderer(profiler=profiler)
+        histories = [deque((random.uniform(0, 100) for _ in range(60)), maxlen=60) for _ in range(args.charts)]
+        for i in range(args.charts):
+            canvas, ax, line = make_chart()
+            canvas.draw()
+            renderer.add(f"chart{i}", LiveChart(canvas, ax, line))
+        for _ in range(args.frames):
+            for i, history in enumerate(histories):
+                history.append(random.uniform(0, 100))
+                renderer.update(f"chart{i}", history)
+            renderer.flush()
+        for line in profiler.describe().split(", "):
+            print(f"  {line}")
+        started = time.perf_counter()
+        exported = profiler.export_trace()
+        export_time = (time.perf_counter() - started) * 1000
+        with open(trace_path) as f:
+            trace = json.load(f)["traceEvents"]
+        spans = [event for event in trace if event["ph"] == "X"]
+        valid = (len(spans) == exported and all(event["dur"] >= 0 for event in spans)
+                 and {event["name"] for event in spans} == set(profiler.summary()))
+        print(f"{'Trace Chrome':<40} {exported} événements, {os.path.getsize(trace_path) / 1024:.0f} Ko, "
+              f"export {export_time:.1f} ms, {'valide' if valid else 'INVALIDE'}")
+        profile_path = os.path.join(directory, "profile.prof")
+        capturing = StageProfiler()
+        capturing.capture(args.profile_ticks, ["recalbox"], profile_path)
+        collector = StatsCollector(FakeSSHManager("recalbox", latency=0), config,
+                                   HostMonitor("recalbox", history_csv=None), discover=False, profiler=capturing)
+        report("collect_once sous cProfile",
+               [value * 1000 for value in timed(collector.collect_once, args.profile_ticks)], "µs")
+        if not os.path.exists(profile_path):
+            print("❌ Profil cProfile absent.")
+            return 1
+        stats = pstats.Stats(profile_path)
+        top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:6]
+        print(f"{'Profil cProfile':<40} {len(stats.stats)} fonctions, {stats.total_calls} appels")
+        for (filename, lineno, function), (_, _, _, cumulative, _) in top:
+            print(f"  {function:<30} {cumulative * 1e6 / args.profile_ticks:8.1f} µs/tick cumulés  "
+                  f"({os.path.basename(filename)}:{lineno})")
+    return 0
+
+FAKE_EMULATOR = """
+import ctypes, sys, threading, time
+libc = ctypes.CDLL(None)
+def worker(name, hot):
+    libc.prctl(15, name.encode(), 0, 0, 0)
+    while True:
+        if not hot:
+            time.sleep(0.05)
+for i in range(int(sys.argv[1]) - 2):
+    threading.Thread(target=worker, args=("worker%d" % i, False), daemon=True).start()
+threading.Thread(target=worker, args=("hot-spinner", True), daemon=True).start()
+time.sleep(3600)
+"""
+
+LEGACY_PROCESS_COMMAND = (
+    "pid=$(pidof retroarch | cut -d ' ' -f 1); "
+    "if [ -n \"$pid\" ]; then echo \"pstat $(cat /proc/$pid/stat)\"; "
+    "grep -E '^(VmRSS|Threads|voluntary_ctxt_switches|nonvoluntary_ctxt_switches|Cpus_allowed_list):' "
+    "/proc/$pid/status | sed 's/^/pstatus /; s/://'; "
+    "for t in /proc/$pid/task/*/stat; do echo \"tstat $(cat $t)\"; done; fi")
+
+FAKE_VCGENCMD = """#!/bin/sh
+echo "$*" >> "$(dirname "$0")/appels.log"
+case "$1" in
+    measure_clock) echo "frequency(48)=1500345728" ;;
+    get_throttled) echo "throttled=0x50005" ;;
+    measure_volts) echo "volt=0.8600V" ;;
+esac
+"""
+
+def local_agent_clock_run(interval, duration):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "vcgencmd")
+        with open(path, "w") as f:
+            f.write(FAKE_VCGENCMD)
+        os.chmod(path, 0o755)
+        env = dict(os.environ, PATH=directory + os.pathsep + os.environ["PATH"])
+        process = subprocess.Popen(shlex.split(build_stream_command(interval)), stdout=subprocess.PIPE,
+                                   stdin=subprocess.PIPE, text=True, env=env)
+        frames, builds, clock = 0, [], {}
+        deadline = time.time() + duration
+        for line in process.stdout:
+            if line.startswith("@@END"):
+                frames += 1
+                builds.append(int(line.split()[2]) / 1000)
+                if time.time() >= deadline:
+                    break
+            elif line.split(" ", 1)[0] in CLOCK_PARSERS:
+                key, value = line.split(" ", 1)
+                clock[key] = value.strip()
+        cpu = process_cpu_seconds(process.pid)
+        process.kill()
+        process.wait()
+        log = os.path.join(directory, "appels.log")
+        calls = open(log).read().splitlines() if os.path.exists(log) else []
+    return frames, builds, calls, cpu, clock
+
+def run_shell(command):
+    return subprocess.run(["sh", "-c", command], capture_output=True, text=True).stdout
+
+def bench_process(args):
+    base_command = EXEC_STATS_COMMAND[:EXEC_STATS_COMMAND.index("pid=$(pidof")].rstrip("; ")
+    emulator = subprocess.Popen(["retroarch", "-c", FAKE_EMULATOR, str(args.threads)], executable=sys.executable)
+    try:
+        time.sleep(1)
+        print(f"Attribution par processus : émulateur local de {args.threads} threads (pid {emulator.pid}), "
+              f"{args.repeat} exécutions de la commande exec")
+        report("Commande sans attribution", timed(lambda: run_shell(base_command), args.repeat))
+        report("Attribution, un cat par thread", timed(lambda: run_shell(base_command + "; " + LEGACY_PROCESS_COMMAND),
+                                                       args.repeat))
+        outputs = []
+        report("Attribution, un seul awk", timed(lambda: outputs.append(run_shell(EXEC_STATS_COMMAND)), args.repeat))
+        frames = [parse_stats_frame(output.splitlines()) for output in outputs]
+        threads = len(frames[-1].get("process", {}).get("threads", []))
+        monitor = HostMonitor("local", history_csv=None)
+        update_times = []
+        for stats in frames:
+            monitor.update_cpu_usage(stats["cpu"], stats["cores"])
+            started = time.perf_counter()
+            monitor.update_process(stats.get("process"))
+            update_times.append((time.perf_counter() - started) * 1e6)
+        report("update_process", update_times, "µs")
+        sampler = monitor.process_sampler
+        hot = sampler.hot_thread()
+        print(f"{'✅' if 'hot-spinner' in hot else '❌'} {threads} threads suivis, RSS {sampler.rss:.1f} Mo, "
+              f"cores autorisés {sampler.affinity}, thread chaud : {hot or 'aucun'}")
+    finally:
+        emulator.kill()
+        emulator.wait()
+    host = FakeRecalboxHost("killer")
+    monitor = HostMonitor("recalbox", history_csv=None)
+    for _ in range(30):
+        monitor.process(parse_stats_frame(host.run(EXEC_STATS_COMMAND)[0].splitlines()))
+    summary = monitor.process_sampler.summary()
+    print(f"{'✅' if monitor.killer_thread else '❌'} Hôte simulé (profil killer) : tueur de core "
+          f"{'détecté' if monitor.core_killer_alert else 'non détecté'}, thread {monitor.killer_thread or 'inconnu'}, "
+          f"émulateur {summary['avg_emulator_cpu']:.1f}% contre autres {summary['avg_other_cpu']:.1f}%")
+
+CLOCK_PREFIXES = ('echo "freq ', 'echo "throttled ', 'echo "volts ', 'echo "zone ')
+
+def bench_clock(args):
+    base_command = "; ".join(part for part in EXEC_STATS_COMMAND.split("; ") if not part.startswith(CLOCK_PREFIXES))
+    print(f"Télémétrie horloge et bridage : {args.repeat} exécutions locales de la commande exec, "
+          f"{args.ticks} ticks sur l'hôte simulé (profil thermal)")
+    report("Commande sans horloge", timed(lambda: run_shell(base_command), args.repeat))
+    report("Commande avec horloge", timed(lambda: run_shell(EXEC_STATS_COMMAND), args.repeat))
+    host = FakeRecalboxHost("thermal", session_ticks=args.ticks * 2)
+    outputs, flags, freqs = [], [], []
+    for _ in range(args.ticks):
+        outputs.append(host.run(EXEC_STATS_COMMAND)[0].splitlines())
+        flags.append(host.throttled)
+        freqs.append(host.freq)
+    legacy = [[line for line in lines if line.split(" ", 1)[0] not in CLOCK_PARSERS] for lines in outputs]
+    for name, frames in (("sans horloge", iter(legacy)), ("avec horloge", iter(outputs))):
+        times = timed(lambda: parse_stats_frame(next(frames)), args.ticks)
+        report(f"parse_stats_frame {name}", [value * 1000 for value in times], "µs")
+    with tempfile.TemporaryDirectory() as directory:
+        now = [1700000000.0]
+        history_csv = os.path.join(directory, "historique_centralise.csv")
+        monitor = HostMonitor("recalbox", history_csv=history_csv, clock=lambda: now[0])
+        frames = [parse_stats_frame(lines) for lines in outputs]
+        clock_times, process_times = [], []
+        for stats in frames:
+            now[0] += 1.0
+            started = time.perf_counter()
+            monitor.update_clock(stats)
+            clock_times.append((time.perf_counter() - started) * 1e6)
+            started = time.perf_counter()
+            monitor.process(stats)
+            process_times.append((time.perf_counter() - started) * 1e6)
+        report("update_clock", clock_times, "µs")
+        report("HostMonitor.process", process_times, "µs")
+        monitor.export_current_session()
+        with open(history_csv, newline="") as f:
+            row = next(csv.DictReader(f))
+        expected = sum(1 for flag in flags[1:] if flag & 0xF)
+        print(f"{'✅' if abs(float(row['throttled_time']) - expected) < 0.5 else '❌'} Bridé {row['throttled_time']} s "
+              f"(attendu {expected} s), drapeaux {int(float(row['throttled_flags'])):#x}")
+        print(f"{'✅' if float(row['min_cpu_freq']) == min(freqs) and float(row['max_cpu_freq']) == max(freqs) else '❌'} "
+              f"Fréquence min/moy/max {row['min_cpu_freq']}/{row['avg_cpu_freq']}/{row['max_cpu_freq']} MHz "
+              f"(attendu {min(freqs)}/{sum(freqs) / len(freqs):.1f}/{max(freqs)}), tension {row['avg_core_mv']} mV, "
+              f"zone max {row['max_zone_temp']}°C")
+        directory = os.path.join(directory, "samples")
+        store = SampleStore(directory, columns=SAMPLE_COLUMNS)
+        session_id = store.begin_session()
+        for sample in synthetic_samples(args.samples):
+            store.append(session_id, sample)
+        store.close()
+        started = time.perf_counter()
+        store = SampleStore(directory)
+        reopen = (time.perf_counter() - started) * 1000
+        kept = len(store.column("cpu_freq"))
+        store.close()
+        print(f"{'✅' if kept == args.samples else '❌'} SampleStore existant rouvert avec les colonnes d'horloge : "
+              f"{kept}/{args.samples} échantillons conservés en {reopen:.1f} ms")
+    frames, builds, calls, cpu, clock = local_agent_clock_run(args.agent_interval, args.agent_duration)
+    expected = int(args.agent_duration // 10) + 1
+    polls = sum(1 for call in calls if call == "get_throttled")
+    print(f"Agent de streaming local ({args.agent_interval:g} s, {args.agent_duration:g} s, vcgencmd simulé) : "
+          f"{frames} trames, CPU agent {cpu / args.agent_duration * 100:.2f} %")
+    report("Construction trame agent", builds)
+    print(f"{'✅' if polls <= expected else '❌'} {len(calls)} appels vcgencmd pour {frames} trames "
+          f"({polls} relevés bridage/tension, attendu au plus {expected}), "
+          f"fréquence {'sysfs' if 'measure_clock arm' not in calls else 'vcgencmd'}, dernière trame : {', '.join(f'{key} {value}' for key, value in clock.items())}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks du dashboard Recalbox")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    stream = sub.add_parser("stream", help="exec_command par tick contre agent de streaming")
+    stream.add_argument("--host", required=True)
+    stream.add_argument("--password", default="recalboxroot")
+    stream.add_argument("--interval", type=float, default=1.0)
+    stream.add_argument("--duration", type=float, default=30.0)
+    stream.set_defaults(func=bench_stream)
+    hires = sub.add_parser("hires", help="capture haute résolution : fréquence soutenue contre charge CPU")
+    hires.add_argument("--host")
+    hires.add_argument("--password", default="recalboxroot")
+    hires.add_argument("--rates", type=float, nargs="+", default=[0, 10, 50, 100])
+    hires.add_argument("--duration", type=float, default=10.0)
+    hires.set_defaults(func=bench_hires)
+    render = sub.add_parser("render", help="rendu par tick des graphiques live")
+    render.add_argument("--charts", type=int, default=8)
+    render.add_argument("--ticks", type=int, default=300)
+    render.set_defaults(func=bench_render)
+    fleet = sub.add_parser("fleet", help="échantillonnage concurrent d'hôtes simulés")
+    fleet.add_argument("--hosts", type=int, default=50)
+    fleet.add_argument("--latency", type=float, default=0.02)
+    fleet.add_argument("--interval", type=float, default=1.0)
+    fleet.add_argument("--duration", type=float, default=15.0)
+    fleet.set_defaults(func=bench_fleet)
+    discovery = sub.add_parser("discovery", help="balayage TCP asynchrone contre des répondeurs SSH locaux")
+    discovery.add_argument("--subnets", nargs="+", default=["127.0.1.0/24", "127.0.4.0/22"])
+    discovery.add_argument("--port", type=int, default=2222)
+    discovery.add_argument("--responders", type=int, default=3)
+    discovery.add_argument("--banner-delay", type=float, default=0.01)
+    discovery.add_argument("--timeout", type=float, default=0.5)
+    discovery.add_argument("--concurrency", type=int, default=256)
+    discovery.add_argument("--repeat", type=int, default=5)
+    discovery.set_defaults(func=bench_discovery)
+    store = sub.add_parser("store", help="stockage colonnaire contre deque de dicts")
+    store.add_argument("--samples", type=int, default=200000)
+    store.set_defaults(func=bench_store)
+    history = sub.add_parser("history", help="chargement du résumé : CSV contre SQLite")
+    history.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    history.add_argument("--repeat", type=int, default=5)
+    history.set_defaults(func=bench_history)
+    export = sub.add_parser("export", help="agrégation à l'export : deque contre accumulateurs")
+    export.add_argument("--sizes", type=int, nargs="+", default=[600, 3600, 36000])
+    export.add_argument("--repeat", type=int, default=20)
+    export.set_defaults(func=bench_export)
+    ssh = sub.add_parser("ssh", help="transport SSH : latence, canaux, échéances et reprise contre un serveur simulé")
+    ssh.add_argument("--latency", type=float, default=0.02)
+    ssh.add_argument("--interval", type=float, default=0.5)
+    ssh.add_argument("--timeout", type=float, default=1.0)
+    ssh.add_argument("--channels", type=int, default=4)
+    ssh.add_argument("--commands", type=int, default=200)
+    ssh.add_argument("--base-delay", type=float, default=0.5)
+    ssh.add_argument("--max-delay", type=float, default=8.0)
+    ssh.add_argument("--outages", type=float, nargs="+", default=[1, 3, 10])
+    ssh.set_defaults(func=bench_ssh)
+    startup = sub.add_parser("startup", help="démarrage et mémoire : collecteur sans interface contre dashboard")
+    startup.add_argument("--repeat", type=int, default=5)
+    startup.add_argument("--duration", type=float, default=3.0)
+    startup.set_defaults(func=bench_startup)
+    metrics = sub.add_parser("metrics", help="export OpenMetrics : latence de scrape et cadence d'échantillonnage sous charge")
+    metrics.add_argument("--hosts", type=int, default=8)
+    metrics.add_argument("--interval", type=float, default=0.5)
+    metrics.add_argument("--latency", type=float, default=0.02)
+    metrics.add_argument("--rate", type=int, default=500)
+    metrics.add_argument("--threads", type=int, default=8)
+    metrics.add_argument("--duration", type=float, default=10.0)
+    metrics.set_defaults(func=bench_metrics)
+    replay = sub.add_parser("replay", help="rejeu d'un enregistrement : débit max, rendu, retour arrière et cadence")
+    replay.add_argument("--hosts", type=int, default=2)
+    replay.add_argument("--samples", type=int, default=3600)
+    replay.add_argument("--session", type=int, default=600)
+    replay.add_argument("--render-samples", type=int, default=600)
+    replay.add_argument("--speed", type=float, default=10.0)
+    replay.add_argument("--duration", type=float, default=3.0)
+    replay.add_argument("--seed", type=int, default=41)
+    replay.set_defaults(func=bench_replay)
+    adaptive = sub.add_parser("adaptive", help="rafraîchissement adaptatif : fixe contre adaptatif sur une flotte simulée")
+    adaptive.add_argument("--hosts", type=int, default=50)
+    adaptive.add_argument("--latency", type=float, default=0.02)
+    adaptive.add_argument("--interval", type=float, default=1.0)
+    adaptive.add_argument("--duration", type=float, default=60.0)
+    adaptive.set_defaults(func=bench_adaptive)
+    parser_bench = sub.add_parser("parser", help="parseur de sortie distante : positionnel contre étiqueté (fuzz)")
+    parser_bench.add_argument("--samples", type=int, default=20000)
+    parser_bench.add_argument("--seed", type=int, default=1)
+    parser_bench.set_defaults(func=bench_parser)
+    cores = sub.add_parser("cores", help="charge par core : boucle par ligne contre matrice NumPy")
+    cores.add_argument("--cores", type=int, nargs="+", default=[4, 8, 16, 64])
+    cores.add_argument("--ticks", type=int, default=5000)
+    cores.set_defaults(func=bench_cores)
+    comparison = sub.add_parser("comparison", help="fenêtre de comparaison : figures recréées contre figure réutilisée")
+    comparison.add_argument("--opens", type=int, default=30)
+    comparison.add_argument("--games", type=int, default=10)
+    comparison.add_argument("--memory-opens", type=int, default=10)
+    comparison.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    comparison.add_argument("--repeat", type=int, default=20)
+    comparison.set_defaults(func=bench_comparison)
+    summary = sub.add_parser("summary", help="tri du résumé : Treeview complet contre table virtuelle")
+    summary.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    summary.add_argument("--repeat", type=int, default=5)
+    summary.set_defaults(func=bench_summary)
+    pipeline = sub.add_parser("pipeline", help="budget par tick : fetch, parse, update_*, export et résumé sur hôte simulé")
+    pipeline.add_argument("--profile", choices=sorted(LOAD_PROFILES), default="steady")
+    pipeline.add_argument("--latency", type=float, default=0.0)
+    pipeline.add_argument("--interval", type=float, default=1.0)
+    pipeline.add_argument("--fetches", type=int, default=200)
+    pipeline.add_argument("--ticks", type=int, default=3600)
+    pipeline.add_argument("--session", type=int, default=1800)
+    pipeline.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    pipeline.add_argument("--repeat", type=int, default=20)
+    pipeline.add_argument("--seed", type=int, default=41)
+    pipeline.add_argument("--save", metavar="FICHIER")
+    pipeline.add_argument("--compare", metavar="FICHIER")
+    pipeline.add_argument("--tolerance", type=float, default=25.0)
+    pipeline.add_argument("--floor", type=float, default=0.01)
+    pipeline.set_defaults(func=bench_pipeline)
+    profiler = sub.add_parser("profiler", help="profileur par étapes : surcoût des compteurs, trace Chrome et capture cProfile")
+    profiler.add_argument("--ticks", type=int, default=5000)
+    profiler.add_argument("--calls", type=int, default=100000)
+    profiler.add_argument("--charts", type=int, default=8)
+    profiler.add_argument("--frames", type=int, default=200)
+    profiler.add_argument("--profile-ticks", type=int, default=500)
+    profiler.set_defaults(func=bench_profiler)
+    process = sub.add_parser("process", help="attribution par processus : coût de la commande exec et thread chaud")
+    process.add_argument("--threads", type=int, default=24)
+    process.add_argument("--repeat", type=int, default=50)
+    process.set_defaults(func=bench_process)
+    clock = sub.add_parser("clock", help="télémétrie horloge et bridage : coût distant, parse et agrégats de session")
+    clock.add_argument("--ticks", type=int, default=600)
+    clock.add_argument("--repeat", type=int, default=50)
+    clock.add_argument("--samples", type=int, default=100000)
+    clock.add_argument("--agent-interval", type=float, default=0.1)
+    clock.add_argument("--agent-duration", type=float, default=12.0)
+    clock.set_defaults(func=bench_clock)
+    rollup = sub.add_parser("rollup", help="agrégats par jeu : parcours CSV, GROUP BY et table maintenue à l'insertion")
+    rollup.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    rollup.add_argument("--repeat", type=int, default=20)
+    rollup.add_argument("--inserts", type=int, default=200)
+    rollup.set_defaults(func=bench_rollup)
+    score = sub.add_parser("score", help="modèle de score : passe vectorisée sur tout l'historique et cache incrémental")
+    score.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    score.add_argument("--repeat", type=int, default=20)
+    score.set_defaults(func=bench_score)
+    args = parser.parse_args()
+    return args.func(args)
+
+if __name__ == "__main__":
+    raise SystemExit(main())
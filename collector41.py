@@ -0,0 +1,2387 @@
+import paramiko
+import time
+import datetime
+from collections import deque
+import socket
+import logging
+import os
+import json
+import csv
+import concurrent.futures
+import cProfile
+import pstats
+import re
+import random
+import base64
+import signal
+import threading
+import numpy as np
+import math
+import argparse
+import asyncio
+import ipaddress
+import sqlite3
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    filename="dashboard.log",
+    filemode="a"
+)
+
+
+CONFIG_FILE = "config.json"
+DISCOVERY_CACHE_FILE = "discovery_cache.json"
+HISTORY_CSV_FILE = "historique_centralise.csv"
+HISTORY_LOCK = threading.Lock()
+DEFAULT_SCORE_MODEL = {
+    "avg_cpu": {"weight": 1.0, "best": 0, "worst": 100},
+    "max_cpu": {"weight": 0.5, "best": 0, "worst": 100},
+    "avg_ram": {"weight": 1.0, "best": 0, "worst": 100},
+    "avg_cpu_temp": {"weight": 1.0, "best": 40, "worst": 85},
+    "max_cpu_temp": {"weight": 0.5, "best": 40, "worst": 85},
+    "core_imbalance": {"weight": 1.0, "best": 0, "worst": 100},
+    "throttled_time": {"weight": 1.0, "best": 0, "worst": 60},
+    "core_killer": {"weight": 2.0, "best": 0, "worst": 1},
+}
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def smooth_transition(current, target, alpha=0.2, seuil=20):
+    if isinstance(target, np.ndarray):
+        return np.where(np.abs(target - current) > seuil, target, current + alpha * (target - current))
+    if abs(target - current) > seuil:
+        return target
+    return current + alpha * (target - current)
+
+def load_config():
+    default_config = {
+        "refresh_interval": 1000,
+        "cpu_alert_threshold": 90.0,
+        "temp_alert_threshold": 80.0,
+        "net_interface": "wlan0",
+        "font_size": 18,
+        "enable_history": True,
+        "bar_width": 200,
+        "bar_height": 20,
+        "cpu_alert_color": "#FF0000",
+        "temp_alert_color": "#FFA500",
+        "window_width": 940,
+        "window_height": 380,
+        "font_color": "White",
+        "row_spacing": 5,
+        "col_spacing": 10,
+        "char_spacing": 0,
+        "enable_animations": False,
+        "stream_mode": True,
+        "stream_poll_interval": 100,
+        "hires_rate": 0,
+        "adaptive_refresh": True,
+        "idle_interval": 5000,
+        "fast_interval": 500,
+        "adaptive_temp_rise": 1.0,
+        "adaptive_imbalance": 50,
+        "adaptive_boost": 10,
+        "ui_poll_interval": 100,
+        "sample_queue_size": 32,
+        "reconnect_max_delay": 60,
+        "reconnect_base_delay": 1,
+        "ssh_keepalive": 15,
+        "ssh_connect_timeout": 5,
+        "ssh_command_timeout": 5,
+        "ssh_max_channels": 4,
+        "ssh_failures_before_discovery": 3,
+        "fleet_hosts": [],
+        "fleet_workers": 8,
+        "fleet_overview_interval": 1000,
+        "scan_subnets": ["192.168.1.0/24"],
+        "scan_port": 22,
+        "scan_timeout": 0.5,
+        "scan_concurrency": 256,
+        "discovery_cache_ttl": 86400,
+        "enable_sample_store": True,
+        "sample_store_dir": "samples",
+        "history_db": "historique.db",
+        "metrics_port": 0,
+        "metrics_address": "127.0.0.1",
+        "record_samples": False,
+        "recordings_dir": "recordings",
+        "profiler_window": 600,
+        "profiler_overlay": False,
+        "trace_file": "",
+        "profile_ticks": 0,
+        "score_model": DEFAULT_SCORE_MODEL,
+    }
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE, "r") as f:
+                config = json.load(f)
+            for key, value in default_config.items():
+                if key not in config:
+                    config[key] = value
+            logging.info("Configuration chargée depuis config.json")
+            return config
+        except Exception as e:
+            logging.error(f"Erreur lors du chargement de la config : {e}")
+    return default_config
+
+def save_config(config):
+    try:
+        with open(CONFIG_FILE, "w") as f:
+            json.dump(config, f, indent=4)
+        logging.info("Configuration sauvegardée dans config.json")
+    except Exception as e:
+        logging.error(f"Erreur lors de la sauvegarde de la config : {e}")
+
+def load_discovery_cache():
+    if os.path.exists(DISCOVERY_CACHE_FILE):
+        try:
+            with open(DISCOVERY_CACHE_FILE, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Erreur lors du chargement du cache de découverte : {e}")
+    return {}
+
+def save_discovery_cache(name, ip):
+    cache = load_discovery_cache()
+    cache[name] = {"ip": ip, "timestamp": time.time()}
+    try:
+        with open(DISCOVERY_CACHE_FILE, "w") as f:
+            json.dump(cache, f, indent=4)
+    except Exception as e:
+        logging.error(f"Erreur lors de la sauvegarde du cache de découverte : {e}")
+
+async def probe_ssh(ip, port, timeout):
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    try:
+        banner = await asyncio.wait_for(reader.readline(), timeout)
+    except (OSError, asyncio.TimeoutError):
+        banner = b""
+    finally:
+        writer.close()
+    if banner.startswith(b"SSH-"):
+        return ip, banner.decode(errors="replace").strip()
+    return None
+
+async def sweep_ssh_hosts(ips, port, timeout, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    async def bounded_probe(ip):
+        async with semaphore:
+            return await probe_ssh(ip, port, timeout)
+    results = await asyncio.gather(*(bounded_probe(ip) for ip in ips))
+    return [result for result in results if result]
+
+def find_ssh_candidates(config):
+    ips = []
+    for subnet in config.get("scan_subnets", ["192.168.1.0/24"]):
+        try:
+            ips.extend(str(ip) for ip in ipaddress.ip_network(subnet, strict=False).hosts())
+        except ValueError as e:
+            logging.error(f"Sous-réseau invalide '{subnet}' : {e}")
+    started = time.time()
+    candidates = asyncio.run(sweep_ssh_hosts(ips, config.get("scan_port", 22), config.get("scan_timeout", 0.5),
+                                             config.get("scan_concurrency", 256)))
+    logging.info(f"Scan TCP de {len(ips)} adresses en {time.time() - started:.2f}s : {len(candidates)} serveur(s) SSH")
+    return candidates
+
+def check_recalbox_auth(ip, port=22, timeout=2):
+    try:
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(ip, port=port, username="root", password="recalboxroot", timeout=timeout,
+                       allow_agent=False, look_for_keys=False)
+        client.close()
+        return True
+    except Exception:
+        return False
+
+def get_recalbox_ip(config=None):
+    config = config or load_config()
+    cached = load_discovery_cache().get("recalbox")
+    if cached and time.time() - cached.get("timestamp", 0) < config.get("discovery_cache_ttl", 86400):
+        if asyncio.run(probe_ssh(cached["ip"], config.get("scan_port", 22), config.get("scan_timeout", 0.5))):
+            logging.info(f"Recalbox retrouvé via le cache à l'adresse : {cached['ip']}")
+            print(f"✅ Recalbox détecté à l'adresse : {cached['ip']}")
+            return cached["ip"]
+        logging.info(f"Adresse en cache {cached['ip']} injoignable, nouvelle recherche...")
+    try:
+        ip = socket.gethostbyname("recalbox")
+        if ip.startswith("192.168"):
+            logging.info(f"Recalbox détecté via DNS à l'adresse : {ip}")
+            print(f"✅ Recalbox détecté à l'adresse : {ip}")
+            save_discovery_cache("recalbox", ip)
+            return ip
+    except socket.gaierror:
+        logging.warning("Impossible de résoudre 'recalbox' via DNS. Passage au scan...")
+    hosts = scan_recalbox_hosts(config, first_only=True)
+    if hosts:
+        save_discovery_cache("recalbox", hosts[0])
+        return hosts[0]
+    logging.error("Recalbox introuvable sur le réseau.")
+    print("❌ Recalbox introuvable sur le réseau.")
+    return None
+
+def scan_recalbox_hosts(config=None, first_only=False):
+    config = config or load_config()
+    candidates = [ip for ip, _ in find_ssh_candidates(config)]
+    port = config.get("scan_port", 22)
+    found = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(20, max(1, len(candidates)))) as executor:
+        futures = {executor.submit(check_recalbox_auth, ip, port): ip for ip in candidates}
+        for future in concurrent.futures.as_completed(futures):
+            if future.result():
+                result = futures[future]
+                logging.info(f"Recalbox détecté par scan à l'adresse : {result}")
+                print(f"✅ Recalbox détecté à l'adresse : {result}")
+                found.append(result)
+                if first_only:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+    return sorted(found, key=socket.inet_aton)
+
+class SSHManager:
+    def __init__(self, hostname, port, username, password, config=None):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.config = config or {}
+        self.client = None
+        self.connect_lock = threading.Lock()
+        self.channel_slots = threading.BoundedSemaphore(self.config.get("ssh_max_channels", 4))
+        self.failures = 0
+        self.next_attempt = 0.0
+        self.last_success = 0.0
+        self.latency = None
+        self.commands = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.stream_channel = None
+        self.stream_buffer = b""
+        self.stream_frame = None
+        self.stream_interval = 1.0
+        self.stream_slowest_interval = 1.0
+        self.stream_last_frame = 0.0
+        self.stream_frames = 0
+        self.stream_last_build_us = 0
+        self.connect()
+
+    def connect(self):
+        with self.connect_lock:
+            if self.healthy():
+                return True
+            if time.time() < self.next_attempt:
+                return False
+            self.close_client()
+            timeout = self.config.get("ssh_connect_timeout", 5)
+            try:
+                client = paramiko.SSHClient()
+                client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+                client.connect(self.hostname, self.port, self.username, self.password, timeout=timeout,
+                               banner_timeout=timeout, auth_timeout=timeout, allow_agent=False, look_for_keys=False)
+                transport = client.get_transport()
+                transport.set_keepalive(self.config.get("ssh_keepalive", 15))
+                transport.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except Exception as e:
+                logging.error(f"[Erreur SSH] Impossible de se connecter à {self.hostname} : {e}")
+                self.record_failure()
+                return False
+            self.client = client
+            self.failures = 0
+            self.next_attempt = 0.0
+            logging.info(f"Connexion SSH établie avec {self.hostname}")
+            return True
+
+    def healthy(self):
+        client = self.client
+        if client is None:
+            return False
+        transport = client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def record_failure(self):
+        self.failures += 1
+        delay = min(self.config.get("reconnect_base_delay", 1) * 2 ** (self.failures - 1),
+                    self.config.get("reconnect_max_delay", 60))
+        self.next_attempt = time.time() + delay * random.uniform(0.5, 1.0)
+
+    def health(self):
+        return {
+            "connected": self.healthy(),
+            "failures": self.failures,
+            "retry_in": max(0.0, self.next_attempt - time.time()),
+            "latency_ms": self.latency * 1000 if self.latency is not None else None,
+            "commands": self.commands,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "last_success": self.last_success,
+        }
+
+    def execute_command(self, command, timeout=None):
+        if not self.healthy() and not self.connect():
+            return "N/A"
+        timeout = timeout or self.config.get("ssh_command_timeout", 5)
+        started = time.time()
+        deadline = started + timeout
+        if not self.channel_slots.acquire(timeout=timeout):
+            logging.error(f"[Erreur SSH] Aucun canal disponible sur {self.hostname} pour '{command}'")
+            self.timeouts += 1
+            return "N/A"
+        channel = None
+        try:
+            channel = self.client.get_transport().open_session(timeout=timeout)
+            channel.settimeout(max(0.01, deadline - time.time()))
+            channel.exec_command(command)
+            chunks = []
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise socket.timeout()
+                channel.settimeout(remaining)
+                data = channel.recv(65536)
+                if not data:
+                    break
+                chunks.append(data)
+        except socket.timeout:
+            logging.error(f"[Erreur SSH] Délai de {timeout:.1f}s dépassé pour '{command}' sur {self.hostname}")
+            self.timeouts += 1
+            return "N/A"
+        except Exception as e:
+            logging.error(f"[Erreur SSH] Commande échouée '{command}' : {e}")
+            self.errors += 1
+            if not self.healthy():
+                self.close_client()
+                self.record_failure()
+            return "N/A"
+        finally:
+            if channel is not None:
+                channel.close()
+            self.channel_slots.release()
+        elapsed = time.time() - started
+        self.latency = elapsed if self.latency is None else 0.8 * self.latency + 0.2 * elapsed
+        self.last_success = time.time()
+        self.commands += 1
+        return b"".join(chunks).decode(errors="replace").strip()
+
+    def start_stream(self, interval, hires_rate=0):
+        self.stop_stream()
+        if not self.healthy() and not self.connect():
+            return False
+        try:
+            channel = self.client.get_transport().open_session(timeout=self.config.get("ssh_connect_timeout", 5))
+            channel.exec_command(build_stream_command(interval, hires_rate))
+        except Exception as e:
+            logging.error(f"[Erreur SSH] Impossible de démarrer l'agent de streaming sur {self.hostname} : {e}")
+            if not self.healthy():
+                self.close_client()
+                self.record_failure()
+            return False
+        self.stream_channel = channel
+        self.stream_buffer = b""
+        self.stream_frame = None
+        self.stream_interval = interval
+        self.stream_slowest_interval = interval
+        self.stream_last_frame = time.time()
+        self.stream_frames = 0
+        logging.info(f"Agent de streaming démarré sur {self.hostname} (intervalle {interval}s, haute résolution {hires_rate} Hz)")
+        return True
+
+    def stream_alive(self):
+        channel = self.stream_channel
+        if channel is None or channel.closed or channel.exit_status_ready():
+            return False
+        return time.time() - self.stream_last_frame < 3 * self.stream_slowest_interval + 2
+
+    def set_stream_interval(self, interval):
+        channel = self.stream_channel
+        if channel is None or interval == self.stream_interval:
+            return
+        try:
+            channel.sendall(f"interval {interval}\n".encode())
+        except Exception as e:
+            logging.error(f"[Erreur SSH] Impossible de changer l'intervalle de l'agent sur {self.hostname} : {e}")
+            return
+        self.stream_slowest_interval = max(self.stream_interval, interval)
+        self.stream_interval = interval
+
+    def read_stream_sample(self):
+        channel = self.stream_channel
+        if channel is None:
+            return None
+        latest = None
+        try:
+            while channel.recv_ready():
+                data = channel.recv(65536)
+                if not data:
+                    break
+                self.stream_buffer += data
+            if channel.exit_status_ready() and channel.recv_stderr_ready():
+                error = channel.recv_stderr(4096).decode(errors="replace").strip()
+                logging.error(f"[Erreur SSH] Agent de streaming arrêté sur {self.hostname} : {error}")
+        except Exception as e:
+            logging.error(f"[Erreur SSH] Lecture du flux échouée sur {self.hostname} : {e}")
+            self.stop_stream()
+            return None
+        *complete, self.stream_buffer = self.stream_buffer.split(b"\n")
+        for raw in complete:
+            line = raw.decode("utf-8", errors="replace").rstrip()
+            if line.startswith("@@BEGIN"):
+                self.stream_frame = []
+            elif line.startswith("@@END"):
+                if self.stream_frame is not None:
+                    latest = parse_stats_frame(self.stream_frame)
+                    self.stream_frame = None
+                    fields = line.split()
+                    self.stream_last_build_us = int(fields[2]) if len(fields) > 2 and fields[2].isdigit() else 0
+            elif self.stream_frame is not None:
+                self.stream_frame.append(line)
+        if latest is not None:
+            self.stream_last_frame = time.time()
+            self.stream_slowest_interval = self.stream_interval
+            self.stream_frames += 1
+        return latest
+
+    def stop_stream(self):
+        if self.stream_channel is not None:
+            try:
+                self.stream_channel.close()
+            except Exception:
+                pass
+            self.stream_channel = None
+
+    def close_client(self):
+        client, self.client = self.client, None
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    def close(self):
+        self.stop_stream()
+        if self.client:
+            self.close_client()
+            logging.info(f"Connexion SSH fermée pour {self.hostname}")
+
+CORE_LINE = re.compile(r"cpu\d+\s")
+TEMP_VALUE = re.compile(r"-?\d+(\.\d+)?")
+EXEC_STATS_COMMAND = "; ".join([
+    "grep '^cpu' /proc/stat",
+    "free -m | awk '/^Mem:/ {print \"mem\", $2, $3}'",
+    "echo \"temp $(vcgencmd measure_temp 2>/dev/null | grep -o '[0-9]*\\.[0-9]*' || "
+    "awk '{printf \"%.1f\", $1 / 1000}' /sys/class/thermal/thermal_zone0/temp 2>/dev/null)\"",
+    "echo \"freq $(vcgencmd measure_clock arm 2>/dev/null | grep -o '[0-9]*$' || "
+    "awk '{print $1 * 1000}' /sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq 2>/dev/null)\"",
+    "echo \"throttled $(vcgencmd get_throttled 2>/dev/null | cut -d= -f2)\"",
+    "echo \"volts $(vcgencmd measure_volts core 2>/dev/null | grep -o '[0-9.]*')\"",
+    "echo \"zone $(cat /sys/class/thermal/thermal_zone0/temp 2>/dev/null)\"",
+    "echo \"emulator $(ps aux | grep 'retroarch' | grep -Eo '([a-zA-Z0-9_]+)_libretro' | head -n 1)\"",
+    "echo \"game $(ps aux | grep 'retroarch' | grep -v 'grep' | awk '{for(i=11;i<=NF;i++) printf \"%s \", $i; print \"\"}' | head -n 1)\"",
+    "pid=$(pidof retroarch | cut -d ' ' -f 1)",
+    "if [ -n \"$pid\" ]; then awk 'FILENAME ~ /task/ { print \"tstat \" $0; next } "
+    "FILENAME ~ /status$/ { if ($1 ~ /^(VmRSS|Threads|voluntary_ctxt_switches|nonvoluntary_ctxt_switches|Cpus_allowed_list):$/) "
+    "{ sub(\":\", \"\", $1); print \"pstatus \" $0 } next } { print \"pstat \" $0 }' "
+    "/proc/$pid/stat /proc/$pid/status /proc/$pid/task/*/stat 2>/dev/null; fi",
+])
+
+def fetch_all_stats(ssh_manager, profiler=None):
+    started = time.perf_counter()
+    output = ssh_manager.execute_command(EXEC_STATS_COMMAND)
+    if profiler:
+        started = profiler.record("ssh", started)
+    if output and output != "N/A":
+        stats = parse_stats_frame(output.splitlines())
+        if profiler:
+            profiler.record("parse", started)
+        return stats
+    return None
+
+STREAM_AGENT_SCRIPT = r'''
+import array, base64, os, re, select, subprocess, sys, time, zlib
+interval = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+hires = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+libretro = re.compile(r"([a-zA-Z0-9_]+)_libretro")
+status_keys = ("VmRSS", "Threads", "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches", "Cpus_allowed_list")
+vcgencmd = ("get_throttled", "measure_volts core")
+vcgencmd_every = 10.0
+pid, args, next_scan, seq = None, "", 0.0, 0
+vcgencmd_lines, next_vcgencmd = [], 0.0
+hires_prev, hires_line = None, None
+stdin_open, stdin_buffer = True, b""
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+def read_temp():
+    try:
+        return int(read("/sys/class/thermal/thermal_zone0/temp")) / 1000.0
+    except (OSError, ValueError):
+        return 0.0
+
+def read_freq():
+    try:
+        return ["freq %d" % (int(read("/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq")) * 1000)]
+    except (OSError, ValueError):
+        return []
+
+def read_vcgencmd(commands):
+    lines = []
+    for command in commands:
+        try:
+            output = subprocess.run(["vcgencmd"] + command.split(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                    universal_newlines=True, timeout=2).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        key, _, value = output.strip().partition("=")
+        if key.startswith("frequency"):
+            lines.append("freq " + value)
+        elif key == "throttled":
+            lines.append("throttled " + value)
+        elif key == "volt":
+            lines.append("volts " + value.rstrip("V"))
+    return lines
+
+def jiffies():
+    result = []
+    for l in read("/proc/stat").splitlines():
+        if not l.startswith("cpu"):
+            break
+        v = [int(x) for x in l.split()[1:]]
+        total = sum(v)
+        result.append((total - v[3] - (v[4] if len(v) > 4 else 0), total))
+    return result
+
+def capture(until):
+    global hires_prev
+    samples, count, step, start = array.array("f"), 0, 1.0 / hires, time.time()
+    while True:
+        now = time.time()
+        current, temp = jiffies(), read_temp()
+        if hires_prev is not None and len(hires_prev) == len(current):
+            samples.append((now - start) * 1000.0)
+            for (busy, total), (prev_busy, prev_total) in zip(current, hires_prev):
+                samples.append((busy - prev_busy) * 100.0 / (total - prev_total) if total > prev_total else 0.0)
+            samples.append(temp)
+            count += 1
+        hires_prev = current
+        if now >= until:
+            break
+        time.sleep(max(0.0, min(step - (time.time() - now), until - time.time())))
+    payload = base64.b64encode(zlib.compress(samples.tobytes())).decode()
+    return "hires %d %d %s" % (len(current) + 2, count, payload)
+
+def wait_commands(poll_only=False):
+    global interval, deadline, stdin_open, stdin_buffer
+    while True:
+        timeout = 0.0 if poll_only else deadline - time.time()
+        if timeout < 0:
+            return
+        if not stdin_open:
+            time.sleep(timeout)
+            return
+        if not select.select([0], [], [], timeout)[0]:
+            return
+        data = os.read(0, 4096)
+        if not data:
+            stdin_open = False
+            continue
+        *lines, stdin_buffer = (stdin_buffer + data).split(b"\n")
+        for line in lines:
+            parts = line.split()
+            if len(parts) == 2 and parts[0] == b"interval":
+                try:
+                    interval = max(0.05, float(parts[1]))
+                except ValueError:
+                    continue
+                deadline = min(deadline, time.time() + interval)
+        if poll_only:
+            return
+
+def process_lines(pid):
+    base = "/proc/%s/" % pid
+    try:
+        lines = ["pstat " + read(base + "stat").strip()]
+        for l in read(base + "status").splitlines():
+            key, _, value = l.partition(":")
+            if key in status_keys:
+                lines.append("pstatus %s %s" % (key, value.strip()))
+        for tid in os.listdir(base + "task"):
+            try:
+                lines.append("tstat " + read(base + "task/%s/stat" % tid).strip())
+            except OSError:
+                pass
+    except OSError:
+        return []
+    return lines
+
+def find_retroarch():
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open("/proc/%s/cmdline" % entry, "rb") as f:
+                cmdline = f.read().replace(b"\0", b" ").decode("utf-8", "replace").strip()
+        except OSError:
+            continue
+        if "retroarch" in cmdline:
+            return entry, cmdline
+    return None, ""
+
+deadline = time.time()
+while True:
+    seq += 1
+    started = time.time()
+    out = ["@@BEGIN %d" % seq]
+    if hires_line:
+        out.append(hires_line)
+    out.extend(l for l in read("/proc/stat").splitlines() if l.startswith("cpu"))
+    mem = {}
+    for l in read("/proc/meminfo").splitlines():
+        key, value = l.split(":", 1)
+        mem[key] = int(value.split()[0])
+    total = mem["MemTotal"]
+    out.append("mem %d %d" % (total // 1024, (total - mem.get("MemAvailable", mem["MemFree"])) // 1024))
+    try:
+        zone = int(read("/sys/class/thermal/thermal_zone0/temp"))
+        out.append("temp %.1f" % (zone / 1000.0))
+        out.append("zone %d" % zone)
+    except (OSError, ValueError):
+        pass
+    freq_lines = read_freq()
+    if started >= next_vcgencmd:
+        vcgencmd_lines = read_vcgencmd(vcgencmd if freq_lines else ("measure_clock arm",) + vcgencmd)
+        next_vcgencmd = started + vcgencmd_every
+    out.extend(freq_lines + vcgencmd_lines)
+    if pid is not None and not os.path.exists("/proc/" + pid):
+        pid, args, next_scan = None, "", 0.0
+    if pid is None and started >= next_scan:
+        pid, args = find_retroarch()
+        next_scan = started + 2
+    if pid is not None:
+        match = libretro.search(args)
+        if match:
+            out.append("emulator " + match.group(0))
+        out.append("game " + args)
+        out.extend(process_lines(pid))
+    out.append("@@END %d %d" % (seq, (time.time() - started) * 1e6))
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
+    deadline += interval
+    if deadline < time.time():
+        deadline = time.time()
+    if hires > 0:
+        hires_line = capture(deadline)
+        wait_commands(poll_only=True)
+    else:
+        wait_commands()
+'''
+
+def build_stream_command(interval, hires_rate=0):
+    payload = base64.b64encode(STREAM_AGENT_SCRIPT.encode()).decode()
+    return f"python3 -u -c \"import base64;exec(base64.b64decode('{payload}'))\" {interval} {hires_rate}"
+
+def decode_hires_batch(value):
+    columns, count, payload = value.split(" ", 2)
+    data = np.frombuffer(zlib.decompress(base64.b64decode(payload)), dtype="<f4")
+    return data.reshape(int(count), int(columns))
+
+CLOCK_PARSERS = {
+    "freq": lambda value: float(value) / 1e6,
+    "throttled": lambda value: int(value, 16),
+    "volts": float,
+    "zone": lambda value: int(value) / 1000,
+}
+
+def parse_stats_frame(lines):
+    stats = {"cpu": "", "cores": [], "mem": "", "temp": "0.0", "emulator": "Aucun", "game": ""}
+    for line in lines:
+        key, _, value = line.strip().partition(" ")
+        value = value.strip()
+        if not value:
+            continue
+        if key == "cpu":
+            stats["cpu"] = line
+        elif CORE_LINE.match(line):
+            stats["cores"].append(line)
+        elif key == "mem":
+            stats["mem"] = f"Mem: {value}"
+        elif key == "temp":
+            if TEMP_VALUE.fullmatch(value):
+                stats["temp"] = value
+        elif key in CLOCK_PARSERS:
+            try:
+                stats[key] = CLOCK_PARSERS[key](value)
+            except ValueError:
+                logging.error(f"Valeur {key} illisible : {value}")
+        elif key == "emulator":
+            stats["emulator"] = value
+        elif key == "game":
+            stats["game"] = value
+        elif key == "hires":
+            try:
+                stats["hires"] = decode_hires_batch(value)
+            except (ValueError, zlib.error) as e:
+                logging.error(f"Lot haute résolution illisible : {e}")
+        elif key in ("pstat", "pstatus", "tstat"):
+            process = stats.setdefault("process", {"stat": "", "status": {}, "threads": []})
+            if key == "pstat":
+                process["stat"] = value
+            elif key == "tstat":
+                process["threads"].append(value)
+            else:
+                name, *field = value.split(None, 1)
+                process["status"][name] = field[0] if field else ""
+    stats["cores"].sort(key=lambda line: int(line[3:line.index(" ")]))
+    stats["lines"] = lines
+    return stats
+
+def jiffies_matrix(lines):
+    fields = [line.split(None, 1)[1] for line in lines if line]
+    if not fields:
+        return np.zeros((0, 0), dtype=np.int64)
+    return np.loadtxt(fields, dtype=np.int64, comments=None, ndmin=2)
+
+def cpu_usage_vector(matrix, previous=None):
+    total = matrix.sum(axis=1)
+    idle = matrix[:, 3] + (matrix[:, 4] if matrix.shape[1] >= 5 else 0)
+    if previous is None or len(previous[0]) != len(total):
+        return np.zeros(len(matrix)), (total, idle)
+    total_diff = total - previous[0]
+    idle_diff = idle - previous[1]
+    usage = np.where(total_diff > 0, (total_diff - idle_diff) * 100.0 / np.maximum(total_diff, 1), 0.0)
+    return usage, (total, idle)
+
+USER_HZ = 100
+
+def parse_task_stat(value):
+    head, _, rest = value.rpartition(")")
+    tid, _, name = head.partition(" (")
+    fields = rest.split()
+    return int(tid), name, int(fields[11]) + int(fields[12]), int(fields[36]) if len(fields) > 36 else -1
+
+class ProcessSampler:
+    def __init__(self):
+        self.clear()
+        self.reset_session()
+
+    def clear(self):
+        self.pid = None
+        self.previous = {}
+        self.previous_switches = None
+        self.elapsed = 0.0
+        self.cpu_usage = 0.0
+        self.rss = 0.0
+        self.switch_rate = 0.0
+        self.affinity = ""
+        self.threads = []
+
+    def reset_session(self):
+        self.session_samples = 0
+        self.session_cpu = 0.0
+        self.session_other_cpu = 0.0
+        self.session_rss = 0.0
+        self.session_switches = 0.0
+        self.session_elapsed = 0.0
+        self.session_threads = {}
+
+    def update(self, process, elapsed, core_count):
+        try:
+            pid = parse_task_stat(process["stat"])[0]
+            tasks = [parse_task_stat(value) for value in process["threads"]]
+            status = process["status"]
+            rss = float(status.get("VmRSS", "0").split()[0]) / 1024
+            switches = sum(int(status.get(key, "0")) for key in ("voluntary_ctxt_switches", "nonvoluntary_ctxt_switches"))
+        except (ValueError, IndexError) as e:
+            logging.error(f"Statistiques du processus de l'émulateur illisibles : {e}")
+            return
+        if pid != self.pid:
+            self.clear()
+            self.pid = pid
+            logging.info(f"Suivi du processus {pid} ({len(tasks)} threads, cores {status.get('Cpus_allowed_list', '?')})")
+        threads = []
+        for tid, name, jiffies, processor in tasks:
+            if tid in self.previous and elapsed > 0:
+                threads.append((tid, name, max(0, jiffies - self.previous[tid]) * 100.0 / elapsed, processor))
+        self.previous = {tid: jiffies for tid, _, jiffies, _ in tasks}
+        seconds = elapsed / USER_HZ
+        if self.previous_switches is not None and seconds > 0:
+            self.switch_rate = max(0, switches - self.previous_switches) / seconds
+        self.previous_switches = switches
+        self.elapsed = elapsed
+        self.rss = rss
+        self.affinity = status.get("Cpus_allowed_list", "")
+        self.threads = sorted(threads, key=lambda thread: thread[2], reverse=True)
+        self.cpu_usage = sum(thread[2] for thread in threads) / max(1, core_count)
+
+    def hot_thread(self):
+        if not self.threads:
+            return ""
+        tid, name, usage, processor = self.threads[0]
+        return f"{name} ({tid}) {usage:.0f}% sur core {processor + 1}"
+
+    def accumulate(self, system_cpu):
+        if not self.threads:
+            return
+        self.session_samples += 1
+        self.session_cpu += self.cpu_usage
+        self.session_other_cpu += max(0.0, system_cpu - self.cpu_usage)
+        self.session_rss = max(self.session_rss, self.rss)
+        self.session_switches += self.switch_rate
+        self.session_elapsed += self.elapsed
+        for tid, name, usage, processor in self.threads:
+            entry = self.session_threads.setdefault(tid, [name, 0.0, processor])
+            entry[1] += usage * self.elapsed / 100
+            entry[2] = processor
+
+    def summary(self):
+        if not self.session_samples:
+            return {}
+        ranked = sorted(self.session_threads.items(), key=lambda item: item[1][1], reverse=True)
+        threads = [{"tid": tid, "name": name, "cpu": jiffies * 100 / self.session_elapsed, "core": processor + 1}
+                   for tid, (name, jiffies, processor) in ranked[:5]]
+        return {
+            "avg_emulator_cpu": self.session_cpu / self.session_samples,
+            "avg_other_cpu": self.session_other_cpu / self.session_samples,
+            "max_emulator_rss": self.session_rss,
+            "ctxt_switch_rate": self.session_switches / self.session_samples,
+            "hot_thread": f"{threads[0]['name']} ({threads[0]['tid']})" if threads else "",
+            "hot_thread_cpu": threads[0]["cpu"] if threads else 0.0,
+            "threads": threads,
+        }
+
+HISTORY_FIELDS = ["game", "emulator", "session_start", "session_end",
+                  "avg_cpu", "min_cpu", "max_cpu",
+                  "avg_ram", "min_ram", "max_ram",
+                  "avg_cpu_temp", "min_cpu_temp", "max_cpu_temp",
+                  "avg_core1", "min_core1", "max_core1",
+                  "avg_core2", "min_core2", "max_core2",
+                  "avg_core3", "min_core3", "max_core3",
+                  "avg_core4", "min_core4", "max_core4",
+                  "core_imbalance", "core_killer", "avg_cpu_freq",
+                  "std_cpu", "p50_cpu", "p95_cpu", "p99_cpu",
+                  "std_ram", "p50_ram", "p95_ram", "p99_ram",
+                  "std_cpu_temp", "p50_cpu_temp", "p95_cpu_temp", "p99_cpu_temp",
+                  "avg_emulator_cpu", "avg_other_cpu", "max_emulator_rss", "ctxt_switch_rate",
+                  "hot_thread", "hot_thread_cpu", "killer_thread",
+                  "min_cpu_freq", "max_cpu_freq", "avg_core_mv", "max_zone_temp", "throttled_time", "throttled_flags"]
+HISTORY_TEXT_FIELDS = {"host", "game", "emulator", "session_start", "session_end", "core_killer", "hot_thread",
+                       "killer_thread"}
+
+ROLLUP_KINDS = ("game", "emulator")
+ROLLUP_AVERAGES = ("avg_cpu", "avg_ram", "avg_cpu_temp", "core_imbalance", "avg_cpu_freq")
+ROLLUP_DURATION = "coalesce(max(strftime('%s', session_end) - strftime('%s', session_start), 0), 0)"
+ROLLUP_WEIGHT = "max(duration, 1)"
+ROLLUP_COLUMNS = [
+    ("sessions", "count(*)", "sessions + excluded.sessions"),
+    ("play_time", "total(duration)", "play_time + excluded.play_time"),
+    ("max_cpu_temp", "max(max_cpu_temp)",
+     "max(coalesce(max_cpu_temp, excluded.max_cpu_temp), coalesce(excluded.max_cpu_temp, max_cpu_temp))"),
+    ("killers", "total(core_killer = 'Oui')", "killers + excluded.killers"),
+    ("throttled_time", "total(throttled_time)", "throttled_time + excluded.throttled_time"),
+    ("last_played", "max(session_end)",
+     "max(coalesce(last_played, excluded.last_played), coalesce(excluded.last_played, last_played))"),
+] + [column for field in ROLLUP_AVERAGES for column in (
+    (f"{field}_sum", f"total({field} * {ROLLUP_WEIGHT})", f"{field}_sum + excluded.{field}_sum"),
+    (f"{field}_weight", f"total(CASE WHEN {field} IS NULL THEN 0 ELSE {ROLLUP_WEIGHT} END)",
+     f"{field}_weight + excluded.{field}_weight"),
+)]
+
+def rollup_statement(kind):
+    names = ", ".join(name for name, _, _ in ROLLUP_COLUMNS)
+    expressions = ", ".join(expression for _, expression, _ in ROLLUP_COLUMNS)
+    updates = ", ".join(f"{name} = {merge}" for name, _, merge in ROLLUP_COLUMNS)
+    return (f"INSERT INTO rollups (kind, name, {names}) SELECT '{kind}', coalesce({kind}, ''), {expressions} "
+            f"FROM (SELECT *, {ROLLUP_DURATION} AS duration FROM sessions WHERE id > ? LIMIT -1) "
+            f"WHERE true GROUP BY 2 ON CONFLICT (kind, name) DO UPDATE SET {updates}")
+
+class HistoryStore:
+    def __init__(self, path, fields=HISTORY_FIELDS):
+        self.path = path
+        self.fields = ["host"] + list(fields)
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS sessions (id INTEGER PRIMARY KEY AUTOINCREMENT)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            existing = {row["name"] for row in self.conn.execute("PRAGMA table_info(sessions)")}
+            for field in self.fields:
+                if field not in existing:
+                    column_type = "TEXT" if field in HISTORY_TEXT_FIELDS else "REAL"
+                    self.conn.execute(f"ALTER TABLE sessions ADD COLUMN {field} {column_type}")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_game ON sessions (game)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_emulator ON sessions (emulator)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions (session_start)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS rollups (kind TEXT, name TEXT, PRIMARY KEY (kind, name))")
+            existing = {row["name"] for row in self.conn.execute("PRAGMA table_info(rollups)")}
+            missing = [name for name, _, _ in ROLLUP_COLUMNS if name not in existing]
+            for name in missing:
+                column_type = "TEXT" if name == "last_played" else "INTEGER" if name in ("sessions", "killers") else "REAL"
+                self.conn.execute(f"ALTER TABLE rollups ADD COLUMN {name} {column_type}")
+            if missing:
+                self.conn.execute("DELETE FROM rollups")
+                self.update_rollups(0)
+                count = self.conn.execute("SELECT count(*) FROM rollups").fetchone()[0]
+                if count:
+                    logging.info(f"{count} agrégats par jeu et par émulateur reconstruits dans {path}")
+
+    def convert(self, row):
+        values = []
+        for field in self.fields:
+            value = row.get(field)
+            if field not in HISTORY_TEXT_FIELDS and value not in (None, ""):
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    value = None
+            values.append(None if value == "" else value)
+        return values
+
+    def insert(self, row):
+        placeholders = ", ".join("?" for _ in self.fields)
+        with self.lock, self.conn:
+            cursor = self.conn.execute(f"INSERT INTO sessions ({', '.join(self.fields)}) VALUES ({placeholders})",
+                                       self.convert(row))
+            self.update_rollups(cursor.lastrowid - 1)
+        return cursor.lastrowid
+
+    def update_rollups(self, since_id):
+        for kind in ROLLUP_KINDS:
+            self.conn.execute(rollup_statement(kind), (since_id,))
+
+    def rollups(self, kind):
+        averages = ", ".join(f"{field}_sum / nullif({field}_weight, 0) AS {field}" for field in ROLLUP_AVERAGES)
+        query = (f"SELECT name, sessions, play_time, max_cpu_temp, killers * 100.0 / sessions AS killer_rate, "
+                 f"throttled_time, last_played, {averages} FROM rollups WHERE kind = ? ORDER BY sessions DESC, name")
+        with self.lock:
+            return self.conn.execute(query, (kind,)).fetchall()
+
+    def import_csv(self, filename):
+        if not os.path.exists(filename):
+            return 0
+        key = f"csv_import:{os.path.abspath(filename)}"
+        with self.lock:
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+                return 0
+        with open(filename, mode="r", newline="") as csvfile:
+            rows = [self.convert(row) for row in csv.DictReader(csvfile)]
+        placeholders = ", ".join("?" for _ in self.fields)
+        with self.lock, self.conn:
+            last_id = self.conn.execute("SELECT coalesce(max(id), 0) FROM sessions").fetchone()[0]
+            self.conn.executemany(f"INSERT INTO sessions ({', '.join(self.fields)}) VALUES ({placeholders})", rows)
+            self.update_rollups(last_id)
+            self.conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (key, str(time.time())))
+        logging.info(f"{len(rows)} sessions importées depuis {filename}")
+        return len(rows)
+
+    def rows(self, since_id=0, where="", params=()):
+        query = f"SELECT * FROM sessions WHERE id > ? {('AND ' + where) if where else ''} ORDER BY id"
+        with self.lock:
+            return self.conn.execute(query, (since_id, *params)).fetchall()
+
+    def summary_rows(self, since_id=0):
+        query = ("SELECT id, game, emulator, session_start, session_end, "
+                 "printf('%.1f/%.1f/%.1f', avg_cpu, min_cpu, max_cpu), "
+                 "printf('%.1f/%.1f/%.1f', avg_ram, min_ram, max_ram), "
+                 "printf('%.1f°C', avg_cpu_temp), printf('%.1f', coalesce(core_imbalance, 0)), "
+                 "CASE WHEN core_killer = 'Oui' THEN 'KILLER' ELSE 'Non' END, "
+                 "avg_cpu, avg_ram, avg_cpu_temp, coalesce(core_imbalance, 0), id "
+                 "FROM sessions WHERE id > ? ORDER BY id")
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(query, (since_id,)).fetchall()
+
+    def columns(self, fields, ids=None, since_id=0):
+        query = f"SELECT {', '.join(fields)} FROM sessions WHERE id > ?"
+        params = (since_id,)
+        if ids is not None:
+            query += " AND id IN (SELECT value FROM json_each(?))"
+            params += (json.dumps([int(session_id) for session_id in ids]),)
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            rows = cursor.execute(query + " ORDER BY id", params).fetchall()
+        matrix = np.array(rows, dtype=object).reshape(len(rows), len(fields))
+        return {field: matrix[:, i] if field in HISTORY_TEXT_FIELDS else matrix[:, i].astype(float)
+                for i, field in enumerate(fields)}
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM sessions")
+            self.conn.execute("DELETE FROM rollups")
+            self.generation += 1
+
+    def export_csv(self, filename):
+        rows = self.rows()
+        with open(filename, mode="w", newline="") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=self.fields[1:], extrasaction="ignore")
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({field: format_history_value(row[field]) for field in self.fields[1:]})
+        return len(rows)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class SessionScorer:
+    def __init__(self, history, model=None):
+        self.history = history
+        self.set_model(DEFAULT_SCORE_MODEL if model is None else model)
+
+    def set_model(self, model):
+        terms = {}
+        for field, term in model.items():
+            if field not in self.history.fields or (field in HISTORY_TEXT_FIELDS and field != "core_killer"):
+                logging.warning(f"Champ de score inconnu ignoré : {field}")
+                continue
+            weight, best, worst = (float(term.get(key, default)) for key, default in
+                                   (("weight", 1.0), ("best", 0.0), ("worst", 100.0)))
+            if weight <= 0 or worst == best:
+                logging.warning(f"Terme de score ignoré pour {field} : poids {weight}, bornes {best} / {worst}")
+                continue
+            terms[field] = (weight, best, worst)
+        self.fields = list(terms)
+        self.weights = np.array([weight for weight, _, _ in terms.values()], dtype=float)
+        self.best = np.array([best for _, best, _ in terms.values()], dtype=float)
+        self.span = np.array([worst - best for _, best, worst in terms.values()], dtype=float)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.scores = np.zeros(0)
+        self.generation = None
+
+    def score(self, values):
+        count = len(next(iter(values.values()))) if values else 0
+        if not self.fields:
+            return np.full(count, 100.0)
+        matrix = np.column_stack([score_column(field, values[field]) for field in self.fields])
+        penalty = np.nan_to_num(np.clip((matrix - self.best) / self.span, 0.0, 1.0))
+        return 100.0 * (1.0 - penalty @ self.weights / self.weights.sum())
+
+    def refresh(self):
+        if self.generation != self.history.generation:
+            self.ids = np.zeros(0, dtype=np.int64)
+            self.scores = np.zeros(0)
+            self.generation = self.history.generation
+        since_id = int(self.ids[-1]) if len(self.ids) else 0
+        columns = self.history.columns(["id"] + self.fields, since_id=since_id)
+        if len(columns["id"]):
+            self.ids = np.concatenate([self.ids, columns["id"].astype(np.int64)])
+            self.scores = np.concatenate([self.scores, self.score(columns)])
+        return self.ids, self.scores
+
+    def lookup(self, ids):
+        known, scores = self.refresh()
+        if not len(known):
+            return np.full(len(ids), np.nan)
+        positions = np.minimum(np.searchsorted(known, ids), len(known) - 1)
+        return np.where(known[positions] == ids, scores[positions], np.nan)
+
+def score_column(field, column):
+    if column.dtype == object:
+        if field == "core_killer":
+            return (column == "Oui").astype(float)
+        return np.array([np.nan if value is None else value for value in column], dtype=float)
+    return column.astype(float)
+
+def format_history_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    return value
+
+def append_history_csv(filename, row):
+    with open(filename, mode="a+", newline="") as csvfile:
+        csvfile.seek(0)
+        header = next(csv.reader(csvfile), None)
+        writer = csv.DictWriter(csvfile, fieldnames=header or HISTORY_FIELDS, extrasaction="ignore")
+        if not header:
+            writer.writeheader()
+        writer.writerow({field: format_history_value(value) for field, value in row.items()})
+
+SAMPLE_COLUMNS = ["cpu_usage", "ram_usage", "cpu_temp", "core1", "core2", "core3", "core4", "core_imbalance"]
+CLOCK_COLUMNS = ["cpu_freq", "throttled", "core_volts", "zone_temp"]
+THROTTLE_FLAGS = {0: "sous-tension", 1: "fréquence plafonnée", 2: "bridé", 3: "limite thermique"}
+THROTTLE_ACTIVE = 0xF
+
+def describe_throttle(flags):
+    return ", ".join(name for bit, name in THROTTLE_FLAGS.items() if flags & (1 << bit))
+
+class MetricAccumulator:
+    def __init__(self, resolution=0.1, upper=150.0):
+        self.resolution = resolution
+        self.bins = np.zeros(int(round(upper / resolution)) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        index = int(value / self.resolution + 0.5)
+        self.bins[min(max(index, 0), len(self.bins) - 1)] += 1
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def std(self):
+        if not self.count:
+            return 0.0
+        mean = self.total / self.count
+        return math.sqrt(max(self.total_sq / self.count - mean * mean, 0.0))
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        index = int(np.searchsorted(np.cumsum(self.bins), rank))
+        return min(max(index * self.resolution, self.min), self.max)
+
+    def summary(self):
+        if not self.count:
+            return 0.0, 0.0, 0.0
+        return self.mean(), self.min, self.max
+
+def session_accumulators():
+    accumulators = {metric: MetricAccumulator() for metric in SAMPLE_COLUMNS}
+    accumulators["cpu_freq"] = MetricAccumulator(resolution=1.0, upper=4000.0)
+    accumulators["core_volts"] = MetricAccumulator(resolution=0.001, upper=2.0)
+    return accumulators
+
+class SampleStore:
+    def __init__(self, directory, columns=SAMPLE_COLUMNS + CLOCK_COLUMNS, flush_every=64):
+        self.directory = directory
+        self.columns = list(columns)
+        self.flush_every = flush_every
+        self.dtypes = {"timestamp": np.float64, "session": np.uint32}
+        self.dtypes.update({column: np.float32 for column in self.columns})
+        self.lock = threading.Lock()
+        self.pending = []
+        self.files = {}
+        os.makedirs(directory, exist_ok=True)
+        lengths = {name: os.path.getsize(self.path(name)) // np.dtype(dtype).itemsize
+                   for name, dtype in self.dtypes.items() if os.path.exists(self.path(name))}
+        self.length = min(lengths.values()) if lengths else 0
+        for name, dtype in self.dtypes.items():
+            if name not in lengths and self.length:
+                logging.info(f"Colonne {name} ajoutée à {directory} ({self.length} échantillons à zéro)")
+            with open(self.path(name), "r+b" if name in lengths else "wb") as f:
+                f.truncate(self.length * np.dtype(dtype).itemsize)
+        sessions = self.column("session")
+        known = [session["id"] for session in self.sessions()]
+        self.next_session = max([int(sessions.max()) if len(sessions) else 0] + known) + 1
+
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def begin_session(self):
+        with self.lock:
+            session_id = self.next_session
+            self.next_session += 1
+            return session_id
+
+    def append(self, session_id, sample):
+        row = (sample["timestamp"], session_id, *(sample.get(column, 0.0) for column in self.columns))
+        with self.lock:
+            self.pending.append(row)
+            if len(self.pending) >= self.flush_every:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        rows, self.pending = self.pending, []
+        for i, (name, dtype) in enumerate(self.dtypes.items()):
+            if name not in self.files:
+                self.files[name] = open(self.path(name), "ab")
+            np.fromiter((row[i] for row in rows), dtype=dtype, count=len(rows)).tofile(self.files[name])
+            self.files[name].flush()
+        self.length += len(rows)
+
+    def column(self, name):
+        if self.length == 0:
+            return np.zeros(0, dtype=self.dtypes[name])
+        return np.memmap(self.path(name), dtype=self.dtypes[name], mode="r", shape=(self.length,))
+
+    def read(self, start=None, end=None):
+        self.flush()
+        timestamps = self.column("timestamp")
+        first = np.searchsorted(timestamps, start) if start is not None else 0
+        last = np.searchsorted(timestamps, end, side="right") if end is not None else len(timestamps)
+        return {name: self.column(name)[first:last] for name in self.dtypes}
+
+    def session(self, session_id):
+        self.flush()
+        indices = np.flatnonzero(self.column("session") == session_id)
+        if len(indices) and indices[-1] - indices[0] + 1 == len(indices):
+            selection = slice(indices[0], indices[-1] + 1)
+        else:
+            selection = indices
+        return {name: self.column(name)[selection] for name in self.dtypes}
+
+    def record_session(self, session_id, info):
+        with self.lock, open(os.path.join(self.directory, "sessions.jsonl"), "a") as f:
+            f.write(json.dumps(dict(info, id=session_id)) + "\n")
+
+    def sessions(self):
+        path = os.path.join(self.directory, "sessions.jsonl")
+        if not os.path.exists(path):
+            return []
+        sessions = []
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    sessions.append(json.loads(line))
+                except ValueError:
+                    continue
+        return sessions
+
+    def find_session(self, game, session_start):
+        for session in reversed(self.sessions()):
+            if session.get("game") == game and session.get("session_start") == session_start:
+                return session
+        return None
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            for f in self.files.values():
+                f.close()
+            self.files = {}
+
+class HostMonitor:
+    def __init__(self, hostname, store=None, history=None, history_csv=HISTORY_CSV_FILE, clock=time.time):
+        self.hostname = hostname
+        self.store = store
+        self.history = history
+        self.history_csv = history_csv
+        self.clock = clock
+        self.session_id = store.begin_session() if store else None
+        self.lock = threading.Lock()
+        self.version = 0
+        self.last_update = 0.0
+        self.prev_jiffies = None
+        self.elapsed_jiffies = 0.0
+        self.process_sampler = ProcessSampler()
+        self.cpu_load_history = deque(maxlen=60)
+        self.cpu_temp_history = deque(maxlen=60)
+        self.ram_usage_history = deque(maxlen=60)
+        self.imbalance_history = deque(maxlen=60)
+        self.core_count = 0
+        self.core_histories = []
+        self.envelopes = {name: deque(maxlen=60) for name in ("cpu_load", "cpu_temp")}
+        self.hires_samples = 0
+        self.hires_rate = 0.0
+        self.last_core_usage = np.zeros(0)
+        self.cpu_usage = 0.0
+        self.cpu_temp = 0.0
+        self.displayed_cpu_usage = 0.0
+        self.displayed_ram_usage = 0.0
+        self.displayed_cpu_temp = 0.0
+        self.displayed_core_usage = np.zeros(0)
+        self.core_imbalance = 0.0
+        self.imbalance_window_size = 10
+        self.core_usage_window = deque(maxlen=self.imbalance_window_size)
+        self.core_killer_alert = False
+        self.killer_thread = ""
+        self.cpu_freq = 0.0
+        self.core_volts = 0.0
+        self.zone_temp = 0.0
+        self.throttled = 0
+        self.cpu_freq_history = deque(maxlen=60)
+        self.throttled_time = 0.0
+        self.throttled_flags = 0
+        self.max_zone_temp = 0.0
+        self.last_sample_time = 0.0
+        self.accumulators = session_accumulators()
+        self.session_start_time = self.clock()
+        self.ignore_data_until = 0.0
+        self.current_game = ""
+        self.last_emulator = "Aucun"
+        self.display_emulator = "Aucun"
+        self.sessions_exported = 0
+
+    def process(self, stats):
+        with self.lock:
+            self.update_cpu_usage(stats["cpu"], stats["cores"])
+            self.update_process(stats.get("process"))
+            self.update_ram_usage(stats["mem"])
+            self.update_cpu_temp_usage(stats["temp"])
+            self.update_clock(stats)
+            self.imbalance_history.append(self.core_imbalance)
+            self.update_game(stats["game"])
+            self.update_emulator(stats["emulator"])
+            self.update_envelopes(stats.get("hires"))
+            self.update_misc()
+            self.last_update = time.time()
+            self.version += 1
+
+    def resize_cores(self, count):
+        self.core_count = count
+        self.prev_jiffies = None
+        self.core_histories = [deque(maxlen=60) for _ in range(count)]
+        self.last_core_usage = np.zeros(count)
+        self.displayed_core_usage = np.zeros(count)
+        self.core_usage_window.clear()
+        for name in [name for name in self.envelopes if name.startswith("core")]:
+            del self.envelopes[name]
+        for i in range(count):
+            self.envelopes[f"core{i + 1}"] = deque(maxlen=60)
+        logging.info(f"{count} cores détectés sur {self.hostname}")
+
+    def update_cpu_usage(self, cpu_line, core_lines):
+        if not cpu_line:
+            return
+        try:
+            matrix = jiffies_matrix([cpu_line] + [line for line in core_lines if line])
+        except ValueError as e:
+            logging.error(f"Erreur lors du calcul de la charge CPU : {e}")
+            return
+        if len(matrix) == 0 or matrix.shape[1] < 4:
+            return
+        if len(matrix) - 1 != self.core_count:
+            self.resize_cores(len(matrix) - 1)
+        previous = self.prev_jiffies
+        usage, self.prev_jiffies = cpu_usage_vector(matrix, previous)
+        self.elapsed_jiffies = float(self.prev_jiffies[0][0] - previous[0][0]) / max(1, self.core_count) if previous else 0.0
+        self.cpu_usage = float(usage[0])
+        self.displayed_cpu_usage = smooth_transition(self.displayed_cpu_usage, self.cpu_usage, 0.2)
+        self.cpu_load_history.append(self.cpu_usage)
+        cores = usage[1:]
+        self.displayed_core_usage = smooth_transition(self.displayed_core_usage, cores, 0.2)
+        self.last_core_usage = cores
+        for history, value in zip(self.core_histories, cores.tolist()):
+            history.append(value)
+
+    def update_process(self, process):
+        if not process or not process["stat"]:
+            if self.process_sampler.pid is not None:
+                logging.info(f"Fin du suivi du processus {self.process_sampler.pid}")
+                self.process_sampler.clear()
+            return
+        self.process_sampler.update(process, self.elapsed_jiffies, self.core_count)
+
+    def update_ram_usage(self, output):
+        try:
+            parts = output.split()
+            if len(parts) < 3:
+                raise ValueError("Données RAM incomplètes")
+            total = float(parts[1])
+            used = float(parts[2])
+            computed_usage = used / total * 100 if total != 0 else 0.0
+        except (IndexError, ValueError, TypeError) as e:
+            logging.error(f"Erreur lors de la lecture de la RAM : {e}")
+            computed_usage = 0.0
+        self.displayed_ram_usage = smooth_transition(self.displayed_ram_usage, computed_usage, 0.2)
+        self.ram_usage_history.append(computed_usage)
+
+    def update_cpu_temp_usage(self, output):
+        try:
+            computed_temp = float(output)
+        except (ValueError, TypeError) as e:
+            logging.error(f"Erreur lors de la lecture de la température CPU : {e}")
+            computed_temp = 0.0
+        self.cpu_temp = computed_temp
+        self.displayed_cpu_temp = smooth_transition(self.displayed_cpu_temp, computed_temp, 0.2)
+        self.cpu_temp_history.append(computed_temp)
+
+    def update_clock(self, stats):
+        self.cpu_freq = stats.get("freq", 0.0)
+        self.core_volts = stats.get("volts", 0.0)
+        self.zone_temp = stats.get("zone", 0.0)
+        throttled = stats.get("throttled", 0)
+        if (throttled ^ self.throttled) & THROTTLE_ACTIVE:
+            if throttled & THROTTLE_ACTIVE:
+                logging.info(f"Bridage sur {self.hostname} : {describe_throttle(throttled)} à {self.cpu_freq:.0f} MHz")
+            else:
+                logging.info(f"Fin du bridage sur {self.hostname}")
+        self.throttled = throttled
+        self.cpu_freq_history.append(self.cpu_freq)
+
+    def update_envelopes(self, batch):
+        if batch is None or len(batch) == 0:
+            self.envelopes["cpu_load"].append((self.cpu_usage, self.cpu_usage))
+            self.envelopes["cpu_temp"].append((self.cpu_temp, self.cpu_temp))
+            for i, value in enumerate(self.last_core_usage.tolist()):
+                self.envelopes[f"core{i + 1}"].append((value, value))
+            return
+        lows = batch.min(axis=0)
+        highs = batch.max(axis=0)
+        self.envelopes["cpu_load"].append((float(lows[1]), float(highs[1])))
+        self.envelopes["cpu_temp"].append((float(lows[-1]), float(highs[-1])))
+        for i in range(self.core_count):
+            column = i + 2
+            if column < batch.shape[1] - 1:
+                self.envelopes[f"core{i + 1}"].append((float(lows[column]), float(highs[column])))
+            else:
+                self.envelopes[f"core{i + 1}"].append((0.0, 0.0))
+        self.hires_samples += len(batch)
+        span = float(batch[-1, 0] - batch[0, 0]) / 1000
+        if len(batch) > 1 and span > 0:
+            self.hires_rate = (len(batch) - 1) / span
+
+    def update_misc(self):
+        sample = {
+            "timestamp": self.clock(),
+            "cpu_usage": self.displayed_cpu_usage,
+            "ram_usage": self.displayed_ram_usage,
+            "cpu_temp": self.displayed_cpu_temp,
+            "core_imbalance": self.core_imbalance,
+            "cpu_freq": self.cpu_freq,
+            "throttled": self.throttled,
+            "core_volts": self.core_volts,
+            "zone_temp": self.zone_temp
+        }
+        for i, value in enumerate(self.displayed_core_usage.tolist(), 1):
+            sample[f"core{i}"] = value
+        if self.core_count:
+            self.core_usage_window.append((float(self.displayed_core_usage.max()), float(self.displayed_core_usage.min())))
+        if len(self.core_usage_window) >= self.imbalance_window_size:
+            avg_max = sum(high for high, _ in self.core_usage_window) / len(self.core_usage_window)
+            avg_min = sum(low for _, low in self.core_usage_window) / len(self.core_usage_window)
+            self.core_imbalance = avg_max - avg_min
+            max_core_usage = float(self.last_core_usage.max())
+            if max_core_usage > 80 and self.core_imbalance > 50 and not self.core_killer_alert:
+                self.core_killer_alert = True
+                self.killer_thread = self.process_sampler.hot_thread()
+                logging.info(f"Alerte : Tueur de Core détecté sur {self.hostname} ! Max usage : {max_core_usage:.1f}%, Imbalance : {self.core_imbalance:.1f}%"
+                             + (f", thread : {self.killer_thread}" if self.killer_thread else ""))
+            if sample["timestamp"] > self.ignore_data_until:
+                logging.info(f"Rolling Imbalance (20s window): {self.core_imbalance:.1f}%")
+        if sample["timestamp"] > self.ignore_data_until:
+            for metric in SAMPLE_COLUMNS:
+                self.accumulators[metric].add(sample.get(metric, 0.0))
+            if self.cpu_freq:
+                self.accumulators["cpu_freq"].add(self.cpu_freq)
+            if self.core_volts:
+                self.accumulators["core_volts"].add(self.core_volts)
+            if self.throttled & THROTTLE_ACTIVE and self.last_sample_time:
+                self.throttled_time += sample["timestamp"] - self.last_sample_time
+            self.throttled_flags |= self.throttled
+            self.max_zone_temp = max(self.max_zone_temp, self.zone_temp)
+            self.last_sample_time = sample["timestamp"]
+            self.process_sampler.accumulate(self.cpu_usage)
+            if self.store:
+                self.store.append(self.session_id, sample)
+
+    def update_game(self, new_game):
+        if new_game:
+            game_name = new_game.split('/')[-1].split('.')[0]
+            game_name = re.sub(r'\([^)]*\)', '', game_name)
+            game_name = re.sub(r'\[[^]]*\]', '', game_name)
+            game_name = game_name.strip()
+            new_game = game_name if game_name else ""
+        if new_game != self.current_game and self.current_game:
+            self.export_current_session()
+            self.accumulators = session_accumulators()
+            self.session_id = self.store.begin_session() if self.store else None
+            self.session_start_time = self.clock()
+            self.ignore_data_until = self.session_start_time + 5
+            self.core_usage_window.clear()
+            self.imbalance_history.clear()
+            self.core_killer_alert = False
+            self.killer_thread = ""
+            self.throttled_time = 0.0
+            self.throttled_flags = 0
+            self.max_zone_temp = 0.0
+            self.last_sample_time = 0.0
+            self.process_sampler.reset_session()
+        self.current_game = new_game
+
+    def update_emulator(self, new_emulator):
+        if new_emulator != "Aucun":
+            self.last_emulator = new_emulator.replace("_libretro", "")
+        self.display_emulator = self.last_emulator if new_emulator == "Aucun" else new_emulator.replace("_libretro", "")
+
+    def export_current_session(self):
+        if not self.accumulators["cpu_usage"].count:
+            return
+        session_end = self.clock()
+        cpu_stats = self.accumulators["cpu_usage"].summary()
+        ram_stats = self.accumulators["ram_usage"].summary()
+        cpu_temp_stats = self.accumulators["cpu_temp"].summary()
+        core1_stats = self.accumulators["core1"].summary()
+        core2_stats = self.accumulators["core2"].summary()
+        core3_stats = self.accumulators["core3"].summary()
+        core4_stats = self.accumulators["core4"].summary()
+        core_imbalance_stats = self.accumulators["core_imbalance"].summary()
+        core_imbalance = core_imbalance_stats[0]
+        
+        row = {
+            "host": self.hostname,
+            "game": self.current_game,
+            "emulator": self.last_emulator,
+            "session_start": datetime.datetime.fromtimestamp(self.session_start_time).strftime("%Y-%m-%d %H:%M:%S"),
+            "session_end": datetime.datetime.fromtimestamp(session_end).strftime("%Y-%m-%d %H:%M:%S"),
+            "avg_cpu": cpu_stats[0],
+            "min_cpu": cpu_stats[1],
+            "max_cpu": cpu_stats[2],
+            "avg_ram": ram_stats[0],
+            "min_ram": ram_stats[1],
+            "max_ram": ram_stats[2],
+            "avg_cpu_temp": cpu_temp_stats[0],
+            "min_cpu_temp": cpu_temp_stats[1],
+            "max_cpu_temp": cpu_temp_stats[2],
+            "avg_core1": core1_stats[0],
+            "min_core1": core1_stats[1],
+            "max_core1": core1_stats[2],
+            "avg_core2": core2_stats[0],
+            "min_core2": core2_stats[1],
+            "max_core2": core2_stats[2],
+            "avg_core3": core3_stats[0],
+            "min_core3": core3_stats[1],
+            "max_core3": core3_stats[2],
+            "avg_core4": core4_stats[0],
+            "min_core4": core4_stats[1],
+            "max_core4": core4_stats[2],
+            "core_imbalance": core_imbalance,
+            "core_killer": "Oui" if self.core_killer_alert else "Non",
+            "killer_thread": self.killer_thread,
+            "throttled_time": self.throttled_time,
+            "throttled_flags": self.throttled_flags
+        }
+        if self.accumulators["cpu_freq"].count:
+            row["avg_cpu_freq"], row["min_cpu_freq"], row["max_cpu_freq"] = self.accumulators["cpu_freq"].summary()
+        if self.accumulators["core_volts"].count:
+            row["avg_core_mv"] = self.accumulators["core_volts"].mean() * 1000
+        if self.max_zone_temp:
+            row["max_zone_temp"] = self.max_zone_temp
+        process = self.process_sampler.summary()
+        row.update({field: value for field, value in process.items() if field != "threads"})
+        for metric, suffix in (("cpu_usage", "cpu"), ("ram_usage", "ram"), ("cpu_temp", "cpu_temp")):
+            accumulator = self.accumulators[metric]
+            row[f"std_{suffix}"] = accumulator.std()
+            for pct in (50, 95, 99):
+                row[f"p{pct}_{suffix}"] = accumulator.quantile(pct / 100)
+        if self.history_csv:
+            with HISTORY_LOCK:
+                append_history_csv(self.history_csv, row)
+        if self.history:
+            self.history.insert(row)
+        if self.store:
+            info = {field: row[field] for field in ("host", "game", "emulator", "session_start", "session_end")}
+            if process:
+                info.update(threads=process["threads"], affinity=self.process_sampler.affinity)
+            self.store.record_session(self.session_id, info)
+        self.sessions_exported += 1
+        logging.info(f"Session de {self.current_game} exportée" + (f" dans {self.history_csv}" if self.history_csv else ""))
+
+class AdaptiveScheduler:
+    def __init__(self, config, hostname=""):
+        self.config = config
+        self.hostname = hostname
+        self.interval = config.get("refresh_interval", 1000) / 1000
+        self.mode = "normal"
+        self.next_due = None
+        self.previous = None
+        self.flat_samples = 0
+        self.boost_until = 0.0
+
+    def observe(self, monitor, now):
+        base = self.config.get("refresh_interval", 1000) / 1000
+        if not self.config.get("adaptive_refresh", True):
+            self.interval = base
+            return base
+        with monitor.lock:
+            game = monitor.current_game
+            cpu = monitor.cpu_usage
+            temp = monitor.cpu_temp
+            imbalance = monitor.core_imbalance
+        fast = False
+        if self.previous is not None:
+            last_time, last_game, last_cpu, last_temp = self.previous
+            elapsed = max(now - last_time, 1e-3)
+            if game and not last_game:
+                self.boost_until = now + self.config.get("adaptive_boost", 10)
+            if (temp - last_temp) / elapsed >= self.config.get("adaptive_temp_rise", 1.0):
+                fast = True
+            if abs(cpu - last_cpu) < 5 and abs(temp - last_temp) < 1:
+                self.flat_samples += 1
+            else:
+                self.flat_samples = 0
+        self.previous = (now, game, cpu, temp)
+        if now < self.boost_until or imbalance >= self.config.get("adaptive_imbalance", 50):
+            fast = True
+        if fast:
+            mode, interval = "rapide", min(base, self.config.get("fast_interval", 500) / 1000)
+        elif not game and self.flat_samples >= 3:
+            mode, interval = "ralenti", max(base, self.config.get("idle_interval", 5000) / 1000)
+        else:
+            mode, interval = "normal", base
+        if mode != self.mode:
+            logging.info(f"Rafraîchissement {mode} pour {self.hostname} : {interval:.1f}s")
+            self.mode = mode
+        self.interval = interval
+        return interval
+
+    def delay(self, now):
+        if self.next_due is None:
+            self.next_due = now
+        self.next_due += self.interval
+        if self.next_due < now:
+            self.next_due = now
+        return self.next_due - now
+
+TRACE_MAX_EVENTS = 200000
+
+class StageProfiler:
+    def __init__(self, window=600, trace_path=None):
+        self.window = window
+        self.trace_path = trace_path
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.events = deque(maxlen=TRACE_MAX_EVENTS) if trace_path else None
+        self.threads = {}
+        self.origin = time.perf_counter()
+        self.capture_path = None
+        self.capture_left = {}
+        self.profiles = {}
+
+    def record(self, name, started, ended=None):
+        ended = time.perf_counter() if ended is None else ended
+        self.add(name, (ended - started) * 1000, started)
+        return ended
+
+    def add(self, name, duration, started=None):
+        with self.lock:
+            samples = self.stages.get(name)
+            if samples is None:
+                samples = self.stages[name] = deque(maxlen=self.window)
+            samples.append(duration)
+            if self.events is not None:
+                tid = threading.get_ident()
+                if tid not in self.threads:
+                    self.threads[tid] = threading.current_thread().name
+                if started is None:
+                    started = time.perf_counter() - duration / 1000
+                self.events.append((name, started, duration, tid))
+
+    def samples(self, name):
+        with self.lock:
+            return list(self.stages.get(name, ()))
+
+    def summary(self):
+        with self.lock:
+            stages = {name: list(samples) for name, samples in self.stages.items()}
+        return {name: (percentile(values, 50), percentile(values, 95), max(values), len(values))
+                for name, values in stages.items() if values}
+
+    def describe(self):
+        return ", ".join(f"{name} p50 {p50:.2f}/p95 {p95:.2f} ms" for name, (p50, p95, _, _) in self.summary().items())
+
+    def export_trace(self, path=None):
+        path = path or self.trace_path
+        with self.lock:
+            events = list(self.events or ())
+            threads = dict(self.threads)
+        pid = os.getpid()
+        trace = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                 for tid, name in threads.items()]
+        trace.extend({"name": name, "cat": "tick", "ph": "X", "pid": pid, "tid": tid,
+                      "ts": round((started - self.origin) * 1e6, 1), "dur": round(duration * 1000, 1)}
+                     for name, started, duration, tid in events)
+        with open(path, "w") as f:
+            f.write(json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"}))
+        logging.info(f"Trace de {len(events)} événements enregistrée dans {path}")
+        return len(events)
+
+    def capture(self, ticks, keys, path):
+        with self.lock:
+            self.capture_path = path
+            self.capture_left = {key: ticks for key in keys}
+            self.profiles = {key: cProfile.Profile() for key in keys}
+        logging.info(f"Profil cProfile armé pour {ticks} ticks de {', '.join(keys)}")
+
+    def begin_tick(self, key):
+        if self.capture_left.get(key, 0) <= 0:
+            return None
+        profile = self.profiles[key]
+        try:
+            profile.enable()
+        except ValueError:
+            return None
+        return profile
+
+    def end_tick(self, key, profile):
+        if profile is None:
+            return
+        profile.disable()
+        with self.lock:
+            self.capture_left[key] -= 1
+            if not self.capture_path or any(left > 0 for left in self.capture_left.values()):
+                return
+            path, self.capture_path = self.capture_path, None
+            profiles = list(self.profiles.values())
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+        logging.info(f"Profil cProfile enregistré dans {path}")
+        print(f"✅ Profil cProfile enregistré dans {path}")
+
+    def close(self):
+        if self.trace_path:
+            self.export_trace()
+
+class SampleQueue:
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+        self.coalesced = 0
+
+    def latest(self):
+        latest = None
+        count = 0
+        while True:
+            try:
+                latest = self.samples.popleft()
+            except IndexError:
+                break
+            count += 1
+        if count > 1:
+            self.coalesced += count - 1
+        return latest
+
+class StatsCollector(SampleQueue):
+    def __init__(self, ssh_manager, config, monitor=None, discover=True, recorder=None, profiler=None):
+        super().__init__(config.get("sample_queue_size", 32))
+        self.ssh_manager = ssh_manager
+        self.config = config
+        self.monitor = monitor or HostMonitor(ssh_manager.hostname)
+        self.discover = discover
+        self.recorder = recorder
+        self.profiler = profiler
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.reconnecting = False
+        self.next_retry = 0.0
+        self.net_zero_counter = 0
+        self.net_zero_threshold = 3
+        self.stream_mode = config.get("stream_mode", True)
+        self.stream_waiting = False
+        self.stream_failures = 0
+        self.scheduler = AdaptiveScheduler(config, self.monitor.hostname)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True, name=f"StatsCollector-{self.monitor.hostname}")
+        self.thread.start()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.stop_event.wait(self.collect_once())
+
+    def collect_once(self):
+        key = self.monitor.hostname
+        profile = self.profiler.begin_tick(key) if self.profiler else None
+        try:
+            return self.collect_tick()
+        finally:
+            if profile is not None:
+                self.profiler.end_tick(key, profile)
+
+    def collect_tick(self):
+        started = time.time()
+        interval = self.scheduler.interval
+        poll_interval = self.config.get("stream_poll_interval", 100) / 1000
+        if self.reconnecting:
+            if started < self.next_retry:
+                return min(self.next_retry - started, interval)
+            self.reconnect_ssh()
+            return interval
+        if self.stream_mode:
+            stats = self.poll_stream(interval)
+            if stats is None and self.stream_waiting:
+                return poll_interval
+        else:
+            stats = fetch_all_stats(self.ssh_manager, self.profiler)
+        if stats:
+            if self.recorder:
+                self.recorder.write(self.monitor.hostname, time.time(), stats["lines"])
+            try:
+                processing = time.perf_counter()
+                self.monitor.process(stats)
+                if self.profiler:
+                    self.profiler.record("process", processing)
+            except Exception as e:
+                logging.error(f"Erreur lors du traitement d'un échantillon de {self.monitor.hostname} : {e}")
+            self.samples.append((time.time(), stats))
+            self.net_zero_counter = 0
+            if self.scheduler.observe(self.monitor, started) != interval and self.stream_mode:
+                self.ssh_manager.set_stream_interval(self.scheduler.interval)
+        else:
+            logging.warning("Aucune donnée reçue, tentative de reconnexion si nécessaire.")
+            self.net_zero_counter += 1
+            if not self.stream_mode and self.ssh_manager.execute_command("echo test") == "N/A":
+                logging.info(f"Test de connexion échoué (compteur = {self.net_zero_counter})")
+            if self.net_zero_counter >= self.net_zero_threshold:
+                self.reconnecting = True
+                self.reconnect_ssh()
+        if self.stream_mode and self.stream_waiting:
+            return poll_interval
+        return self.scheduler.delay(time.time())
+
+    def poll_stream(self, interval):
+        manager = self.ssh_manager
+        if manager.stream_alive():
+            reading = time.perf_counter()
+            stats = manager.read_stream_sample()
+            self.stream_waiting = manager.stream_alive()
+            if stats:
+                self.stream_failures = 0
+                if self.profiler:
+                    self.profiler.record("stream", reading)
+                    self.profiler.add("remote", manager.stream_last_build_us / 1000)
+            return stats
+        self.stream_waiting = False
+        if manager.stream_channel is not None:
+            manager.read_stream_sample()
+            logging.warning(f"Flux interrompu après {manager.stream_frames} échantillons.")
+            if manager.stream_frames == 0:
+                self.stream_failures += 1
+        if self.stream_failures >= 3:
+            logging.warning("Agent de streaming indisponible, retour au mode exec_command.")
+            manager.stop_stream()
+            self.stream_mode = False
+            return fetch_all_stats(manager, self.profiler)
+        self.stream_waiting = manager.start_stream(interval, self.config.get("hires_rate", 0))
+        return None
+
+    def reconnect_ssh(self):
+        logging.info("Tentative de reconnexion SSH...")
+        manager = self.ssh_manager
+        manager.stop_stream()
+        if manager.connect():
+            self.reconnected(manager.hostname)
+            return
+        if self.discover and manager.failures >= self.config.get("ssh_failures_before_discovery", 3):
+            new_hostname = get_recalbox_ip(self.config)
+            if new_hostname and new_hostname != manager.hostname:
+                candidate = SSHManager(new_hostname, manager.port, manager.username, manager.password, self.config)
+                if candidate.client:
+                    manager.close()
+                    self.ssh_manager = candidate
+                    self.reconnected(new_hostname)
+                    return
+                logging.error("Reconnexion échouée malgré la nouvelle IP.")
+                print("❌ Reconnexion échouée malgré la nouvelle IP.")
+            elif not new_hostname:
+                logging.error("Nouvelle IP introuvable sur le réseau.")
+                print("❌ Impossible de retrouver une nouvelle IP sur le réseau.")
+        self.next_retry = self.ssh_manager.next_attempt
+        logging.info(f"Nouvelle tentative de reconnexion dans {max(0.0, self.next_retry - time.time()):.1f}s "
+                     f"({self.ssh_manager.failures} échecs consécutifs)")
+
+    def reconnected(self, hostname):
+        self.reconnecting = False
+        self.net_zero_counter = 0
+        logging.info(f"Reconnexion réussie avec l'IP : {hostname}")
+        print(f"✅ Reconnexion réussie avec l'IP : {hostname}")
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=5)
+        self.ssh_manager.close()
+
+class SampleRecorder:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.file = open(path, "a", buffering=1, encoding="utf-8")
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def write(self, host, timestamp, lines):
+        record = json.dumps({"host": host, "t": round(timestamp, 3), "lines": lines}, ensure_ascii=False)
+        with self.lock:
+            self.file.write(record + "\n")
+            self.count += 1
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+        logging.info(f"{self.count} échantillons enregistrés dans {self.path}")
+
+def load_recording(path):
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            try:
+                record = json.loads(line)
+                entries.append((float(record["t"]), record["host"], record["lines"]))
+            except (ValueError, KeyError, TypeError) as e:
+                logging.warning(f"Ligne {number} ignorée dans {path} : {e}")
+    entries.sort(key=lambda entry: entry[0])
+    return entries
+
+class ReplayCollector(SampleQueue):
+    def __init__(self, hostname, config, clock):
+        super().__init__(config.get("sample_queue_size", 32))
+        self.hostname = hostname
+        self.config = config
+        self.clock = clock
+        self.monitor = HostMonitor(hostname, history_csv=None, clock=clock)
+        self.reconnecting = False
+
+    def reset(self):
+        self.monitor = HostMonitor(self.hostname, history_csv=None, clock=self.clock)
+        self.samples.clear()
+
+class ReplayPlayer:
+    def __init__(self, entries, config, speed=1.0):
+        self.entries = entries
+        self.config = config
+        self.speed = speed
+        self.start_time = entries[0][0] if entries else 0.0
+        self.end_time = entries[-1][0] if entries else 0.0
+        self.position = self.start_time
+        self.index = 0
+        self.paused = False
+        self.played = 0
+        self.anchor = None
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.collectors = {host: ReplayCollector(host, config, self.clock)
+                           for host in dict.fromkeys(entry[1] for entry in entries)}
+
+    def clock(self):
+        return self.position
+
+    def finished(self):
+        return self.index >= len(self.entries)
+
+    def feed(self, entry, publish=True):
+        timestamp, host, lines = entry
+        self.position = timestamp
+        collector = self.collectors[host]
+        stats = parse_stats_frame(lines)
+        try:
+            collector.monitor.process(stats)
+        except Exception as e:
+            logging.error(f"Erreur lors du rejeu d'un échantillon de {host} : {e}")
+        if publish:
+            collector.samples.append((time.time(), stats))
+        self.played += 1
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True, name="ReplayPlayer")
+        self.thread.start()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            with self.condition:
+                if self.paused or self.finished():
+                    self.condition.wait(0.5)
+                    continue
+                entry = self.entries[self.index]
+                if self.speed:
+                    if self.anchor is None:
+                        self.anchor = (time.perf_counter(), self.position)
+                    delay = self.anchor[0] + (entry[0] - self.anchor[1]) / self.speed - time.perf_counter()
+                    if delay > 0:
+                        self.condition.wait(delay)
+                        continue
+                self.index += 1
+                self.feed(entry)
+
+    def pause(self):
+        with self.condition:
+            self.paused = True
+            self.anchor = None
+
+    def resume(self):
+        with self.condition:
+            self.paused = False
+            self.anchor = None
+            self.condition.notify()
+
+    def set_speed(self, speed):
+        with self.condition:
+            self.speed = speed
+            self.anchor = None
+            self.condition.notify()
+
+    def seek(self, target):
+        with self.condition:
+            target = min(max(target, self.start_time), self.end_time)
+            if target < self.position:
+                for collector in self.collectors.values():
+                    collector.reset()
+                self.index = 0
+            while self.index < len(self.entries) and self.entries[self.index][0] <= target:
+                self.feed(self.entries[self.index], publish=False)
+                self.index += 1
+            self.position = target
+            self.anchor = None
+            for collector in self.collectors.values():
+                collector.samples.append((time.time(), None))
+            self.condition.notify()
+
+    def stop(self):
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify()
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=5)
+
+def host_online(collector, now):
+    return not collector.reconnecting and now - collector.monitor.last_update < 5 * collector.scheduler.interval
+
+class FleetCollector:
+    def __init__(self, collectors, config):
+        self.collectors = collectors
+        self.config = config
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=config.get("fleet_workers", 8),
+                                                          thread_name_prefix="FleetWorker")
+        self.next_due = {host: 0.0 for host in collectors}
+        self.pending = {}
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True, name="FleetCollector")
+        self.thread.start()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            now = time.time()
+            for host, collector in self.collectors.items():
+                future = self.pending.get(host)
+                if (future is None or future.done()) and now >= self.next_due[host]:
+                    self.pending[host] = self.pool.submit(self.collect, host, collector)
+            self.stop_event.wait(self.config.get("stream_poll_interval", 100) / 1000)
+
+    def collect(self, host, collector):
+        try:
+            delay = collector.collect_once()
+        except Exception as e:
+            logging.error(f"Erreur de collecte pour {host} : {e}")
+            delay = self.config.get("refresh_interval", 1000) / 1000
+        self.next_due[host] = time.time() + delay
+
+    def snapshot(self):
+        now = time.time()
+        overview = {}
+        for host, collector in self.collectors.items():
+            monitor = collector.monitor
+            with monitor.lock:
+                overview[host] = {
+                    "version": monitor.version,
+                    "online": host_online(collector, now),
+                    "cpu": monitor.displayed_cpu_usage,
+                    "ram": monitor.displayed_ram_usage,
+                    "temp": monitor.displayed_cpu_temp,
+                    "imbalance": monitor.core_imbalance,
+                    "killer": monitor.core_killer_alert,
+                    "game": monitor.current_game,
+                    "emulator": monitor.display_emulator,
+                }
+        return overview
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=5)
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        for collector in self.collectors.values():
+            collector.ssh_manager.close()
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+METRIC_FAMILIES = [
+    ("recalbox_up", "gauge", "Hôte joignable et échantillonné récemment."),
+    ("recalbox_cpu_usage_percent", "gauge", "Charge CPU globale."),
+    ("recalbox_core_usage_percent", "gauge", "Charge par core."),
+    ("recalbox_ram_usage_percent", "gauge", "Mémoire utilisée."),
+    ("recalbox_cpu_temperature_celsius", "gauge", "Température CPU."),
+    ("recalbox_core_imbalance_percent", "gauge", "Déséquilibre entre cores sur la fenêtre glissante."),
+    ("recalbox_core_killer", "gauge", "Alerte tueur de core active."),
+    ("recalbox_cpu_frequency_hertz", "gauge", "Fréquence ARM mesurée."),
+    ("recalbox_core_voltage_volts", "gauge", "Tension du core."),
+    ("recalbox_throttled_flags", "gauge", "Drapeaux vcgencmd get_throttled."),
+    ("recalbox_game", "info", "Jeu et émulateur en cours."),
+    ("recalbox_samples", "counter", "Échantillons traités."),
+    ("recalbox_hires_samples", "counter", "Échantillons haute résolution reçus de l'agent."),
+    ("recalbox_hires_rate_hertz", "gauge", "Cadence mesurée du dernier lot haute résolution."),
+    ("recalbox_last_sample_timestamp_seconds", "gauge", "Horodatage du dernier échantillon."),
+    ("recalbox_ssh_latency_seconds", "gauge", "Latence moyenne des commandes SSH."),
+    ("recalbox_ssh_errors", "counter", "Commandes SSH échouées ou expirées."),
+]
+
+def openmetrics_labels(**labels):
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+class MetricsExporter:
+    def __init__(self, collectors, config):
+        self.collectors = collectors
+        self.config = config
+        self.lock = threading.Lock()
+        self.host_samples = {}
+        self.body_key = None
+        self.body = b""
+        self.scrapes = 0
+        self.server = None
+        self.thread = None
+
+    def host_lines(self, host, collector):
+        monitor = collector.monitor
+        cached = self.host_samples.get(host)
+        if cached is not None and cached[0] == monitor.version:
+            return cached[1]
+        with monitor.lock:
+            labels = openmetrics_labels(host=host)
+            ram_usage = monitor.ram_usage_history[-1] if monitor.ram_usage_history else 0.0
+            lines = {
+                "recalbox_cpu_usage_percent": [f"recalbox_cpu_usage_percent{labels} {monitor.cpu_usage:.2f}"],
+                "recalbox_core_usage_percent": [f"recalbox_core_usage_percent{openmetrics_labels(host=host, core=i + 1)} {usage:.2f}"
+                                                for i, usage in enumerate(monitor.last_core_usage)],
+                "recalbox_ram_usage_percent": [f"recalbox_ram_usage_percent{labels} {ram_usage:.2f}"],
+                "recalbox_cpu_temperature_celsius": [f"recalbox_cpu_temperature_celsius{labels} {monitor.cpu_temp:.1f}"],
+                "recalbox_core_imbalance_percent": [f"recalbox_core_imbalance_percent{labels} {monitor.core_imbalance:.2f}"],
+                "recalbox_core_killer": [f"recalbox_core_killer{labels} {int(monitor.core_killer_alert)}"],
+                "recalbox_cpu_frequency_hertz": [f"recalbox_cpu_frequency_hertz{labels} {monitor.cpu_freq * 1e6:.0f}"] if monitor.cpu_freq else [],
+                "recalbox_core_voltage_volts": [f"recalbox_core_voltage_volts{labels} {monitor.core_volts:.4f}"] if monitor.core_volts else [],
+                "recalbox_throttled_flags": [f"recalbox_throttled_flags{labels} {monitor.throttled}"],
+                "recalbox_game": [f"recalbox_game_info{openmetrics_labels(host=host, game=monitor.current_game, emulator=monitor.display_emulator)} 1"],
+                "recalbox_samples": [f"recalbox_samples_total{labels} {monitor.version}"],
+                "recalbox_hires_samples": [f"recalbox_hires_samples_total{labels} {monitor.hires_samples}"],
+                "recalbox_hires_rate_hertz": [f"recalbox_hires_rate_hertz{labels} {monitor.hires_rate:.1f}"] if monitor.hires_samples else [],
+                "recalbox_last_sample_timestamp_seconds": [f"recalbox_last_sample_timestamp_seconds{labels} {monitor.last_update:.3f}"],
+            }
+            self.host_samples[host] = (monitor.version, lines)
+        return lines
+
+    def render(self):
+        now = time.time()
+        states = []
+        for host, collector in self.collectors.items():
+            health = collector.ssh_manager.health()
+            states.append((host, collector.monitor.version, host_online(collector, now), health["latency_ms"],
+                           health["errors"] + health["timeouts"]))
+        with self.lock:
+            self.scrapes += 1
+            key = tuple(states)
+            if key == self.body_key:
+                return self.body
+            families = {name: [] for name, _, _ in METRIC_FAMILIES}
+            for host, _, online, latency_ms, errors in states:
+                labels = openmetrics_labels(host=host)
+                families["recalbox_up"].append(f"recalbox_up{labels} {int(online)}")
+                for name, lines in self.host_lines(host, self.collectors[host]).items():
+                    families[name].extend(lines)
+                if latency_ms is not None:
+                    families["recalbox_ssh_latency_seconds"].append(f"recalbox_ssh_latency_seconds{labels} {latency_ms / 1000:.6f}")
+                families["recalbox_ssh_errors"].append(f"recalbox_ssh_errors_total{labels} {errors}")
+            output = []
+            for name, kind, help_text in METRIC_FAMILIES:
+                output.append(f"# TYPE {name} {kind}")
+                output.append(f"# HELP {name} {help_text}")
+                output.extend(families[name])
+            output.append("# EOF")
+            self.body_key = key
+            self.body = ("\n".join(output) + "\n").encode()
+            return self.body
+
+    def start(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.render()
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        address = (self.config.get("metrics_address", "127.0.0.1"), self.config.get("metrics_port", 0))
+        self.server = ThreadingHTTPServer(address, Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True, name="MetricsExporter")
+        self.thread.start()
+        logging.info(f"Export OpenMetrics disponible sur http://{address[0]}:{self.server.server_port}/metrics")
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+def start_metrics_exporter(collectors, config):
+    if not config.get("metrics_port"):
+        return None
+    exporter = MetricsExporter(collectors, config)
+    try:
+        exporter.start()
+    except OSError as e:
+        logging.error(f"Impossible de démarrer l'export OpenMetrics sur le port {config['metrics_port']} : {e}")
+        print(f"❌ Impossible de démarrer l'export OpenMetrics : {e}")
+        return None
+    return exporter
+
+def add_host_arguments(parser):
+    parser.add_argument("--hosts", help="hôtes à surveiller, séparés par des virgules (mode flotte)")
+    parser.add_argument("--discover", action="store_true", help="surveiller tous les Recalbox trouvés sur le réseau")
+    parser.add_argument("--hires", type=float, help="fréquence d'échantillonnage haute résolution sur le Pi (Hz, 0 = désactivé)")
+    parser.add_argument("--metrics-port", type=int, help="port HTTP de l'export OpenMetrics (0 = désactivé)")
+    parser.add_argument("--record", action="store_true", help="enregistrer les échantillons bruts pour le rejeu (JSONL)")
+    parser.add_argument("--trace", metavar="FICHIER", help="exporter les étapes de chaque tick en trace Chrome (JSON) à l'arrêt")
+    parser.add_argument("--profile-ticks", type=int, help="capturer un profil cProfile sur N ticks")
+
+def apply_arguments(args, config):
+    if args.hires is not None:
+        config["hires_rate"] = args.hires
+    if args.metrics_port is not None:
+        config["metrics_port"] = args.metrics_port
+    if args.record:
+        config["record_samples"] = True
+    if args.trace:
+        config["trace_file"] = args.trace
+    if args.profile_ticks is not None:
+        config["profile_ticks"] = args.profile_ticks
+    return config
+
+def resolve_hosts(args, config):
+    if args.hosts:
+        return [host.strip() for host in args.hosts.split(",") if host.strip()]
+    if args.discover:
+        return scan_recalbox_hosts(config)
+    return config.get("fleet_hosts", [])
+
+def open_stores(config):
+    store = SampleStore(config.get("sample_store_dir", "samples")) if config.get("enable_sample_store", True) else None
+    history = HistoryStore(config.get("history_db", "historique.db"))
+    history.import_csv(HISTORY_CSV_FILE)
+    return store, history
+
+def open_recorder(config):
+    if not config.get("record_samples"):
+        return None
+    path = os.path.join(config.get("recordings_dir", "recordings"),
+                        datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".jsonl")
+    logging.info(f"Enregistrement des échantillons bruts dans {path}")
+    return SampleRecorder(path)
+
+def create_profiler(config):
+    return StageProfiler(config.get("profiler_window", 600), config.get("trace_file") or None)
+
+def capture_profile(profiler, config, keys):
+    if config.get("profile_ticks", 0) > 0:
+        profiler.capture(config["profile_ticks"], list(keys),
+                         datetime.datetime.now().strftime("profile-%Y%m%d-%H%M%S.prof"))
+
+def create_collectors(hosts, config, store, history, discover=False, recorder=None, profiler=None, port=22,
+                      username="root", password="recalboxroot"):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=config.get("fleet_workers", 8)) as executor:
+        managers = list(executor.map(lambda host: SSHManager(host, port, username, password, config), hosts))
+    return {manager.hostname: StatsCollector(manager, config, HostMonitor(manager.hostname, store, history),
+                                             discover=discover, recorder=recorder, profiler=profiler)
+            for manager in managers}
+
+def log_status(collectors):
+    for host, collector in collectors.items():
+        monitor = collector.monitor
+        health = collector.ssh_manager.health()
+        with monitor.lock:
+            online = host_online(collector, time.time())
+            logging.info(f"[{host}] {'en ligne' if online else 'hors ligne'} - "
+                         f"CPU {monitor.displayed_cpu_usage:.1f}% RAM {monitor.displayed_ram_usage:.1f}% "
+                         f"Temp {monitor.displayed_cpu_temp:.1f}°C {monitor.cpu_freq:.0f} MHz"
+                         + (f" bridé ({describe_throttle(monitor.throttled)})" if monitor.throttled & THROTTLE_ACTIVE else "")
+                         + (f" - haute résolution {monitor.hires_rate:.0f} Hz ({monitor.hires_samples} échantillons)"
+                            if monitor.hires_samples else "")
+                         + f" - jeu '{monitor.current_game or 'Aucun'}' - "
+                         f"{monitor.sessions_exported} sessions exportées - {health['commands']} commandes, "
+                         f"{health['errors']} erreurs")
+
+def main():
+    parser = argparse.ArgumentParser(description="Collecteur Recalbox sans interface (mode démon)")
+    add_host_arguments(parser)
+    parser.add_argument("--status-interval", type=float, default=60, help="intervalle du journal d'état (s)")
+    args = parser.parse_args()
+    config = apply_arguments(args, load_config())
+    hosts = resolve_hosts(args, config)
+    if not hosts:
+        hostname = get_recalbox_ip(config)
+        if not hostname:
+            logging.error("Impossible de trouver Recalbox sur le réseau.")
+            print("❌ Impossible de trouver Recalbox sur le réseau.")
+            return 1
+    store, history = open_stores(config)
+    recorder = open_recorder(config)
+    profiler = create_profiler(config)
+    if hosts:
+        collectors = create_collectors(hosts, config, store, history, recorder=recorder, profiler=profiler)
+        runner = FleetCollector(collectors, config)
+    else:
+        collectors = create_collectors([hostname], config, store, history, discover=True, recorder=recorder,
+                                       profiler=profiler)
+        runner = collectors[hostname]
+    capture_profile(profiler, config, collectors)
+    stop_event = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda signum, frame: stop_event.set())
+    runner.start()
+    exporter = start_metrics_exporter(collectors, config)
+    logging.info(f"Collecte sans interface démarrée pour {', '.join(collectors)}")
+    print(f"✅ Collecte sans interface démarrée pour {', '.join(collectors)}")
+    while not stop_event.wait(args.status_interval):
+        log_status(collectors)
+        logging.info(f"Étapes : {profiler.describe()}")
+    if exporter:
+        exporter.stop()
+    runner.stop()
+    profiler.close()
+    for collector in collectors.values():
+        with collector.monitor.lock:
+            if collector.monitor.current_game:
+                collector.monitor.export_current_session()
+    if recorder:
+        recorder.close()
+    if store:
+        store.close()
+    history.close()
+    logging.info("Collecte sans interface arrêtée.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,40 +1,27 @@
-import paramiko
 import customtkinter as ctk
 import tkinter as tk
 import tkinter.messagebox as messagebox
 import tkinter.ttk as ttk
+import tkinter.filedialog as filedialog
 import time
-import datetime
 import matplotlib
 from collections import deque, defaultdict
-import socket
 import logging
 import os
-import json
-import csv
-import concurrent.futures
-import re
 import matplotlib.colors as mcolors
-import random
+import numpy as np
+import math
+import argparse
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    filename="dashboard.log",
-    filemode="a"
-)
+from collector41 import (HISTORY_CSV_FILE, THROTTLE_ACTIVE, FleetCollector, ReplayPlayer, SessionScorer,
+                         add_host_arguments, apply_arguments, capture_profile, create_collectors, create_profiler,
+                         describe_throttle, get_recalbox_ip, load_config, load_recording, open_recorder, open_stores,
+                         percentile, resolve_hosts, start_metrics_exporter, score_column)
 
 matplotlib.use("TkAgg")
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 
-CONFIG_FILE = "config.json"
-
-def smooth_transition(current, target, alpha=0.2, seuil=20):
-    if abs(target - current) > seuil:
-        return target
-    return current + alpha * (target - current)
-
 def animate_button_color_lr(button, start_color, end_color, steps=20, delay=20):
     def hex_to_rgb(hex_color):
         hex_color = hex_color.lstrip('#')
@@ -105,136 +92,410 @@ def compute_gradient_color(fraction):
     b = int(start[2] + t*(end[2]-start[2]))
     return f"#{r:02x}{g:02x}{b:02x}"
 
-def load_config():
-    default_config = {
-        "refresh_interval": 1000,
-        "cpu_alert_threshold": 90.0,
-        "temp_alert_threshold": 80.0,
-        "net_interface": "wlan0",
-        "font_size": 18,
-        "enable_history": True,
-        "bar_width": 200,
-        "bar_height": 20,
-        "cpu_alert_color": "#FF0000",
-        "temp_alert_color": "#FFA500",
-        "window_width": 940,
-        "window_height": 380,
-        "font_color": "White",
-        "row_spacing": 5,
-        "col_spacing": 10,
-        "char_spacing": 0,
-        "enable_animations": False,
-    }
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, "r") as f:
-                config = json.load(f)
-            for key, value in default_config.items():
-                if key not in config:
-                    config[key] = value
-            logging.info("Configuration chargée depuis config.json")
-            return config
-        except Exception as e:
-            logging.error(f"Erreur lors du chargement de la config : {e}")
-    return default_config
-
-def save_config(config):
-    try:
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(config, f, indent=4)
-        logging.info("Configuration sauvegardée dans config.json")
-    except Exception as e:
-        logging.error(f"Erreur lors de la sauvegarde de la config : {e}")
-
-def get_recalbox_ip():
-    try:
-        ip = socket.gethostbyname("recalbox")
-        if ip.startswith("192.168"):
-            logging.info(f"Recalbox détecté via DNS à l'adresse : {ip}")
-            print(f"✅ Recalbox détecté à l'adresse : {ip}")
-            return ip
-    except socket.gaierror:
-        logging.warning("Impossible de résoudre 'recalbox' via DNS. Passage au scan...")
-    possible_ips = [f"192.168.1.{i}" for i in range(2,255)]
-    def scan_ip(ip):
-        try:
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            client.connect(ip, port=22, username="root", password="recalboxroot", timeout=2)
-            client.close()
-            return ip
-        except Exception:
+def format_duration(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+REPLAY_SPEEDS = {"1x": 1.0, "10x": 10.0, "Max": 0.0}
+
+def release_canvas(canvas):
+    canvas.get_tk_widget().destroy()
+    canvas.figure.clear()
+
+class LiveChart:
+    def __init__(self, canvas, ax, line, window=60, shrink_ratio=0.6):
+        self.canvas = canvas
+        self.ax = ax
+        self.line = line
+        self.shrink_ratio = shrink_ratio
+        self.x_data = np.arange(window)
+        self.values = np.zeros(0)
+        self.envelope = None
+        self.top = None
+        self.background = None
+        self.band = ax.fill_between([], [], [], color=line.get_color(), alpha=0.25, linewidth=0)
+        self.band.set_animated(True)
+        line.set_animated(True)
+        ax.set_xlim(0, window - 1)
+        canvas.mpl_connect("draw_event", self.on_draw)
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.ax.draw_artist(self.band)
+        self.ax.draw_artist(self.line)
+
+    def render(self):
+        values = self.values
+        self.line.set_data(self.x_data[:len(values)], values)
+        peak = float(values.max()) if len(values) else 100.0
+        envelope = self.envelope
+        if envelope is not None and len(envelope) and np.any(envelope[:, 0] != envelope[:, 1]):
+            x = self.x_data[len(values) - len(envelope):len(values)]
+            self.band.set_verts([np.concatenate([np.column_stack([x, envelope[:, 1]]),
+                                                 np.column_stack([x[::-1], envelope[::-1, 0]])])])
+            peak = max(peak, float(envelope[:, 1].max()))
+        else:
+            self.band.set_verts([])
+        target = max(peak * 1.1, 1.0)
+        if self.top is None or target > self.top or target < self.top * self.shrink_ratio:
+            self.top = target
+            self.ax.set_ylim(0, target)
+            self.canvas.draw()
+            return True
+        if self.background is None:
+            self.canvas.draw()
+            return True
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.band)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.bbox)
+        return False
+
+class ChartRenderer:
+    def __init__(self, widget=None, profiler=None):
+        self.widget = widget
+        self.profiler = profiler
+        self.charts = {}
+        self.dirty = set()
+        self.pending = False
+        self.full_draws = 0
+        self.blits = 0
+
+    def add(self, name, chart):
+        self.charts[name] = chart
+
+    def update(self, name, history, envelope=None):
+        if name not in self.charts:
+            return
+        self.charts[name].values = np.fromiter(history, dtype=float, count=len(history))
+        if envelope is not None:
+            self.charts[name].envelope = np.array(envelope, dtype=float).reshape(-1, 2)[-len(history):]
+        self.dirty.add(name)
+        if not self.pending and self.widget is not None:
+            self.pending = True
+            self.widget.after_idle(self.flush)
+
+    def flush(self):
+        started = time.perf_counter()
+        self.pending = False
+        for name, chart in self.charts.items():
+            if name not in self.dirty:
+                continue
+            try:
+                if chart.render():
+                    self.full_draws += 1
+                else:
+                    self.blits += 1
+            except Exception as e:
+                logging.error(f"Erreur lors du rendu du graphique {name} : {e}")
+        if self.profiler and self.dirty:
+            self.profiler.record("draw", started)
+        self.dirty.clear()
+
+class VirtualTable:
+    def __init__(self, tree, scrollbar=None, rowheight=25, numeric=()):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.rowheight = rowheight
+        self.columns = list(tree["columns"])
+        self.numeric = {name: index for index, name in enumerate(numeric)}
+        self.rows = []
+        self.keys = []
+        self.tags = []
+        self.key_cache = {}
+        self.order = np.zeros(0, dtype=np.int64)
+        self.sort_column = None
+        self.sort_reverse = False
+        self.offset = 0
+        self.visible = int(tree["height"]) if tree["height"] else 15
+        self.selected = set()
+        self.slots = []
+
+    def clear(self):
+        self.rows = []
+        self.keys = []
+        self.tags = []
+        self.key_cache = {}
+        self.order = np.zeros(0, dtype=np.int64)
+        self.offset = 0
+        self.selected = set()
+        self.refresh()
+
+    def append(self, rows, tags=None):
+        if not rows:
+            return
+        for row in rows:
+            self.rows.append(tuple(row[:len(self.columns)]))
+            self.keys.append(row[len(self.columns):])
+        self.tags.extend(tags or [()] * len(rows))
+        self.key_cache = {}
+        if self.sort_column is None:
+            self.order = np.arange(len(self.rows))
+        else:
+            self.order = self.sorted_order(self.sort_column, self.sort_reverse)
+        self.refresh()
+
+    def sort_key(self, column):
+        if column not in self.key_cache:
+            if column in self.numeric:
+                index = self.numeric[column]
+                self.key_cache[column] = np.array([key[index] if key[index] is not None else np.nan for key in self.keys], dtype=float)
+            else:
+                index = self.columns.index(column)
+                self.key_cache[column] = [row[index] for row in self.rows]
+        return self.key_cache[column]
+
+    def sorted_order(self, column, reverse):
+        keys = self.sort_key(column)
+        if isinstance(keys, np.ndarray):
+            order = np.argsort(keys, kind="stable")
+        else:
+            order = np.array(sorted(range(len(keys)), key=keys.__getitem__), dtype=np.int64)
+        return order[::-1] if reverse else order
+
+    def sort(self, column):
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_reverse = False
+        self.sort_column = column
+        self.order = self.sorted_order(column, self.sort_reverse)
+        self.offset = 0
+        self.refresh()
+
+    def refresh(self):
+        count = len(self.order)
+        self.offset = max(0, min(self.offset, count - self.visible))
+        window = self.order[self.offset:self.offset + self.visible]
+        while len(self.slots) < len(window):
+            self.slots.append(self.tree.insert("", "end"))
+        while len(self.slots) > len(window):
+            self.tree.delete(self.slots.pop())
+        selection = []
+        for slot, index in zip(self.slots, window):
+            row = self.rows[index]
+            self.tree.item(slot, values=row, tags=self.tags[index])
+            if index in self.selected:
+                selection.append(slot)
+        self.tree.selection_set(selection)
+        if self.scrollbar is not None:
+            if count:
+                self.scrollbar.set(self.offset / count, min(1.0, (self.offset + self.visible) / count))
+            else:
+                self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(int(offset), len(self.order) - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(value) * len(self.order))
+        elif action == "scroll":
+            step = self.visible if unit == "pages" else 1
+            self.scroll_to(self.offset + int(value) * step)
+
+    def on_wheel(self, event):
+        if getattr(event, "num", None) == 4:
+            delta = -3
+        elif getattr(event, "num", None) == 5:
+            delta = 3
+        else:
+            delta = -3 if event.delta > 0 else 3
+        self.scroll_to(self.offset + delta)
+        return "break"
+
+    def on_resize(self, event):
+        visible = max(1, (event.height - self.rowheight) // self.rowheight)
+        if visible != self.visible:
+            self.visible = visible
+            self.refresh()
+
+    def on_select(self, event=None):
+        chosen = set(self.tree.selection())
+        for slot, index in zip(self.slots, self.order[self.offset:self.offset + self.visible]):
+            if slot in chosen:
+                self.selected.add(int(index))
+            else:
+                self.selected.discard(int(index))
+
+    def selected_rows(self):
+        return [self.rows[index] for index in self.order if index in self.selected]
+
+    def selected_keys(self):
+        return [self.keys[index] for index in self.order if index in self.selected]
+
+    def select_all(self, event=None):
+        self.selected = set(range(len(self.rows)))
+        self.refresh()
+        return "break"
+
+    def row_at(self, y):
+        slot = self.tree.identify_row(y)
+        if slot not in self.slots:
             return None
-    with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-        futures = {executor.submit(scan_ip, ip): ip for ip in possible_ips}
-        for future in concurrent.futures.as_completed(futures):
-            result = future.result()
-            if result:
-                logging.info(f"Recalbox détecté par scan à l'adresse : {result}")
-                print(f"✅ Recalbox détecté à l'adresse : {result}")
-                return result
-    logging.error("Recalbox introuvable sur le réseau.")
-    print("❌ Recalbox introuvable sur le réseau.")
-    return None
-
-class SSHManager:
-    def __init__(self, hostname, port, username, password):
-        self.hostname = hostname
-        self.port = port
-        self.username = username
-        self.password = password
-        self.client = None
-        self.connect()
-
-    def connect(self):
-        try:
-            self.client = paramiko.SSHClient()
-            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            self.client.connect(self.hostname, self.port, self.username, self.password)
-            logging.info(f"Connexion SSH établie avec {self.hostname}")
-        except Exception as e:
-            logging.error(f"[Erreur SSH] Impossible de se connecter à {self.hostname} : {e}")
-            self.client = None
+        return self.rows[self.order[self.offset + self.slots.index(slot)]]
+
+COMPARISON_METRICS = [
+    ("CPU Min (%)", "min_cpu", 0, 1),
+    ("CPU Moyen (%)", "avg_cpu", 1, 1),
+    ("CPU Max (%)", "max_cpu", 2, 1),
+    ("RAM Min (%)", "min_ram", 0, 2),
+    ("RAM Moyen (%)", "avg_ram", 1, 2),
+    ("RAM Max (%)", "max_ram", 2, 2),
+    ("Temp CPU Moyenne (°C)", "avg_cpu_temp", 0, 3),
+    ("Core Imbalance (%)", "core_imbalance", 2, 3),
+]
+COMPARISON_FIELDS = ["game", "emulator", "core_killer"] + [field for _, field, _, _ in COMPARISON_METRICS]
+SUMMARY_NUMERIC = ("CPU (A/M/X)", "RAM (A/M/X)", "CPU Temp (A)", "Core Imbalance", "Score")
+GROUPINGS = {"Sessions": None, "Par jeu": "game", "Par émulateur": "emulator"}
+COMPARISON_LABEL_LIMIT = 30
+ROLLUP_TABLE_COLUMNS = [
+    ("name", "Nom", 160, str),
+    ("sessions", "Sessions", 70, str),
+    ("play_time", "Temps de jeu", 100, lambda v: f"{int(v) // 3600}h{int(v) // 60 % 60:02d}"),
+    ("avg_cpu", "CPU moy", 90, lambda v: f"{v:.1f}%"),
+    ("avg_ram", "RAM moy", 90, lambda v: f"{v:.1f}%"),
+    ("avg_cpu_temp", "Temp moy", 90, lambda v: f"{v:.1f}°C"),
+    ("max_cpu_temp", "Temp max", 90, lambda v: f"{v:.1f}°C"),
+    ("core_imbalance", "Imbalance", 90, lambda v: f"{v:.1f}"),
+    ("avg_cpu_freq", "Fréq moy", 90, lambda v: f"{v:.0f} MHz"),
+    ("killer_rate", "Tueur", 70, lambda v: f"{v:.0f}%"),
+    ("last_played", "Dernière session", 140, str),
+]
+COMPARISON_LEGEND_LIMIT = 10
+COMPARISON_PROFILE_BINS = 500
+
+def comparison_colors(count):
+    colors = list(mcolors.TABLEAU_COLORS.values())
+    if count <= len(colors):
+        return colors[:count]
+    return matplotlib.colormaps["turbo"](np.linspace(0.05, 0.95, count))
+
+def group_reduce(values, starts, field):
+    if field.startswith("min_"):
+        return np.fmin.reduceat(values, starts)
+    if field.startswith("max_"):
+        return np.fmax.reduceat(values, starts)
+    valid = ~np.isnan(values)
+    totals = np.add.reduceat(np.where(valid, values, 0.0), starts)
+    counts = np.add.reduceat(valid.astype(np.int64), starts)
+    return np.divide(totals, counts, out=np.full(len(starts), np.nan), where=counts > 0)
+
+def comparison_fields(scorer):
+    return COMPARISON_FIELDS + [field for field in scorer.fields if field not in COMPARISON_FIELDS]
+
+def comparison_data(columns, scorer, group_by=None):
+    labels = columns["game"].astype(str)
+    details = columns["emulator"].astype(str)
+    killers = columns["core_killer"] == "Oui"
+    values = {field: columns[field] for _, field, _, _ in COMPARISON_METRICS}
+    values.update({field: score_column(field, columns[field]) for field in scorer.fields})
+    counts = np.ones(len(labels), dtype=np.int64)
+    if group_by and len(labels):
+        keys = columns[group_by].astype(str)
+        others = details if group_by == "game" else labels
+        labels, inverse = np.unique(keys, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        starts = np.flatnonzero(np.r_[True, np.diff(inverse[order]) != 0])
+        counts = np.diff(np.r_[starts, len(order)])
+        values = {field: group_reduce(column[order], starts, field) for field, column in values.items()}
+        killers = np.logical_or.reduceat(killers[order], starts)
+        other_labels, other_codes = np.unique(others, return_inverse=True)
+        members = [[] for _ in labels]
+        for pair in np.unique(inverse * len(other_labels) + other_codes).tolist():
+            members[pair // len(other_labels)].append(other_labels[pair % len(other_labels)])
+        if group_by == "game":
+            details = np.array([f"{count} sessions, {'/'.join(names)}" for count, names in zip(counts.tolist(), members)])
+        else:
+            details = np.array([f"{count} sessions, {len(names)} jeux" for count, names in zip(counts.tolist(), members)])
+    scores = scorer.score({field: values[field] for field in scorer.fields})
+    return {
+        "labels": labels.tolist(),
+        "details": details.tolist(),
+        "killers": killers,
+        "counts": counts,
+        "colors": comparison_colors(len(labels)),
+        "metrics": {name: np.nan_to_num(values[field]) for name, field, _, _ in COMPARISON_METRICS},
+        "scores": scores,
+        "group_by": group_by,
+    }
 
-    def execute_command(self, command):
-        if self.client is None:
-            self.connect()
-        try:
-            stdin, stdout, stderr = self.client.exec_command(command)
-            output = stdout.read().decode().strip()
-            return output
-        except Exception as e:
-            logging.error(f"[Erreur SSH] Commande échouée '{command}' : {e}")
-            return "N/A"
-
-    def close(self):
-        if self.client:
-            self.client.close()
-            logging.info(f"Connexion SSH fermée pour {self.hostname}")
-            self.client = None
-
-def fetch_all_stats(ssh_manager):
-    commands = [
-        "grep '^cpu ' /proc/stat",
-        "grep '^cpu[0-3] ' /proc/stat",
-        "free -m | grep Mem:",
-        "vcgencmd measure_temp | grep -o '[0-9]*\\.[0-9]*'",
-        "ps aux | grep 'retroarch' | grep -Eo '([a-zA-Z0-9_]+)_libretro' | head -n 1",
-        "ps aux | grep 'retroarch' | grep -v 'grep' | awk '{for(i=11;i<=NF;i++) printf \"%s \", $i; print \"\"}'"
-    ]
-    combined_command = " && ".join(commands)
-    output = ssh_manager.execute_command(combined_command)
-    if output and output != "N/A":
-        lines = output.splitlines()
-        return {
-            "cpu": lines[0] if len(lines) > 0 else "",
-            "cores": lines[1:5] if len(lines) > 4 else [""] * 4,
-            "mem": lines[5] if len(lines) > 5 else "",
-            "temp": lines[6] if len(lines) > 6 else "0.0",
-            "emulator": lines[7] if len(lines) > 7 else "Aucun",
-            "game": lines[8] if len(lines) > 8 else ""
-        }
-    return None
+def short_name(name):
+    short = " ".join(name.split()[:2])
+    return short[:9] + "..." if len(short) > 12 else short
+
+class ComparisonChart:
+    def __init__(self, figure, fg_color, bg_color):
+        self.figure = figure
+        self.fg_color = fg_color
+        self.bg_color = bg_color
+        self.axes = {name: figure.add_subplot(3, 3, (row - 1) * 3 + col + 1) for name, _, col, row in COMPARISON_METRICS}
+        self.ranking_ax = figure.add_subplot(3, 3, 8)
+        figure.subplots_adjust(left=0.05, right=0.98, top=0.95, bottom=0.03, hspace=0.3, wspace=0.2)
+
+    def update(self, data):
+        labels = data["labels"]
+        positions = np.arange(len(labels))
+        annotate = len(labels) <= COMPARISON_LABEL_LIMIT
+        for name, ax in self.axes.items():
+            values = data["metrics"][name]
+            ax.clear()
+            ax.set_facecolor(self.bg_color)
+            ax.set_title(name, color=self.fg_color, fontsize=12)
+            ax.set_xticks([])
+            ax.tick_params(axis="y", colors=self.fg_color)
+            max_val = float(values.max()) * 1.2 if len(values) and values.max() > 0 else 100
+            ax.set_ylim(0, max_val)
+            if not annotate:
+                edges = np.unique(np.linspace(0, len(labels), COMPARISON_PROFILE_BINS + 1).astype(np.int64))
+                peaks = np.maximum.reduceat(values, edges[:-1])
+                ax.fill_between(edges - 0.5, np.r_[peaks, peaks[-1:]], step="post", color="#3a3a3a")
+                ax.set_xlim(-1, len(labels))
+                continue
+            bars = ax.bar(positions, values, color=data["colors"], edgecolor="white")
+            threshold = max_val * 0.3
+            min_absolute = 10
+            for bar, label in zip(bars, labels):
+                height = bar.get_height()
+                if height > threshold:
+                    ax.text(bar.get_x() + bar.get_width() / 2, height / 2, short_name(label),
+                            ha="center", va="center", rotation=90, color="white", fontsize=8)
+                elif height > min_absolute:
+                    ax.text(bar.get_x() + bar.get_width() / 2, height / 2,
+                            "".join(word[0] for word in label.split()[:2]).upper(),
+                            ha="center", va="center", rotation=90, color="white", fontsize=6)
+            for j, val in enumerate(values.tolist()):
+                ax.text(j, val + max_val * 0.05, f"{val:.1f}", ha="center", va="bottom", color=self.fg_color, fontsize=8)
+        self.update_ranking(data)
+
+    def update_ranking(self, data):
+        ax = self.ranking_ax
+        ax.clear()
+        ax.axis('off')
+        order = np.argsort(-data["scores"], kind="stable")
+
+        def truncate_name(index, max_len=50):
+            full_text = f"{data['labels'][index]} ({data['details'][index]})"
+            if len(full_text) > max_len:
+                return full_text[:max_len-3] + "..."
+            return full_text
+
+        y_pos = 1.0
+        ax.text(0.95, y_pos, "Score/100", ha="right", va="top", color=self.fg_color, fontsize=7)
+        y_pos -= 0.10
+        for title, ranking in (("Top Score:", order[:3]), ("Flop Score:", order[::-1][:3])):
+            ax.text(0.05, y_pos, title, ha="left", va="top", color=self.fg_color, fontsize=7)
+            y_pos -= 0.10
+            for i, index in enumerate(ranking.tolist(), 1):
+                ax.text(0.05, y_pos, f"{i}. ", ha="left", va="top", color=self.fg_color, fontsize=7)
+                ax.text(0.10, y_pos, truncate_name(index), ha="left", va="top", color=data["colors"][index], fontsize=7)
+                ax.text(0.85, y_pos, f"- {data['scores'][index]:.1f}", ha="right", va="top", color=self.fg_color, fontsize=7)
+                if data["killers"][index]:
+                    ax.text(0.95, y_pos, "KILLER", ha="right", va="top", color="#FF0000", fontsize=7, fontweight="bold")
+                y_pos -= 0.10
 
 class AnimatedCTkButton(ctk.CTkButton):
     def __init__(self, *args, **kwargs):
@@ -244,10 +505,21 @@ class AnimatedCTkButton(ctk.CTkButton):
         self.configure(fg_color="#0000FF")
 
 class App(ctk.CTk):
-    def __init__(self, ssh_manager):
+    def __init__(self, collectors, config, fleet_collector=None, sample_store=None, history=None, replay=None,
+                 profiler=None):
         super().__init__()
-        self.ssh_manager = ssh_manager
-        self.config = load_config()
+        self.collectors = collectors
+        self.config = config
+        self.fleet_collector = fleet_collector
+        self.sample_store = sample_store
+        self.history = history
+        self.scorer = SessionScorer(history, config.get("score_model")) if history is not None else None
+        self.replay = replay
+        self.profiler = profiler or create_profiler(config)
+        self.summary_last_id = 0
+        self.fleet_mode = fleet_collector is not None
+        self.active_host = next(iter(collectors))
+        self.collector = collectors[self.active_host]
         self.state('zoomed')
         self.after(100, lambda: self.state('zoomed'))
         self.minsize(940, 450)
@@ -258,44 +530,45 @@ class App(ctk.CTk):
             self.geometry(f"{window_width}x{window_height}")
         self.bg_color = "#121212"
         self.fg_color = "#e0e0e0"
-        self.prev_cpu_stat = None
-        self.cpu_load_history = deque(maxlen=60)
-        self.cpu_temp_history = deque(maxlen=60)
-        self.ram_usage_history = deque(maxlen=60)
-        self.imbalance_history = deque(maxlen=60)
-        self.prev_core_stats = [None] * 4
-        self.core_histories = [deque(maxlen=60) for _ in range(4)]
-        self.last_core_usage = [0, 0, 0, 0]
+        self.last_core_usage = []
         self.displayed_vertical_usage = {}
-        self.session_data = deque(maxlen=3600)
-        self.session_start_time = time.time()
-        self.current_game = ""
-        self.last_emulator = "Aucun"
+        self.sessions_seen = 0
+        self.fleet_tiles = {}
+        self.fleet_versions = {}
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=1)
-        self.net_zero_counter = 0
-        self.net_zero_threshold = 3
+        self.frame_gaps = deque(maxlen=600)
+        self.last_frame_start = None
+        self.last_frame_report = time.time()
+        self.reconnect_max_gap = 0.0
+        self.chart_renderer = ChartRenderer(self, self.profiler)
+        self.comparison_window = None
+        self.comparison_selection = None
         self.create_hidden_button()
         self.create_tabview()
-        self.displayed_cpu_usage = 0.0
-        self.displayed_ram_usage = 0.0
-        self.displayed_cpu_temp = 0.0
-        self.displayed_imbalance = 0.0
-        self.displayed_core_usage = [0.0, 0.0, 0.0, 0.0]
-        self.core_imbalance = 0.0
-        self.imbalance_window_size = 10
-        self.core_usage_window = deque(maxlen=self.imbalance_window_size)
-        self.core_killer_alert = False
+        self.create_profiler_overlay()
+        if self.replay:
+            self.create_replay_bar()
+        if self.fleet_mode:
+            self.create_fleet_tab()
+            self.update_fleet_overview()
+            self.after_idle(self.select_host, self.active_host)
+        else:
+            self.after_idle(self.on_tab_change)
         self.update_all_stats()
 
+    @property
+    def monitor(self):
+        return self.collector.monitor
+
     def create_hidden_button(self):
         self.hidden_button = ctk.CTkButton(self, text="Hidden", command=lambda: None, fg_color="#0000FF")
         self.hidden_button.place_forget()
 
     def get_cell_bg(self, i):
-        if i in [5,6,7,8,9,15,16,17,18,19]:
+        if i in [2,5,6,7,8,9,15,16,17,18,19]:
             return "#1c1c1c"
-        elif i in [0,1,3,4,10,11,13,14]:
+        elif i in [0,1,3,4,10,11,13,14,22]:
             return "#232323"
         else:
             return "#121212"
@@ -313,9 +586,10 @@ class App(ctk.CTk):
         setattr(self, canvas_attr, canvas)
         canvas.get_tk_widget().pack(expand=True, fill="both")
         canvas.get_tk_widget().config(highlightthickness=0, bd=0)
+        self.chart_renderer.add(line_attr[:-len("_line")], LiveChart(canvas, ax, line))
 
     def create_tabview(self):
-        self.tabview = ctk.CTkTabview(self, width=800)
+        self.tabview = ctk.CTkTabview(self, width=800, command=self.on_tab_change)
         self.tabview.grid(row=0, column=0, sticky="nsew", padx=self.config["col_spacing"],
                           pady=self.config["row_spacing"])
         self.tabview.add("Dashboard")
@@ -328,18 +602,51 @@ class App(ctk.CTk):
         except Exception as e:
             logging.warning(f"Erreur lors de la configuration des onglets : {e}")
 
+        self.dashboard_frame = None
+        self.layout_core_count = 0
+
+    def on_tab_change(self):
+        tab = self.tabview.get()
+        if tab == "Dashboard":
+            if self.dashboard_frame is None:
+                self.build_dashboard(self.monitor.core_count or 4)
+            self.render_monitor()
+            self.update_core_vertical_bars()
+        elif tab == "Résumé" and not hasattr(self, "summary_table"):
+            self.update_summary_tab(full=True)
+
+    def dashboard_visible(self):
+        return self.dashboard_frame is not None and self.tabview.get() == "Dashboard"
+
+    def build_dashboard(self, core_count):
+        if self.dashboard_frame is not None:
+            self.dashboard_frame.destroy()
+            self.chart_renderer.charts.clear()
+            self.chart_renderer.dirty.clear()
+        self.layout_core_count = core_count
+        self.core_value_labels = []
+        self.core_vertical_canvases = []
+        self.displayed_vertical_usage = {}
         dashboard_frame = ctk.CTkFrame(self.tabview.tab("Dashboard"), fg_color=self.bg_color)
         dashboard_frame.pack(expand=True, fill="both")
-        rows, cols = 5, 5
+        self.dashboard_frame = dashboard_frame
+        extra_rows = math.ceil(max(0, core_count - 4) / 2)
+        rows, cols = 5 + extra_rows, 5
         for r in range(rows):
             dashboard_frame.grid_rowconfigure(r, weight=1, uniform="row")
         for c in range(cols):
             dashboard_frame.grid_columnconfigure(c, weight=1, uniform="col")
+        core_graph_cells = {1: 0, 3: 1, 11: 2, 13: 3}
+        core_value_cells = {6: 0, 8: 1, 16: 2, 18: 3}
+        half = math.ceil(core_count / 2)
+        core_bar_cells = {7: range(0, half), 17: range(half, core_count)}
         for i in range(25):
             if i == 24:
                 continue
             r = i // cols
             c = i % cols
+            if r == 4:
+                r += extra_rows
             cell_bg = self.get_cell_bg(i)
             cell = ctk.CTkFrame(dashboard_frame, fg_color=cell_bg, border_width=0)
             if i == 23:
@@ -351,16 +658,23 @@ class App(ctk.CTk):
             else:
                 cell.grid(row=r, column=c, padx=self.config["col_spacing"],
                           pady=self.config["row_spacing"], sticky="nsew")
-                if i == 0:
+                if i in core_graph_cells and core_graph_cells[i] < core_count:
+                    self.create_core_graph_cell(cell, core_graph_cells[i])
+                elif i in core_value_cells and core_value_cells[i] < core_count:
+                    self.create_core_value_cell(cell, core_value_cells[i], cell_bg)
+                elif i in core_bar_cells and len(core_bar_cells[i]):
+                    self.create_core_bars_cell(cell, core_bar_cells[i], cell_bg)
+                elif i == 0:
                     self.create_graph_cell(cell, "cpu_load_fig", "cpu_load_ax", "cpu_load_canvas", "cpu_load_line", "purple")
-                elif i == 1:
-                    self.create_graph_cell(cell, "core1_fig", "core1_ax", "core1_canvas", "core1_line", "lime")
                 elif i == 2:
-                    ctk.CTkLabel(cell, text="", text_color=self.fg_color,
-                                 font=("Arial", self.config.get("font_size", 18)),
-                                 fg_color=cell_bg).pack(expand=True)
-                elif i == 3:
-                    self.create_graph_cell(cell, "core2_fig", "core2_ax", "core2_canvas", "core2_line", "lime")
+                    frame_value = ctk.CTkFrame(cell, fg_color=cell_bg, border_width=0)
+                    frame_value.pack(expand=True)
+                    self.cpu_freq_value_label = ctk.CTkLabel(frame_value, text="0 MHz", text_color=self.fg_color,
+                                                             font=("Arial", 38), fg_color=cell_bg)
+                    self.cpu_freq_value_label.pack()
+                    self.clock_status_label = ctk.CTkLabel(frame_value, text="Fréquence ARM", text_color=self.fg_color,
+                                                           font=("Arial", 12), fg_color=cell_bg)
+                    self.clock_status_label.pack()
                 elif i == 4:
                     self.create_graph_cell(cell, "ram_usage_fig", "ram_usage_ax", "ram_usage_canvas", "ram_usage_line", "blue")
                 elif i == 5:
@@ -371,34 +685,6 @@ class App(ctk.CTk):
                     self.cpu_load_value_label.pack()
                     ctk.CTkLabel(frame_value, text="CPU", text_color=self.fg_color,
                                  font=("Arial", 12), fg_color=cell_bg).pack()
-                elif i == 6:
-                    frame_value = ctk.CTkFrame(cell, fg_color=cell_bg, border_width=0)
-                    frame_value.pack(expand=True)
-                    self.core1_value_label = ctk.CTkLabel(frame_value, text="0.0%", text_color=self.fg_color,
-                                                          font=("Arial", 38), fg_color=cell_bg)
-                    self.core1_value_label.pack()
-                    ctk.CTkLabel(frame_value, text="Core 1", text_color=self.fg_color,
-                                 font=("Arial", 12), fg_color=cell_bg).pack()
-                elif i == 7:
-                    vertical_frame = ctk.CTkFrame(cell, fg_color=cell_bg, corner_radius=0)
-                    vertical_frame.pack(expand=True, fill="both")
-                    self.core_vertical_canvases_1 = []
-                    for lbl in ["C1", "C2"]:
-                        subframe = ctk.CTkFrame(vertical_frame, fg_color=cell_bg, width=50, height=100)
-                        subframe.pack(side="left", expand=True, padx=5, pady=5)
-                        canvas = tk.Canvas(subframe, width=30, height=100, bg=cell_bg, highlightthickness=0)
-                        canvas.pack(padx=2, pady=2)
-                        self.core_vertical_canvases_1.append(canvas)
-                        ctk.CTkLabel(subframe, text=lbl, font=("Arial", 14), text_color=self.fg_color,
-                                     fg_color=cell_bg).pack(side="bottom", pady=2)
-                elif i == 8:
-                    frame_value = ctk.CTkFrame(cell, fg_color=cell_bg, border_width=0)
-                    frame_value.pack(expand=True)
-                    self.core2_value_label = ctk.CTkLabel(frame_value, text="0.0%", text_color=self.fg_color,
-                                                          font=("Arial", 38), fg_color=cell_bg)
-                    self.core2_value_label.pack()
-                    ctk.CTkLabel(frame_value, text="Core 2", text_color=self.fg_color,
-                                 font=("Arial", 12), fg_color=cell_bg).pack()
                 elif i == 9:
                     frame_value = ctk.CTkFrame(cell, fg_color=cell_bg, border_width=0)
                     frame_value.pack(expand=True)
@@ -409,14 +695,10 @@ class App(ctk.CTk):
                                  font=("Arial", 12), fg_color=cell_bg).pack()
                 elif i == 10:
                     self.create_graph_cell(cell, "imbalance_fig", "imbalance_ax", "imbalance_canvas", "imbalance_line", "red")
-                elif i == 11:
-                    self.create_graph_cell(cell, "core3_fig", "core3_ax", "core3_canvas", "core3_line", "lime")
                 elif i == 12:
                     self.core_killer_label = ctk.CTkLabel(cell, text="", text_color="#FF0000",
                                                           font=("Arial", 18, "bold"), fg_color=cell_bg)
                     self.core_killer_label.pack(expand=True)
-                elif i == 13:
-                    self.create_graph_cell(cell, "core4_fig", "core4_ax", "core4_canvas", "core4_line", "lime")
                 elif i == 14:
                     self.create_graph_cell(cell, "cpu_temp_fig", "cpu_temp_ax", "cpu_temp_canvas", "cpu_temp_line", "red")
                 elif i == 15:
@@ -427,34 +709,6 @@ class App(ctk.CTk):
                     self.imbalance_value_label.pack()
                     ctk.CTkLabel(frame_value, text="Imbalance", text_color=self.fg_color,
                                  font=("Arial", 12), fg_color=cell_bg).pack()
-                elif i == 16:
-                    frame_value = ctk.CTkFrame(cell, fg_color=cell_bg, border_width=0)
-                    frame_value.pack(expand=True)
-                    self.core3_value_label = ctk.CTkLabel(frame_value, text="0.0%", text_color=self.fg_color,
-                                                          font=("Arial", 38), fg_color=cell_bg)
-                    self.core3_value_label.pack()
-                    ctk.CTkLabel(frame_value, text="Core 3", text_color=self.fg_color,
-                                 font=("Arial", 12), fg_color=cell_bg).pack()
-                elif i == 17:
-                    vertical_frame = ctk.CTkFrame(cell, fg_color=cell_bg, corner_radius=0)
-                    vertical_frame.pack(expand=True, fill="both")
-                    self.core_vertical_canvases_2 = []
-                    for lbl in ["C3", "C4"]:
-                        subframe = ctk.CTkFrame(vertical_frame, fg_color=cell_bg, width=50, height=100)
-                        subframe.pack(side="left", expand=True, padx=5, pady=5)
-                        canvas = tk.Canvas(subframe, width=30, height=100, bg=cell_bg, highlightthickness=0)
-                        canvas.pack(padx=2, pady=2)
-                        self.core_vertical_canvases_2.append(canvas)
-                        ctk.CTkLabel(subframe, text=lbl, font=("Arial", 14), text_color=self.fg_color,
-                                     fg_color=cell_bg).pack(side="bottom", pady=2)
-                elif i == 18:
-                    frame_value = ctk.CTkFrame(cell, fg_color=cell_bg, border_width=0)
-                    frame_value.pack(expand=True)
-                    self.core4_value_label = ctk.CTkLabel(frame_value, text="0.0%", text_color=self.fg_color,
-                                                          font=("Arial", 38), fg_color=cell_bg)
-                    self.core4_value_label.pack()
-                    ctk.CTkLabel(frame_value, text="Core 4", text_color=self.fg_color,
-                                 font=("Arial", 12), fg_color=cell_bg).pack()
                 elif i == 19:
                     frame_value = ctk.CTkFrame(cell, fg_color=cell_bg, border_width=0)
                     frame_value.pack(expand=True)
@@ -463,159 +717,277 @@ class App(ctk.CTk):
                     self.cpu_temp_value_label.pack()
                     ctk.CTkLabel(frame_value, text="Temp CPU", text_color=self.fg_color,
                                  font=("Arial", 12), fg_color=cell_bg).pack()
+                elif i == 22:
+                    self.create_graph_cell(cell, "cpu_freq_fig", "cpu_freq_ax", "cpu_freq_canvas", "cpu_freq_line", "orange")
                 elif i == 20:
-                    self.emulator_label = ctk.CTkLabel(cell, text=f"{self.last_emulator}", text_color=self.fg_color,
+                    self.emulator_label = ctk.CTkLabel(cell, text=f"{self.monitor.display_emulator}", text_color=self.fg_color,
                                                        font=("Arial", 18), fg_color=cell_bg)
                     self.emulator_label.pack(expand=True)
                 else:
                     ctk.CTkLabel(cell, text="", text_color=self.fg_color,
                                  font=("Arial", self.config.get("font_size", 18)),
                                  fg_color=cell_bg).pack(expand=True)
+        for k, core in enumerate(range(4, core_count)):
+            r = 4 + k // 2
+            c = (k % 2) * 2
+            cell_bg = "#1c1c1c" if (k // 2) % 2 == 0 else "#232323"
+            graph_cell = ctk.CTkFrame(dashboard_frame, fg_color=cell_bg, border_width=0)
+            graph_cell.grid(row=r, column=c, padx=self.config["col_spacing"],
+                            pady=self.config["row_spacing"], sticky="nsew")
+            self.create_core_graph_cell(graph_cell, core)
+            value_cell = ctk.CTkFrame(dashboard_frame, fg_color=cell_bg, border_width=0)
+            value_cell.grid(row=r, column=c + 1, padx=self.config["col_spacing"],
+                            pady=self.config["row_spacing"], sticky="nsew")
+            self.create_core_value_cell(value_cell, core, cell_bg)
+
+    def create_core_graph_cell(self, cell, core):
+        name = f"core{core + 1}"
+        self.create_graph_cell(cell, f"{name}_fig", f"{name}_ax", f"{name}_canvas", f"{name}_line", "lime")
+
+    def create_core_value_cell(self, cell, core, cell_bg):
+        frame_value = ctk.CTkFrame(cell, fg_color=cell_bg, border_width=0)
+        frame_value.pack(expand=True)
+        label = ctk.CTkLabel(frame_value, text="0.0%", text_color=self.fg_color,
+                             font=("Arial", 38), fg_color=cell_bg)
+        label.pack()
+        ctk.CTkLabel(frame_value, text=f"Core {core + 1}", text_color=self.fg_color,
+                     font=("Arial", 12), fg_color=cell_bg).pack()
+        self.core_value_labels.append(label)
+
+    def create_core_bars_cell(self, cell, cores, cell_bg):
+        vertical_frame = ctk.CTkFrame(cell, fg_color=cell_bg, corner_radius=0)
+        vertical_frame.pack(expand=True, fill="both")
+        width = max(6, min(30, 120 // len(cores)))
+        for core in cores:
+            subframe = ctk.CTkFrame(vertical_frame, fg_color=cell_bg, width=width + 20, height=100)
+            subframe.pack(side="left", expand=True, padx=2 if len(cores) > 4 else 5, pady=5)
+            canvas = tk.Canvas(subframe, width=width, height=100, bg=cell_bg, highlightthickness=0)
+            canvas.pack(padx=2, pady=2)
+            self.core_vertical_canvases.append(canvas)
+            ctk.CTkLabel(subframe, text=f"C{core + 1}", font=("Arial", 14 if len(cores) <= 4 else 9),
+                         text_color=self.fg_color, fg_color=cell_bg).pack(side="bottom", pady=2)
 
     def clear_history(self):
         if messagebox.askyesno("Confirmation", "Voulez-vous vraiment effacer l'historique ?"):
-            filename = "historique_centralise.csv"
+            if self.history:
+                self.history.clear()
+            filename = HISTORY_CSV_FILE
             if os.path.exists(filename):
                 os.remove(filename)
                 logging.info("Historique effacé.")
-                self.update_summary_tab()
             else:
                 logging.info("Aucun historique à effacer.")
+            self.update_summary_tab(full=True)
+
+    def export_history_csv(self):
+        filename = filedialog.asksaveasfilename(defaultextension=".csv", initialfile="historique_export.csv",
+                                                filetypes=[("CSV", "*.csv")])
+        if filename and self.history:
+            count = self.history.export_csv(filename)
+            logging.info(f"{count} sessions exportées dans {filename}")
 
     def update_all_stats(self):
-        stats = fetch_all_stats(self.ssh_manager)
-        if stats:
-            self.update_cpu_load(stats["cpu"])
-            self.update_ram_usage(stats["mem"])
-            self.update_cpu_temp_usage(stats["temp"])
-            self.update_imbalance_usage()
-            for i, core_data in enumerate(stats["cores"]):
-                self.update_core_usage(i, core_data)
-            self.update_game(stats["game"])
-            self.update_emulator(stats["emulator"])
-            self.net_zero_counter = 0
+        profile = self.profiler.begin_tick("ui")
+        started = time.perf_counter()
+        self.record_frame_gap(started)
+        latest = self.collector.latest()
+        stage = self.profiler.record("drain", started)
+        if latest:
+            if self.dashboard_visible():
+                self.render_monitor()
+                stage = self.profiler.record("render", stage)
+                self.update_core_vertical_bars()
+                stage = self.profiler.record("bars", stage)
+            self.refresh_sessions()
+            self.profiler.record("sessions", stage)
+        if self.replay:
+            self.update_replay_bar()
+        self.profiler.record("frame", started)
+        if self.profiler_overlay_visible and time.time() - self.last_overlay_update >= 1:
+            self.update_profiler_overlay()
+        if time.time() - self.last_frame_report >= 60:
+            self.log_frame_stats()
+        self.profiler.end_tick("ui", profile)
+        self.after(self.config.get("ui_poll_interval", 100), self.update_all_stats)
+
+    def record_frame_gap(self, started):
+        if self.last_frame_start is not None:
+            gap = (started - self.last_frame_start) * 1000
+            self.frame_gaps.append(gap)
+            if self.collector.reconnecting:
+                self.reconnect_max_gap = max(self.reconnect_max_gap, gap)
+            elif self.reconnect_max_gap:
+                logging.info(f"Écart max entre deux frames pendant la reconnexion : {self.reconnect_max_gap:.0f} ms")
+                self.reconnect_max_gap = 0.0
+            if gap > self.config.get("refresh_interval", 1000) + self.config.get("ui_poll_interval", 100):
+                logging.warning(f"Interface bloquée pendant {gap:.0f} ms")
+        self.last_frame_start = started
+
+    def log_frame_stats(self):
+        self.last_frame_report = time.time()
+        frame_times = self.profiler.samples("frame")
+        logging.info(f"Frame time UI : p50 {percentile(frame_times, 50):.1f} ms, "
+                     f"p95 {percentile(frame_times, 95):.1f} ms, max {max(frame_times, default=0):.1f} ms, "
+                     f"écart max {max(self.frame_gaps, default=0):.0f} ms, "
+                     f"échantillons fusionnés {self.collector.coalesced}")
+        logging.info(f"Étapes : {self.profiler.describe()}")
+
+    def create_profiler_overlay(self):
+        self.profiler_overlay = ctk.CTkLabel(self, text="", font=("Courier", 11), fg_color="#1a1a1a",
+                                             text_color=self.fg_color, justify="left", corner_radius=6)
+        self.profiler_overlay_visible = False
+        self.last_overlay_update = 0.0
+        self.bind("<F12>", lambda event: self.toggle_profiler_overlay())
+        if self.config.get("profiler_overlay", False):
+            self.toggle_profiler_overlay()
+
+    def toggle_profiler_overlay(self):
+        self.profiler_overlay_visible = not self.profiler_overlay_visible
+        if self.profiler_overlay_visible:
+            self.update_profiler_overlay()
+            self.profiler_overlay.place(relx=1.0, rely=0.0, x=-10, y=10, anchor="ne")
+            self.profiler_overlay.lift()
         else:
-            logging.warning("Aucune donnée reçue, tentative de reconnexion si nécessaire.")
-            self.net_zero_counter += 1
-            if self.net_zero_counter >= self.net_zero_threshold:
-                self.reconnect_ssh()
-        self.update_core_vertical_bars()
-        self.update_misc()
-        self.after(self.config.get("refresh_interval", 1000), self.update_all_stats)
-
-    def update_cpu_load(self, output):
-        if output:
-            parts = output.split()[1:]
-            try:
-                values = list(map(int, parts))
-                total = sum(values)
-                idle = values[3] + values[4] if len(values) >= 5 else values[3]
-                if self.prev_cpu_stat is not None:
-                    prev_total, prev_idle = self.prev_cpu_stat
-                    total_diff = total - prev_total
-                    idle_diff = idle - prev_idle
-                    computed_usage = (total_diff - idle_diff) / total_diff * 100 if total_diff > 0 else 0.0
-                else:
-                    computed_usage = 0.0
-                self.prev_cpu_stat = (total, idle)
-                color = get_color_for_usage(computed_usage)
-                self.displayed_cpu_usage = smooth_transition(self.displayed_cpu_usage, computed_usage, 0.2)
-                self.cpu_load_value_label.configure(text=f"{self.displayed_cpu_usage:.1f}%", text_color=color)
-                self.cpu_load_history.append(computed_usage)
-                if hasattr(self, "cpu_load_ax"):
-                    x_data = range(len(self.cpu_load_history))
-                    self.cpu_load_line.set_data(x_data, list(self.cpu_load_history))
-                    self.cpu_load_ax.set_xlim(0, max(59, len(self.cpu_load_history) - 1))
-                    max_val = max(self.cpu_load_history, default=100) * 1.1
-                    self.cpu_load_ax.set_ylim(0, max_val)
-                    self.cpu_load_canvas.draw()
-            except Exception as e:
-                logging.error(f"Erreur lors du calcul de la charge CPU : {e}")
-
-    def update_ram_usage(self, output):
-        try:
-            parts = output.split()
-            if len(parts) < 3:
-                raise ValueError("Données RAM incomplètes")
-            total = float(parts[1])
-            used = float(parts[2])
-            computed_usage = used / total * 100 if total != 0 else 0.0
-        except (IndexError, ValueError, TypeError) as e:
-            logging.error(f"Erreur lors de la lecture de la RAM : {e}")
-            computed_usage = 0.0
-        self.displayed_ram_usage = smooth_transition(self.displayed_ram_usage, computed_usage, 0.2)
-        self.ram_usage_value_label.configure(text=f"{self.displayed_ram_usage:.1f}%", text_color=get_color_for_usage(self.displayed_ram_usage))
-        self.ram_usage_history.append(computed_usage)
-        if hasattr(self, "ram_usage_ax"):
-            x_data = range(len(self.ram_usage_history))
-            self.ram_usage_line.set_data(x_data, list(self.ram_usage_history))
-            self.ram_usage_ax.set_xlim(0, max(59, len(self.ram_usage_history) - 1))
-            max_val = max(self.ram_usage_history, default=100) * 1.1
-            self.ram_usage_ax.set_ylim(0, max_val)
-            self.ram_usage_canvas.draw()
-
-    def update_cpu_temp_usage(self, output):
-        try:
-            computed_temp = float(output)
-        except (ValueError, TypeError) as e:
-            logging.error(f"Erreur lors de la lecture de la température CPU : {e}")
-            computed_temp = 0.0
-        temp_color = get_color_for_temp(computed_temp)
-        self.displayed_cpu_temp = smooth_transition(self.displayed_cpu_temp, computed_temp, 0.2)
-        if hasattr(self, "cpu_temp_value_label"):
-            self.cpu_temp_value_label.configure(text=f"{self.displayed_cpu_temp:.1f}°C", text_color=temp_color)
-        self.cpu_temp_history.append(computed_temp)
-        if hasattr(self, "cpu_temp_ax"):
-            x_data = range(len(self.cpu_temp_history))
-            self.cpu_temp_line.set_data(x_data, list(self.cpu_temp_history))
-            self.cpu_temp_ax.set_xlim(0, max(59, len(self.cpu_temp_history) - 1))
-            max_val = max(self.cpu_temp_history, default=100) * 1.1
-            self.cpu_temp_ax.set_ylim(0, max_val)
-            self.cpu_temp_canvas.draw()
-
-    def update_imbalance_usage(self):
-        self.imbalance_history.append(self.core_imbalance)
-        if hasattr(self, "imbalance_ax"):
-            x_data = range(len(self.imbalance_history))
-            self.imbalance_line.set_data(x_data, list(self.imbalance_history))
-            self.imbalance_ax.set_xlim(0, max(59, len(self.imbalance_history) - 1))
-            max_val = max(self.imbalance_history, default=100) * 1.1
-            self.imbalance_ax.set_ylim(0, max_val)
-            self.imbalance_canvas.draw()
-
-    def update_core_usage(self, core_num, output):
-        if output:
-            parts = output.split()[1:]
-            try:
-                values = list(map(int, parts))
-                total = sum(values)
-                idle = values[3] + values[4] if len(values) >= 5 else values[3]
-                if self.prev_core_stats[core_num] is not None:
-                    prev_total, prev_idle = self.prev_core_stats[core_num]
-                    total_diff = total - prev_total
-                    idle_diff = idle - prev_idle
-                    computed_usage = (total_diff - idle_diff) / total_diff * 100 if total_diff > 0 else 0.0
-                else:
-                    computed_usage = 0.0
-                self.prev_core_stats[core_num] = (total, idle)
-                color = get_color_for_usage(computed_usage)
-                self.displayed_core_usage[core_num] = smooth_transition(self.displayed_core_usage[core_num], computed_usage, 0.2)
-                core_labels = [self.core1_value_label, self.core2_value_label, self.core3_value_label, self.core4_value_label]
-                core_lines = [self.core1_line, self.core2_line, self.core3_line, self.core4_line]
-                core_canvases = [self.core1_canvas, self.core2_canvas, self.core3_canvas, self.core4_canvas]
-                core_axes = [self.core1_ax, self.core2_ax, self.core3_ax, self.core4_ax]
-                core_labels[core_num].configure(text=f"{self.displayed_core_usage[core_num]:.1f}%", text_color=color)
-                self.core_histories[core_num].append(computed_usage)
-                self.last_core_usage[core_num] = computed_usage
-                if core_lines[core_num]:
-                    x_data = range(len(self.core_histories[core_num]))
-                    core_lines[core_num].set_data(x_data, list(self.core_histories[core_num]))
-                    core_axes[core_num].set_xlim(0, max(59, len(self.core_histories[core_num]) - 1))
-                    max_val = max(self.core_histories[core_num], default=100) * 1.1
-                    core_axes[core_num].set_ylim(0, max_val)
-                    core_canvases[core_num].draw()
-            except Exception as e:
-                logging.error(f"Erreur lors du calcul de la charge Core{core_num + 1} : {e}")
+            self.profiler_overlay.place_forget()
+
+    def update_profiler_overlay(self):
+        self.last_overlay_update = time.time()
+        lines = [f"{'étape':<10}{'p50':>8}{'p95':>8}{'max':>8}"]
+        for name, (p50, p95, high, _) in self.profiler.summary().items():
+            lines.append(f"{name:<10}{p50:8.2f}{p95:8.2f}{high:8.1f}")
+        self.profiler_overlay.configure(text="\n".join(lines))
+
+    def render_monitor(self):
+        monitor = self.monitor
+        if monitor.core_count and monitor.core_count != self.layout_core_count:
+            self.build_dashboard(monitor.core_count)
+        with monitor.lock:
+            self.cpu_load_value_label.configure(text=f"{monitor.displayed_cpu_usage:.1f}%",
+                                                text_color=get_color_for_usage(monitor.cpu_usage))
+            self.ram_usage_value_label.configure(text=f"{monitor.displayed_ram_usage:.1f}%",
+                                                 text_color=get_color_for_usage(monitor.displayed_ram_usage))
+            self.cpu_temp_value_label.configure(text=f"{monitor.displayed_cpu_temp:.1f}°C",
+                                                text_color=get_color_for_temp(monitor.cpu_temp))
+            throttled = monitor.throttled & THROTTLE_ACTIVE
+            self.cpu_freq_value_label.configure(text=f"{monitor.cpu_freq:.0f} MHz",
+                                                text_color="#FF0000" if throttled else self.fg_color)
+            self.clock_status_label.configure(
+                text=f"Bridé : {describe_throttle(monitor.throttled)}" if throttled else
+                f"Fréquence ARM · {monitor.core_volts:.2f} V" if monitor.core_volts else "Fréquence ARM",
+                text_color="#FF0000" if throttled else self.fg_color)
+            for i, label in enumerate(self.core_value_labels[:monitor.core_count]):
+                label.configure(text=f"{monitor.displayed_core_usage[i]:.1f}%",
+                                text_color=get_color_for_usage(monitor.last_core_usage[i]))
+                self.chart_renderer.update(f"core{i + 1}", monitor.core_histories[i], monitor.envelopes[f"core{i + 1}"])
+            if len(monitor.core_usage_window) >= monitor.imbalance_window_size:
+                self.imbalance_value_label.configure(text=f"{monitor.core_imbalance:.1f}%",
+                                                     text_color=get_color_for_usage(monitor.core_imbalance))
+            killer = "TUEUR DE CORE" + (f"\n{monitor.killer_thread}" if monitor.killer_thread else "")
+            self.core_killer_label.configure(text=killer if monitor.core_killer_alert else "")
+            self.merged_label.configure(text=f"{monitor.current_game}")
+            process = monitor.process_sampler
+            self.emulator_label.configure(text=f"{monitor.display_emulator}" + (
+                f"\n{process.cpu_usage:.0f}% CPU · {process.rss:.0f} Mo" if process.threads else ""))
+            self.chart_renderer.update("cpu_load", monitor.cpu_load_history, monitor.envelopes["cpu_load"])
+            self.chart_renderer.update("ram_usage", monitor.ram_usage_history)
+            self.chart_renderer.update("cpu_temp", monitor.cpu_temp_history, monitor.envelopes["cpu_temp"])
+            self.chart_renderer.update("imbalance", monitor.imbalance_history)
+            self.chart_renderer.update("cpu_freq", monitor.cpu_freq_history)
+            self.last_core_usage = monitor.last_core_usage.tolist()
+
+    def refresh_sessions(self):
+        sessions_exported = sum(collector.monitor.sessions_exported for collector in self.collectors.values())
+        if sessions_exported != self.sessions_seen:
+            self.sessions_seen = sessions_exported
+            if hasattr(self, "summary_table"):
+                self.update_summary_tab(full=False)
+
+    def create_replay_bar(self):
+        replay_bar = ctk.CTkFrame(self, fg_color="#1a1a1a")
+        replay_bar.grid(row=1, column=0, sticky="ew", padx=self.config["col_spacing"], pady=(0, self.config["row_spacing"]))
+        self.replay_button = ctk.CTkButton(replay_bar, text="Pause", width=80, fg_color="#0000FF", command=self.toggle_replay)
+        self.replay_button.pack(side="left", padx=5, pady=5)
+        self.replay_speed = ctk.CTkSegmentedButton(replay_bar, values=list(REPLAY_SPEEDS), command=self.set_replay_speed)
+        self.replay_speed.set(next((label for label, speed in REPLAY_SPEEDS.items() if speed == self.replay.speed), "1x"))
+        self.replay_speed.pack(side="left", padx=5, pady=5)
+        self.replay_slider = ctk.CTkSlider(replay_bar, from_=0, to=max(1.0, self.replay.end_time - self.replay.start_time),
+                                           command=self.on_replay_slider)
+        self.replay_slider.pack(side="left", fill="x", expand=True, padx=10, pady=5)
+        self.replay_label = ctk.CTkLabel(replay_bar, text="", text_color=self.fg_color, width=160)
+        self.replay_label.pack(side="right", padx=5, pady=5)
+        self.replay_seek_id = None
+
+    def toggle_replay(self):
+        if self.replay.paused:
+            self.replay.resume()
+            self.replay_button.configure(text="Pause")
+        else:
+            self.replay.pause()
+            self.replay_button.configure(text="Lecture")
+
+    def set_replay_speed(self, label):
+        self.replay.set_speed(REPLAY_SPEEDS[label])
+
+    def on_replay_slider(self, value):
+        if self.replay_seek_id is not None:
+            self.after_cancel(self.replay_seek_id)
+        self.replay_seek_id = self.after(200, self.seek_replay, value)
+
+    def seek_replay(self, value):
+        self.replay_seek_id = None
+        self.replay.seek(self.replay.start_time + value)
+
+    def update_replay_bar(self):
+        elapsed = self.replay.position - self.replay.start_time
+        total = self.replay.end_time - self.replay.start_time
+        if self.replay_seek_id is None:
+            self.replay_slider.set(elapsed)
+        state = " (fin)" if self.replay.finished() else ""
+        self.replay_label.configure(text=f"{format_duration(elapsed)} / {format_duration(total)}{state}")
+
+    def create_fleet_tab(self):
+        self.tabview.add("Flotte")
+        fleet_frame = ctk.CTkScrollableFrame(self.tabview.tab("Flotte"), fg_color=self.bg_color)
+        fleet_frame.pack(expand=True, fill="both")
+        cols = max(1, math.ceil(math.sqrt(len(self.collectors))))
+        for c in range(cols):
+            fleet_frame.grid_columnconfigure(c, weight=1, uniform="fleet")
+        for i, host in enumerate(self.collectors):
+            tile = ctk.CTkFrame(fleet_frame, fg_color="#1c1c1c", border_width=2, border_color="#232323")
+            tile.grid(row=i // cols, column=i % cols, padx=5, pady=5, sticky="nsew")
+            host_label = ctk.CTkLabel(tile, text=host, text_color=self.fg_color, font=("Arial", 14, "bold"))
+            host_label.pack(pady=(5, 0))
+            stats_label = ctk.CTkLabel(tile, text="-", text_color=self.fg_color, font=("Arial", 12))
+            stats_label.pack()
+            game_label = ctk.CTkLabel(tile, text="", text_color=self.fg_color, font=("Arial", 11))
+            game_label.pack(pady=(0, 5))
+            for widget in (tile, host_label, stats_label, game_label):
+                widget.bind("<Button-1>", lambda event, h=host: self.select_host(h, show=True))
+            self.fleet_tiles[host] = (tile, stats_label, game_label)
+
+    def update_fleet_overview(self):
+        for host, state in self.fleet_collector.snapshot().items():
+            if self.fleet_versions.get(host) == (state["version"], state["online"]):
+                continue
+            self.fleet_versions[host] = (state["version"], state["online"])
+            tile, stats_label, game_label = self.fleet_tiles[host]
+            if not state["online"]:
+                tile.configure(border_color="#555555")
+                stats_label.configure(text="Hors ligne", text_color="#808080")
+                continue
+            tile.configure(border_color="#FF0000" if state["killer"] else get_color_for_temp(state["temp"]))
+            stats_label.configure(text=f"CPU {state['cpu']:.1f}%  RAM {state['ram']:.1f}%  {state['temp']:.1f}°C  Imb {state['imbalance']:.1f}%",
+                                  text_color=get_color_for_usage(state["cpu"]))
+            game_label.configure(text=f"{state['game']} ({state['emulator']})" if state["game"] else state["emulator"])
+        self.after(self.config.get("fleet_overview_interval", 1000), self.update_fleet_overview)
+
+    def select_host(self, host, show=False):
+        self.active_host = host
+        self.collector = self.collectors[host]
+        self.title(f"Dashboard SSH Recalbox - {host}")
+        if show:
+            self.tabview.set("Dashboard")
+        self.on_tab_change()
 
     def animate_vertical_bar(self, canvas, start, end, steps=10, delay=30):
         if hasattr(canvas, "animation_id"):
@@ -649,191 +1021,25 @@ class App(ctk.CTk):
         canvas.create_rectangle(0, canvas_height - fill_height, canvas_width, canvas_height, fill=grad_color, outline="")
 
     def update_core_vertical_bars(self):
-        if self.core_vertical_canvases_1:
-            for idx, canvas in enumerate(self.core_vertical_canvases_1):
-                target = self.last_core_usage[idx]
-                current = self.displayed_vertical_usage.get(canvas, 0)
-                if self.config.get("enable_animations", False):
-                    self.animate_vertical_bar(canvas, current, target, steps=10, delay=30)
-                else:
-                    self.draw_vertical_bar(canvas, target)
-                    self.displayed_vertical_usage[canvas] = target
-        if self.core_vertical_canvases_2:
-            for idx, canvas in enumerate(self.core_vertical_canvases_2):
-                target = self.last_core_usage[idx+2]
-                current = self.displayed_vertical_usage.get(canvas, 0)
-                if self.config.get("enable_animations", False):
-                    self.animate_vertical_bar(canvas, current, target, steps=10, delay=30)
-                else:
-                    self.draw_vertical_bar(canvas, target)
-                    self.displayed_vertical_usage[canvas] = target
-
-    def update_misc(self):
-        test_output = self.ssh_manager.execute_command("echo test")
-        if test_output == "N/A" and self.net_zero_counter >= self.net_zero_threshold:
-            logging.info(f"Test de connexion échoué (compteur = {self.net_zero_counter})")
-        sample = {
-            "timestamp": time.time(),
-            "cpu_usage": self.displayed_cpu_usage,
-            "ram_usage": self.displayed_ram_usage,
-            "cpu_temp": self.displayed_cpu_temp,
-            "core1": self.displayed_core_usage[0],
-            "core2": self.displayed_core_usage[1],
-            "core3": self.displayed_core_usage[2],
-            "core4": self.displayed_core_usage[3],
-            "core_imbalance": self.core_imbalance
-        }
-        self.core_usage_window.append([sample["core1"], sample["core2"], sample["core3"], sample["core4"]])
-        if len(self.core_usage_window) >= self.imbalance_window_size:
-            max_cores = [max(cores) for cores in self.core_usage_window]
-            min_cores = [min(cores) for cores in self.core_usage_window]
-            avg_max = sum(max_cores) / len(max_cores)
-            avg_min = sum(min_cores) / len(min_cores)
-            self.core_imbalance = avg_max - avg_min
-            color = get_color_for_usage(self.core_imbalance)
-            self.imbalance_value_label.configure(text=f"{self.core_imbalance:.1f}%", text_color=color)
-            max_core_usage = max(self.last_core_usage)
-            if max_core_usage > 80 and self.core_imbalance > 50 and not self.core_killer_alert:
-                self.core_killer_label.configure(text="TUEUR DE CORE")
-                self.core_killer_alert = True
-                logging.info(f"Alerte : Tueur de Core détecté ! Max usage : {max_core_usage:.1f}%, Imbalance : {self.core_imbalance:.1f}%")
-            if not hasattr(self, 'ignore_data_until') or sample["timestamp"] > self.ignore_data_until:
-                logging.info(f"Rolling Imbalance (20s window): {self.core_imbalance:.1f}%")
-        if not hasattr(self, 'ignore_data_until') or sample["timestamp"] > self.ignore_data_until:
-            self.session_data.append(sample)
-
-    def reconnect_ssh(self):
-        logging.info("Tentative de reconnexion SSH...")
-        self.ssh_manager.close()
-        new_hostname = get_recalbox_ip()
-        if new_hostname:
-            self.ssh_manager = SSHManager(new_hostname, self.ssh_manager.port, self.ssh_manager.username, self.ssh_manager.password)
-            if self.ssh_manager.client:
-                logging.info(f"Reconnexion réussie avec l'IP : {new_hostname}")
-                print(f"✅ Reconnexion réussie avec l'IP : {new_hostname}")
+        for canvas, target in zip(self.core_vertical_canvases, self.last_core_usage):
+            current = self.displayed_vertical_usage.get(canvas, 0)
+            if self.config.get("enable_animations", False):
+                self.animate_vertical_bar(canvas, current, target, steps=10, delay=30)
             else:
-                logging.error("Reconnexion échouée malgré la nouvelle IP.")
-                print("❌ Reconnexion échouée malgré la nouvelle IP.")
-        else:
-            logging.error("Nouvelle IP introuvable sur le réseau.")
-            print("❌ Impossible de retrouver une nouvelle IP sur le réseau.")
-        self.net_zero_counter = 0
-
-    def update_game(self, new_game):
-        if new_game:
-            game_name = new_game.split('/')[-1].split('.')[0]
-            game_name = re.sub(r'\([^)]*\)', '', game_name)
-            game_name = re.sub(r'\[[^]]*\]', '', game_name)
-            game_name = game_name.strip()
-            new_game = game_name if game_name else ""
-        if new_game != self.current_game and self.current_game:
-            self.export_current_session()
-            self.session_data = deque(maxlen=3600)
-            self.session_start_time = time.time()
-            self.ignore_data_until = self.session_start_time + 5
-            self.core_usage_window.clear()
-            self.imbalance_history = []
-            self.core_killer_alert = False
-            self.core_killer_label.configure(text="")
-            self.update_summary_tab()
-        self.current_game = new_game
-        self.merged_label.configure(text=f"{new_game}")
-
-    def update_emulator(self, new_emulator):
-        if new_emulator != "Aucun":
-            self.last_emulator = new_emulator.replace("_libretro", "")
-        display_emulator = self.last_emulator if new_emulator == "Aucun" else new_emulator.replace("_libretro", "")
-        self.emulator_label.configure(text=f"{display_emulator}")
-
-    def export_current_session(self):
-        if not self.session_data:
-            return
-        session_end = time.time()
-        def agg(metric):
-            values = [d[metric] for d in self.session_data]
-            avg = sum(values)/len(values) if values else 0
-            return avg, min(values) if values else 0, max(values) if values else 0
-        
-        cpu_stats = agg("cpu_usage")
-        ram_stats = agg("ram_usage")
-        cpu_temp_stats = agg("cpu_temp")
-        core1_stats = agg("core1")
-        core2_stats = agg("core2")
-        core3_stats = agg("core3")
-        core4_stats = agg("core4")
-        core_imbalance_stats = agg("core_imbalance")
-        core_imbalance = core_imbalance_stats[0]
-        
-        filename = "historique_centralise.csv"
-        file_exists = os.path.exists(filename)
-        with open(filename, mode="a", newline="") as csvfile:
-            fieldnames = ["game", "emulator", "session_start", "session_end",
-                          "avg_cpu", "min_cpu", "max_cpu",
-                          "avg_ram", "min_ram", "max_ram",
-                          "avg_cpu_temp", "min_cpu_temp", "max_cpu_temp",
-                          "avg_core1", "min_core1", "max_core1",
-                          "avg_core2", "min_core2", "max_core2",
-                          "avg_core3", "min_core3", "max_core3",
-                          "avg_core4", "min_core4", "max_core4",
-                          "core_imbalance", "core_killer"]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow({
-                "game": self.current_game,
-                "emulator": self.last_emulator,
-                "session_start": datetime.datetime.fromtimestamp(self.session_start_time).strftime("%Y-%m-%d %H:%M:%S"),
-                "session_end": datetime.datetime.fromtimestamp(session_end).strftime("%Y-%m-%d %H:%M:%S"),
-                "avg_cpu": f"{cpu_stats[0]:.1f}",
-                "min_cpu": f"{cpu_stats[1]:.1f}",
-                "max_cpu": f"{cpu_stats[2]:.1f}",
-                "avg_ram": f"{ram_stats[0]:.1f}",
-                "min_ram": f"{ram_stats[1]:.1f}",
-                "max_ram": f"{ram_stats[2]:.1f}",
-                "avg_cpu_temp": f"{cpu_temp_stats[0]:.1f}",
-                "min_cpu_temp": f"{cpu_temp_stats[1]:.1f}",
-                "max_cpu_temp": f"{cpu_temp_stats[2]:.1f}",
-                "avg_core1": f"{core1_stats[0]:.1f}",
-                "min_core1": f"{core1_stats[1]:.1f}",
-                "max_core1": f"{core1_stats[2]:.1f}",
-                "avg_core2": f"{core2_stats[0]:.1f}",
-                "min_core2": f"{core2_stats[1]:.1f}",
-                "max_core2": f"{core2_stats[2]:.1f}",
-                "avg_core3": f"{core3_stats[0]:.1f}",
-                "min_core3": f"{core3_stats[1]:.1f}",
-                "max_core3": f"{core3_stats[2]:.1f}",
-                "avg_core4": f"{core4_stats[0]:.1f}",
-                "min_core4": f"{core4_stats[1]:.1f}",
-                "max_core4": f"{core4_stats[2]:.1f}",
-                "core_imbalance": f"{core_imbalance:.1f}",
-                "core_killer": "Oui" if self.core_killer_alert else "Non"
-            })
-        logging.info(f"Session de {self.current_game} exportée dans {filename}")
-
-    def sort_summary(self, column, key_func=None):
-        if not hasattr(self, "summary_tree"):
+                self.draw_vertical_bar(canvas, target)
+                self.displayed_vertical_usage[canvas] = target
+
+    def sort_summary(self, column):
+        if not hasattr(self, "summary_table"):
             return
-        if self.sort_column == column:
-            self.sort_reverse = not self.sort_reverse
-        else:
-            self.sort_reverse = False
-        self.sort_column = column
-        
-        items = [(self.summary_tree.set(item, column), item) for item in self.summary_tree.get_children()]
-        if key_func:
-            items.sort(key=lambda x: key_func(x[0]), reverse=self.sort_reverse)
-        else:
-            items.sort(reverse=self.sort_reverse)
-        
-        for index, (_, item) in enumerate(items):
-            self.summary_tree.move(item, '', index)
+        self.summary_table.sort(column)
 
-    def update_summary_tab(self):
+    def update_summary_tab(self, full=True):
         try:
             summary_frame = self.tabview.tab("Résumé")
         except Exception:
             return
-        if not hasattr(self, "summary_tree"):
+        if not hasattr(self, "summary_table"):
             container = ctk.CTkFrame(summary_frame, fg_color="#121212")
             container.pack(fill="both", expand=True, padx=10, pady=10)
             
@@ -869,6 +1075,16 @@ class App(ctk.CTk):
                 height=40
             )
             self.clear_history_button.pack(pady=10)
+
+            self.export_history_button = AnimatedCTkButton(
+                master=sidebar,
+                text="Exporter CSV",
+                command=self.export_history_csv,
+                fg_color="#0000FF",
+                width=120,
+                height=40
+            )
+            self.export_history_button.pack(pady=10)
             
             main_content = ctk.CTkFrame(container, fg_color="#121212")
             main_content.pack(side="right", fill="both", expand=True)
@@ -877,27 +1093,26 @@ class App(ctk.CTk):
             sort_frame.pack(fill="x", pady=5)
             
             sort_options = [
-                ("Jeu", "game", None),
-                ("Emulateur", "emulator", None),
-                ("CPU Avg", "CPU (A/M/X)", lambda x: float(x.split('/')[0])),
-                ("RAM Avg", "RAM (A/M/X)", lambda x: float(x.split('/')[0])),
-                ("CPU Temp", "CPU Temp (A)", lambda x: float(x[:-2])),
-                ("Core Imb", "Core Imbalance", lambda x: float(x)),
-                ("Tueur", "Core Killer", None)
+                ("Jeu", "game"),
+                ("Emulateur", "emulator"),
+                ("CPU Avg", "CPU (A/M/X)"),
+                ("RAM Avg", "RAM (A/M/X)"),
+                ("CPU Temp", "CPU Temp (A)"),
+                ("Core Imb", "Core Imbalance"),
+                ("Tueur", "Core Killer"),
+                ("Score", "Score")
             ]
-            self.sort_column = "game"
-            self.sort_reverse = False
             
-            for i, (label, col, key_func) in enumerate(sort_options):
+            for i, (label, col) in enumerate(sort_options):
                 btn = ctk.CTkButton(sort_frame, text=label, fg_color="#0000FF",
-                                   command=lambda c=col, kf=key_func: self.sort_summary(c, kf))
+                                   command=lambda c=col: self.sort_summary(c))
                 btn.pack(side="left", padx=5, pady=5)
             
             tree_frame = ctk.CTkFrame(main_content, fg_color="#121212")
             tree_frame.pack(fill="both", expand=True)
             
             columns = ("game", "emulator", "session_start", "session_end",
-                      "CPU (A/M/X)", "RAM (A/M/X)", "CPU Temp (A)", "Core Imbalance", "Core Killer")
+                      "CPU (A/M/X)", "RAM (A/M/X)", "CPU Temp (A)", "Core Imbalance", "Core Killer", "Score")
             self.summary_tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=15, selectmode="extended")
             self.summary_tree.heading("game", text="Jeu")
             self.summary_tree.heading("emulator", text="Emulateur")
@@ -908,6 +1123,7 @@ class App(ctk.CTk):
             self.summary_tree.heading("CPU Temp (A)", text="CPU Temp (A)")
             self.summary_tree.heading("Core Imbalance", text="Core Imbalance")
             self.summary_tree.heading("Core Killer", text="Tueur de Core")
+            self.summary_tree.heading("Score", text="Score")
             self.summary_tree.column("game", width=100, anchor="center")
             self.summary_tree.column("emulator", width=100, anchor="center")
             self.summary_tree.column("session_start", width=120, anchor="center")
@@ -917,11 +1133,21 @@ class App(ctk.CTk):
             self.summary_tree.column("CPU Temp (A)", width=100, anchor="center")
             self.summary_tree.column("Core Imbalance", width=100, anchor="center")
             self.summary_tree.column("Core Killer", width=80, anchor="center")
+            self.summary_tree.column("Score", width=70, anchor="center")
             self.summary_tree.pack(side="left", fill="both", expand=True)
+            self.summary_tree.bind("<Double-1>", self.show_session_detail)
             
-            vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=self.summary_tree.yview)
+            vsb = ttk.Scrollbar(tree_frame, orient="vertical")
             vsb.pack(side="right", fill="y")
-            self.summary_tree.configure(yscrollcommand=vsb.set)
+            self.summary_table = VirtualTable(self.summary_tree, vsb, rowheight=25,
+                                              numeric=SUMMARY_NUMERIC)
+            vsb.configure(command=self.summary_table.on_scrollbar)
+            self.summary_tree.bind("<Configure>", self.summary_table.on_resize)
+            self.summary_tree.bind("<<TreeviewSelect>>", self.on_summary_select)
+            self.summary_tree.bind("<MouseWheel>", self.summary_table.on_wheel)
+            self.summary_tree.bind("<Button-4>", self.summary_table.on_wheel)
+            self.summary_tree.bind("<Button-5>", self.summary_table.on_wheel)
+            self.summary_tree.bind("<Control-a>", self.summary_table.select_all)
             
             style = ttk.Style()
             style.theme_use("default")
@@ -929,212 +1155,258 @@ class App(ctk.CTk):
                             fieldbackground="#121212", rowheight=25)
             style.map("Treeview", background=[("selected", "#2a2a2a")])
             self.summary_tree.tag_configure("killer", foreground="#FF0000", font=("Arial", 12, "bold"))
-
-        for item in self.summary_tree.get_children():
-            self.summary_tree.delete(item)
-        
-        filename = "historique_centralise.csv"
-        if os.path.exists(filename):
-            with open(filename, mode="r", newline="") as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    try:
-                        cpu_str = f"{row['avg_cpu']}/{row['min_cpu']}/{row['max_cpu']}"
-                        ram_str = f"{row['avg_ram']}/{row['min_ram']}/{row['max_ram']}"
-                        cpu_temp_str = f"{row['avg_cpu_temp']}°C"
-                        core_imbalance_str = row.get('core_imbalance', "0.0")
-                        core_killer_str = "KILLER" if row.get('core_killer', "Non") == "Oui" else "Non"
-                        tags = ("killer",) if core_killer_str == "KILLER" else ()
-                        self.summary_tree.insert("", "end", values=(
-                            row["game"], row["emulator"], row["session_start"], row["session_end"],
-                            cpu_str, ram_str, cpu_temp_str, core_imbalance_str, core_killer_str
-                        ), tags=tags)
-                    except Exception as e:
-                        logging.error(f"Erreur lors du chargement d'une ligne du CSV : {e}")
-                        continue
+            self.summary_tree_frame = tree_frame
+            self.rollup_kind = None
+            self.create_rollup_view(main_content)
+            self.summary_view = ctk.CTkSegmentedButton(sort_frame, values=list(GROUPINGS), command=self.set_summary_view)
+            self.summary_view.set("Sessions")
+            self.summary_view.pack(side="right", padx=5, pady=5)
+
+        if full:
+            self.summary_table.clear()
+            self.summary_last_id = 0
+
+        if self.history is None:
+            return
+        rows = self.history.summary_rows(since_id=self.summary_last_id)
+        if rows:
+            self.summary_last_id = rows[-1][0]
+            scores = self.scorer.lookup(np.array([row[0] for row in rows])).tolist()
+            self.summary_table.append([row[1:10] + (f"{score:.1f}",) + row[10:14] + (score, row[0])
+                                       for row, score in zip(rows, scores)],
+                                      tags=[("killer",) if row[9] == "KILLER" else () for row in rows])
+        if getattr(self, "rollup_kind", None) and (rows or full):
+            self.refresh_rollups()
+
+    def create_rollup_view(self, master):
+        self.rollup_frame = ctk.CTkFrame(master, fg_color="#121212")
+        columns = [name for name, _, _, _ in ROLLUP_TABLE_COLUMNS]
+        self.rollup_tree = ttk.Treeview(self.rollup_frame, columns=columns, show="headings", height=15, selectmode="browse")
+        for name, heading, width, _ in ROLLUP_TABLE_COLUMNS:
+            self.rollup_tree.heading(name, text=heading, command=lambda c=name: self.rollup_table.sort(c))
+            self.rollup_tree.column(name, width=width, anchor="center")
+        self.rollup_tree.tag_configure("killer", foreground="#FF0000", font=("Arial", 12, "bold"))
+        self.rollup_tree.pack(side="left", fill="both", expand=True)
+        vsb = ttk.Scrollbar(self.rollup_frame, orient="vertical")
+        vsb.pack(side="right", fill="y")
+        self.rollup_table = VirtualTable(self.rollup_tree, vsb, rowheight=25, numeric=columns[1:-1])
+        vsb.configure(command=self.rollup_table.on_scrollbar)
+        self.rollup_tree.bind("<Configure>", self.rollup_table.on_resize)
+        self.rollup_tree.bind("<MouseWheel>", self.rollup_table.on_wheel)
+        self.rollup_tree.bind("<Button-4>", self.rollup_table.on_wheel)
+        self.rollup_tree.bind("<Button-5>", self.rollup_table.on_wheel)
+
+    def set_summary_view(self, value):
+        self.rollup_kind = GROUPINGS[value]
+        if self.rollup_kind is None:
+            self.rollup_frame.pack_forget()
+            self.summary_tree_frame.pack(fill="both", expand=True)
         else:
-            logging.info("Aucun fichier historique_centralise.csv trouvé.")
+            self.summary_tree_frame.pack_forget()
+            self.rollup_frame.pack(fill="both", expand=True)
+            self.refresh_rollups()
+
+    def refresh_rollups(self):
+        rows = []
+        tags = []
+        for rollup in self.history.rollups(self.rollup_kind):
+            display = tuple("-" if rollup[name] is None else fmt(rollup[name]) for name, _, _, fmt in ROLLUP_TABLE_COLUMNS)
+            rows.append(display + tuple(rollup[name] for name, _, _, _ in ROLLUP_TABLE_COLUMNS[1:-1]))
+            tags.append(("killer",) if rollup["killer_rate"] else ())
+        self.rollup_table.clear()
+        self.rollup_table.append(rows, tags)
 
     def show_summary(self):
         self.update_summary_tab()
 
-    def show_comparison(self):
-        selected = self.summary_tree.selection()
-        if len(selected) < 1:
-            messagebox.showinfo("Info", "Veuillez sélectionner au moins deux jeux pour comparer.")
+    def show_session_detail(self, event):
+        values = self.summary_table.row_at(event.y)
+        if values is None or self.sample_store is None:
             return
-        if len(selected) > 20:
-            messagebox.showinfo("Info", "Veuillez sélectionner un maximum de 10 jeux pour comparer.")
+        session = self.sample_store.find_session(str(values[0]), str(values[2]))
+        data = self.sample_store.session(session["id"]) if session else None
+        if data is None or len(data["timestamp"]) == 0:
+            messagebox.showinfo("Info", "Aucun échantillon enregistré pour cette session.")
+            return
+        detail_window = ctk.CTkToplevel(self)
+        detail_window.title(f"Session {session['game']} ({session['emulator']}) - {session['session_start']}")
+        detail_window.configure(fg_color=self.bg_color)
+        fig = Figure(figsize=(8, 4), dpi=100, facecolor=self.bg_color)
+        ax = fig.add_subplot(111, facecolor=self.bg_color)
+        elapsed = data["timestamp"] - data["timestamp"][0]
+        for metric, color, label in [("cpu_usage", "purple", "CPU (%)"), ("ram_usage", "blue", "RAM (%)"),
+                                     ("cpu_temp", "red", "Temp CPU (°C)"), ("core_imbalance", "orange", "Imbalance (%)")]:
+            ax.plot(elapsed, data[metric], color=color, label=label)
+        throttled = (data["throttled"].astype(np.uint32) & THROTTLE_ACTIVE) > 0
+        if throttled.any():
+            ax.fill_between(elapsed, 0, 1, where=throttled, transform=ax.get_xaxis_transform(),
+                            color="red", alpha=0.15, label="Bridage")
+        ax.set_xlabel("Secondes", color=self.fg_color)
+        ax.tick_params(axis="x", colors=self.fg_color)
+        ax.tick_params(axis="y", colors=self.fg_color)
+        ax.legend(loc="upper right", fontsize=8)
+        if data["cpu_freq"].any():
+            freq_ax = ax.twinx()
+            freq_ax.plot(elapsed, data["cpu_freq"], color="yellow", linewidth=1, label="Fréquence (MHz)")
+            freq_ax.set_ylim(0, float(data["cpu_freq"].max()) * 1.1)
+            freq_ax.tick_params(axis="y", colors=self.fg_color)
+            freq_ax.legend(loc="upper left", fontsize=8)
+        canvas = FigureCanvasTkAgg(fig, master=detail_window)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
+        if session.get("threads"):
+            threads = "\n".join(f"{thread['name']} ({thread['tid']}) : {thread['cpu']:.1f}% d'un core, core {thread['core']}"
+                                for thread in session["threads"])
+            ctk.CTkLabel(detail_window, text=f"Threads de l'émulateur (cores autorisés {session.get('affinity', '?')})\n{threads}",
+                         text_color=self.fg_color, font=("Courier", 11), justify="left").pack(padx=10, pady=(0, 10))
+        detail_window.protocol("WM_DELETE_WINDOW", lambda: self.close_session_detail(detail_window, canvas))
+
+    def close_session_detail(self, detail_window, canvas):
+        release_canvas(canvas)
+        detail_window.destroy()
+
+    def selected_session_ids(self):
+        return [int(key[-1]) for key in self.summary_table.selected_keys()]
+
+    def on_summary_select(self, event=None):
+        self.summary_table.on_select(event)
+        if self.comparison_window is not None:
+            selected = self.selected_session_ids()
+            if len(selected) >= 2 and selected != self.comparison_selection:
+                self.update_comparison(selected)
+
+    def show_comparison(self):
+        selected = self.selected_session_ids() if hasattr(self, "summary_table") else []
+        if len(selected) < 2 or self.history is None:
+            messagebox.showinfo("Info", "Veuillez sélectionner au moins deux sessions pour comparer (Ctrl+A pour tout l'historique).")
             return
-        selected_items = [self.summary_tree.item(item)["values"] for item in selected]
+        if self.comparison_window is None:
+            self.open_comparison_window()
+        self.update_comparison(selected)
+        self.comparison_window.lift()
 
+    def open_comparison_window(self):
         comparison_window = ctk.CTkToplevel(self)
         comparison_window.title("Comparaison des Jeux")
         comparison_window.state('zoomed')
         comparison_window.configure(fg_color=self.bg_color)
+        comparison_window.protocol("WM_DELETE_WINDOW", self.close_comparison)
         comparison_frame = ctk.CTkFrame(comparison_window, fg_color=self.bg_color)
         comparison_frame.pack(fill="both", expand=True, padx=10, pady=10)
-
-        game_names_full = [item[0] for item in selected_items]
-        emulators = [item[1] for item in selected_items]
-        core_killers = [item[8] == "KILLER" for item in selected_items]
-        colors = list(mcolors.TABLEAU_COLORS.values())[:len(game_names_full)]
-        if len(colors) < len(game_names_full):
-            colors += ["#" + ''.join([random.choice('0123456789ABCDEF') for _ in range(6)]) 
-                       for _ in range(len(game_names_full) - len(colors))]
-        game_color_map = dict(zip(game_names_full, colors))
-
-        legend_frame = ctk.CTkFrame(comparison_frame, fg_color=self.bg_color)
-        legend_frame.grid(row=0, column=0, columnspan=3, sticky="ew", padx=5, pady=5)
-
-        game_names = []
-        for i, name in enumerate(game_names_full):
-            words = name.split()[:2]
-            short_name = " ".join(words)
-            if len(short_name) > 12:
-                short_name = short_name[:9] + "..."
-            game_names.append(short_name)
-        
-        game_initials = [''.join(word[0] for word in name.split()[:2]).upper() for name in game_names_full]
-
-        metrics = [
-            ("CPU Min (%)", lambda x: float(x[4].split('/')[1]), 0, 1),
-            ("CPU Moyen (%)", lambda x: float(x[4].split('/')[0]), 1, 1),
-            ("CPU Max (%)", lambda x: float(x[4].split('/')[2]), 2, 1),
-            ("RAM Min (%)", lambda x: float(x[5].split('/')[1]), 0, 2),
-            ("RAM Moyen (%)", lambda x: float(x[5].split('/')[0]), 1, 2),
-            ("RAM Max (%)", lambda x: float(x[5].split('/')[2]), 2, 2),
-            ("Temp CPU Moyenne (°C)", lambda x: float(x[6][:-2]), 0, 3),
-            ("Core Imbalance (%)", lambda x: float(x[7]), 2, 3),
-        ]
-        metric_data = {metric[0]: [metric[1](item) for item in selected_items] for metric in metrics}
-
-        scores = {}
-        for i, game in enumerate(game_names_full):
-            cpu_avg = metric_data["CPU Moyen (%)"][i]
-            ram_avg = metric_data["RAM Moyen (%)"][i]
-            temp_cpu = metric_data["Temp CPU Moyenne (°C)"][i]
-            core_imbalance = metric_data["Core Imbalance (%)"][i]
-            score = (cpu_avg + ram_avg + temp_cpu + core_imbalance) / 4
-            note = 100 - score
-            scores[game] = note
-
-        for i, (game, emu) in enumerate(zip(game_names_full, emulators)):
-            killer_text = " KILLER" if core_killers[i] else ""
-            label_text = f"{game} ({emu}) - {scores[game]:.1f}"
-            row = 0 if i < 5 else 1
+        self.comparison_group = ctk.CTkSegmentedButton(comparison_frame, values=list(GROUPINGS),
+                                                       command=lambda _: self.update_comparison(self.comparison_selection))
+        self.comparison_group.set("Sessions")
+        self.comparison_group.pack(anchor="w", padx=5, pady=(5, 0))
+        self.comparison_legend = ctk.CTkFrame(comparison_frame, fg_color=self.bg_color)
+        self.comparison_legend.pack(fill="x", padx=5, pady=5)
+        for c in range(5):
+            self.comparison_legend.grid_columnconfigure(c, weight=1)
+        fig = Figure(figsize=(10.5, 7.5), dpi=100, facecolor=self.bg_color)
+        self.comparison_chart = ComparisonChart(fig, self.fg_color, self.bg_color)
+        self.comparison_canvas = FigureCanvasTkAgg(fig, master=comparison_frame)
+        self.comparison_canvas.get_tk_widget().pack(fill="both", expand=True, padx=5, pady=5)
+        self.comparison_window = comparison_window
+
+    def update_comparison(self, selected):
+        self.comparison_selection = selected
+        data = comparison_data(self.history.columns(comparison_fields(self.scorer), selected), self.scorer,
+                               GROUPINGS[self.comparison_group.get()])
+        for child in self.comparison_legend.winfo_children():
+            child.destroy()
+        offset = 0
+        if len(data["labels"]) > COMPARISON_LEGEND_LIMIT:
+            best = int(np.argmax(data["scores"]))
+            ctk.CTkLabel(self.comparison_legend, text=f"{len(data['labels'])} entrées sur {int(data['counts'].sum())} sessions"
+                         f" - meilleur score : {data['labels'][best]} ({data['scores'][best]:.1f}),"
+                         f" {int(data['killers'].sum())} KILLER", text_color=self.fg_color,
+                         font=("Arial", 10)).grid(row=0, column=0, columnspan=5, padx=5, sticky="w")
+            offset = 1
+        for i, (name, detail) in enumerate(zip(data["labels"][:COMPARISON_LEGEND_LIMIT], data["details"])):
+            row = offset + (0 if i < 5 else 1)
             col = i if i < 5 else i - 5
-            label = ctk.CTkLabel(legend_frame, text=label_text, text_color=game_color_map[game], font=("Arial", 8))
+            label = ctk.CTkLabel(self.comparison_legend, text=f"{name} ({detail}) - {data['scores'][i]:.1f}",
+                                 text_color=data["colors"][i], font=("Arial", 8))
             label.grid(row=row, column=col, padx=(5, 0), sticky="w")
-            if core_killers[i]:
-                killer_label = ctk.CTkLabel(legend_frame, text=killer_text, text_color="#FF0000", font=("Arial", 8, "bold"))
+            if data["killers"][i]:
+                killer_label = ctk.CTkLabel(self.comparison_legend, text=" KILLER", text_color="#FF0000",
+                                            font=("Arial", 8, "bold"))
                 killer_label.grid(row=row, column=col, padx=(0, 5), sticky="e")
-
-        for r in range(2):
-            legend_frame.grid_rowconfigure(r, weight=1)
-        for c in range(5):
-            legend_frame.grid_columnconfigure(c, weight=1)
-
-        sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-        top_3 = sorted_scores[:3]
-        flop_3 = sorted_scores[-3:][::-1]
-
-        for metric_name, _, col, row in metrics:
-            fig = Figure(figsize=(3.5, 2.5), dpi=100, facecolor=self.bg_color)
-            ax = fig.add_subplot(111, facecolor=self.bg_color)
-
-            bars = ax.bar(range(len(game_names)), metric_data[metric_name], 
-                          color=[game_color_map[name] for name in game_names_full], edgecolor="white")
-            ax.set_title(metric_name, color=self.fg_color, fontsize=12)
-            ax.set_xticks(range(len(game_names)))
-            ax.set_xticklabels([])
-            ax.tick_params(axis="y", colors=self.fg_color)
-
-            max_val = max(metric_data[metric_name]) * 1.2 if max(metric_data[metric_name]) > 0 else 100
-            threshold = max_val * 0.3
-            min_absolute = 10
-
-            for i, (bar, full_name, short_name, initials) in enumerate(zip(bars, game_names_full, game_names, game_initials)):
-                height = bar.get_height()
-                if height > threshold:
-                    ax.text(bar.get_x() + bar.get_width() / 2, height / 2, short_name, 
-                            ha="center", va="center", rotation=90, color="white", fontsize=8)
-                elif height > min_absolute:
-                    ax.text(bar.get_x() + bar.get_width() / 2, height / 2, initials, 
-                            ha="center", va="center", rotation=90, color="white", fontsize=6)
-
-            ax.set_ylim(0, max_val)
-            for j, val in enumerate(metric_data[metric_name]):
-                ax.text(j, val + max_val * 0.05, f"{val:.1f}", ha="center", va="bottom", color=self.fg_color, fontsize=8)
-
-            canvas = FigureCanvasTkAgg(fig, master=comparison_frame)
-            canvas.draw()
-            canvas.get_tk_widget().grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
-
-        fig_ranking = Figure(figsize=(3.5, 2.5), dpi=100, facecolor=self.bg_color)
-        ax_ranking = fig_ranking.add_subplot(111, facecolor=self.bg_color)
-        ax_ranking.axis('off')
-
-        def truncate_name(game, emu, max_len=50):
-            full_text = f"{game} ({emu})"
-            if len(full_text) > max_len:
-                return full_text[:max_len-3] + "..."
-            return full_text
-
-        y_pos = 1.0
-        ax_ranking.text(0.95, y_pos, "Score/100", ha="right", va="top", color=self.fg_color, fontsize=7)
-        y_pos -= 0.10
-        ax_ranking.text(0.05, y_pos, "Top Score:", ha="left", va="top", color=self.fg_color, fontsize=7)
-        y_pos -= 0.10
-        for i, (game, note) in enumerate(top_3, 1):
-            emu = emulators[game_names_full.index(game)]
-            is_killer = core_killers[game_names_full.index(game)]
-            truncated_name = truncate_name(game, emu)
-            ax_ranking.text(0.05, y_pos, f"{i}. ", ha="left", va="top", color=self.fg_color, fontsize=7)
-            ax_ranking.text(0.10, y_pos, truncated_name, ha="left", va="top", color=game_color_map[game], fontsize=7)
-            ax_ranking.text(0.85, y_pos, f"- {note:.1f}", ha="right", va="top", color=self.fg_color, fontsize=7)
-            if is_killer:
-                ax_ranking.text(0.95, y_pos, "KILLER", ha="right", va="top", color="#FF0000", fontsize=7, fontweight="bold")
-            y_pos -= 0.10
-        ax_ranking.text(0.05, y_pos, "Flop Score:", ha="left", va="top", color=self.fg_color, fontsize=7)
-        y_pos -= 0.10
-        for i, (game, note) in enumerate(flop_3, 1):
-            emu = emulators[game_names_full.index(game)]
-            is_killer = core_killers[game_names_full.index(game)]
-            truncated_name = truncate_name(game, emu)
-            ax_ranking.text(0.05, y_pos, f"{i}. ", ha="left", va="top", color=self.fg_color, fontsize=7)
-            ax_ranking.text(0.10, y_pos, truncated_name, ha="left", va="top", color=game_color_map[game], fontsize=7)
-            ax_ranking.text(0.85, y_pos, f"- {note:.1f}", ha="right", va="top", color=self.fg_color, fontsize=7)
-            if is_killer:
-                ax_ranking.text(0.95, y_pos, "KILLER", ha="right", va="top", color="#FF0000", fontsize=7, fontweight="bold")
-            y_pos -= 0.10
-
-        canvas_ranking = FigureCanvasTkAgg(fig_ranking, master=comparison_frame)
-        canvas_ranking.draw()
-        canvas_ranking.get_tk_widget().grid(row=3, column=1, padx=5, pady=5, sticky="nsew")
-
-        for r in range(4):
-            comparison_frame.grid_rowconfigure(r, weight=1)
-        for c in range(3):
-            comparison_frame.grid_columnconfigure(c, weight=1)
-
-        comparison_window.grab_set()
+        self.comparison_chart.update(data)
+        self.comparison_canvas.draw_idle()
+
+    def close_comparison(self):
+        release_canvas(self.comparison_canvas)
+        self.comparison_window.destroy()
+        self.comparison_window = None
+        self.comparison_selection = None
+        self.comparison_chart = None
+        self.comparison_canvas = None
+        self.comparison_legend = None
+        self.comparison_group = None
 
 def main():
-    port = 22
-    username = "root"
-    password = "recalboxroot"
-    hostname = get_recalbox_ip()
-    if not hostname:
-        tk.messagebox.showerror("Erreur", "Impossible de trouver Recalbox sur le réseau.")
-        return
-    ssh_manager = SSHManager(hostname, port, username, password)
-    if not ssh_manager.client:
-        tk.messagebox.showerror("Erreur", "Connexion SSH échouée.")
+    parser = argparse.ArgumentParser(description="Dashboard SSH Recalbox")
+    add_host_arguments(parser)
+    parser.add_argument("--replay", help="rejouer un enregistrement JSONL au lieu de se connecter")
+    parser.add_argument("--speed", type=float, default=1.0, help="vitesse de rejeu (1, 10, 0 = maximum)")
+    parser.add_argument("--overlay", action="store_true", help="afficher le temps des étapes de chaque tick (F12)")
+    args = parser.parse_args()
+    config = apply_arguments(args, load_config())
+    if args.overlay:
+        config["profiler_overlay"] = True
+    profiler = create_profiler(config)
+    if args.replay:
+        entries = load_recording(args.replay)
+        if not entries:
+            tk.messagebox.showerror("Erreur", f"Aucun échantillon lisible dans {args.replay}.")
+            return
+        player = ReplayPlayer(entries, config, args.speed)
+        fleet_collector = FleetCollector(player.collectors, config) if len(player.collectors) > 1 else None
+        player.start()
+        capture_profile(profiler, config, ["ui"])
+        app = App(player.collectors, config, fleet_collector, replay=player, profiler=profiler)
+        app.mainloop()
+        player.stop()
+        profiler.close()
         return
-    app = App(ssh_manager)
-    app.mainloop()
-    ssh_manager.close()
+    hosts = resolve_hosts(args, config)
+    store, history = open_stores(config)
+    recorder = open_recorder(config)
+    if hosts:
+        collectors = create_collectors(hosts, config, store, history, recorder=recorder, profiler=profiler)
+        capture_profile(profiler, config, ["ui", *collectors])
+        fleet_collector = FleetCollector(collectors, config)
+        fleet_collector.start()
+        exporter = start_metrics_exporter(collectors, config)
+        app = App(collectors, config, fleet_collector, store, history, profiler=profiler)
+        app.mainloop()
+        if exporter:
+            exporter.stop()
+        fleet_collector.stop()
+    else:
+        hostname = get_recalbox_ip(config)
+        if not hostname:
+            tk.messagebox.showerror("Erreur", "Impossible de trouver Recalbox sur le réseau.")
+            return
+        collector = create_collectors([hostname], config, store, history, discover=True, recorder=recorder,
+                                      profiler=profiler)[hostname]
+        if not collector.ssh_manager.client:
+            tk.messagebox.showerror("Erreur", "Connexion SSH échouée.")
+            return
+        capture_profile(profiler, config, ["ui", hostname])
+        collector.start()
+        exporter = start_metrics_exporter({hostname: collector}, config)
+        app = App({hostname: collector}, config, sample_store=store, history=history, profiler=profiler)
+        app.mainloop()
+        if exporter:
+            exporter.stop()
+        collector.stop()
+    profiler.close()
+    if recorder:
+        recorder.close()
+    if store:
+        store.close()
+    history.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
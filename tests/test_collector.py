@@ -0,0 +1,306 @@
+import array
+import base64
+import random
+import time
+import zlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from collector41 import (ROLLUP_COLUMNS, AdaptiveScheduler, FleetCollector, HistoryStore, HostMonitor,
+                         MetricAccumulator, MetricsExporter, ReplayPlayer, SessionScorer, SSHManager, jiffies_matrix,
+                         parse_stats_frame)
+
+EXEC_FRAME = [
+    "cpu  4000 10 2000 30000 100 0 50 0 0 0",
+    "cpu1 1000 2 500 7500 25 0 10 0 0 0",
+    "cpu0 1000 3 500 7500 25 0 15 0 0 0",
+    "cpu3 1000 2 500 7500 25 0 10 0 0 0",
+    "cpu2 1000 3 500 7500 25 0 15 0 0 0",
+    "mem 3794 1021",
+    "temp 52.1",
+    "freq 1500345728",
+    "throttled 0x50005",
+    "volts 0.8600",
+    "zone 52582",
+    "emulator fbneo",
+    "game /recalbox/share/roms/fbneo/aof2.zip",
+]
+
+class FakeChannel:
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    def recv_ready(self):
+        return bool(self.chunks)
+
+    def recv(self, size):
+        return self.chunks.pop(0)
+
+    def exit_status_ready(self):
+        return False
+
+def idle_collector(config, age, reconnecting=False):
+    monitor = HostMonitor("recalbox", history_csv=None)
+    scheduler = AdaptiveScheduler(config, "recalbox")
+    for tick in range(5):
+        scheduler.observe(monitor, 1000.0 + tick * scheduler.interval)
+    monitor.last_update = time.time() - age
+    return SimpleNamespace(monitor=monitor, scheduler=scheduler, reconnecting=reconnecting)
+
+def scrape_values(exporter):
+    values = {}
+    for line in exporter.render().decode().splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            values[name.split("{")[0]] = float(value)
+    return values
+
+def history_row(i, rng):
+    start = 1700000000 + i * 600
+    duration = rng.choice([0, 1, 90, 240, 1800])
+    return {
+        "game": rng.choice(["aof2", "samsho3", "mslug", ""]),
+        "emulator": rng.choice(["fbneo", "mame2003_plus", "pcsx_rearmed"]),
+        "session_start": f"2023-11-14 {start // 3600 % 24:02d}:{start // 60 % 60:02d}:00",
+        "session_end": f"2023-11-14 {(start + duration) // 3600 % 24:02d}:{(start + duration) // 60 % 60:02d}:00",
+        "avg_cpu": round(rng.uniform(0, 100), 1),
+        "avg_ram": round(rng.uniform(0, 100), 1),
+        "avg_cpu_temp": round(rng.uniform(35, 85), 1),
+        "max_cpu_temp": round(rng.uniform(50, 90), 1),
+        "core_imbalance": "" if i % 7 == 0 else round(rng.uniform(0, 100), 1),
+        "avg_cpu_freq": round(rng.uniform(600, 2000)),
+        "throttled_time": rng.choice([0, 0, 12.5]),
+        "core_killer": "Oui" if rng.random() < 0.1 else "Non",
+    }
+
+def replay_entries(hosts, count):
+    entries = []
+    for n in range(count):
+        for h, host in enumerate(hosts):
+            busy, idle = 1000 + n * (40 + 10 * h), 30000 + n * 60
+            cores = [f"cpu{i} {busy // 4 + n * i} 0 0 {idle // 4} 0 0 0 0 0 0" for i in range(4)]
+            lines = [f"cpu  {busy} 0 0 {idle} 0 0 0 0 0 0"] + cores + [
+                f"mem 3794 {1000 + n}", f"temp {50 + n % 7}.0", "emulator fbneo", f"game aof{n // 10}.zip"]
+            entries.append((1700000000.0 + n, host, lines))
+    return entries
+
+def replay_state(player):
+    return {host: (collector.monitor.version, collector.monitor.core_imbalance,
+                   collector.monitor.accumulators["cpu_usage"].summary())
+            for host, collector in player.collectors.items()}
+
+def rollup_snapshot(history):
+    names = ", ".join(name for name, _, _ in ROLLUP_COLUMNS)
+    return [tuple(row) for row in history.conn.execute(f"SELECT kind, name, {names} FROM rollups ORDER BY 1, 2")]
+
+def assert_same_rollups(left, right):
+    assert [row[:2] + row[7:8] for row in left] == [row[:2] + row[7:8] for row in right]
+    for a, b in zip(left, right):
+        assert a[2:7] + a[8:] == pytest.approx(b[2:7] + b[8:])
+
+def test_parse_exec_frame():
+    stats = parse_stats_frame(EXEC_FRAME)
+    assert stats["cpu"] == EXEC_FRAME[0]
+    assert [line.split()[0] for line in stats["cores"]] == ["cpu0", "cpu1", "cpu2", "cpu3"]
+    assert stats["mem"] == "Mem: 3794 1021"
+    assert stats["temp"] == "52.1"
+    assert stats["freq"] == pytest.approx(1500.345728)
+    assert stats["throttled"] == 0x50005
+    assert stats["volts"] == pytest.approx(0.86)
+    assert stats["zone"] == pytest.approx(52.582)
+    assert stats["emulator"] == "fbneo"
+    assert stats["game"] == "/recalbox/share/roms/fbneo/aof2.zip"
+
+def test_parse_rejects_unreadable_values():
+    stats = parse_stats_frame(["temp abc", "freq N/A", "mem", "cpu3x 1 2 3"])
+    assert stats["temp"] == "0.0"
+    assert "freq" not in stats
+    assert stats["mem"] == ""
+    assert stats["cores"] == []
+
+def test_stream_frame(monkeypatch):
+    monkeypatch.setattr(SSHManager, "connect", lambda self: False)
+    manager = SSHManager("recalbox", 22, "root", "recalboxroot")
+    samples = array.array("f", [0, 40, 35, 45, 52.0, 20, 60, 55, 65, 52.5])
+    hires = f"hires 5 2 {base64.b64encode(zlib.compress(samples.tobytes())).decode()}"
+    frame = "\n".join(["@@BEGIN 1"] + EXEC_FRAME + [hires, "@@END 1 850", "@@BEGIN 2", "cpu 1"]) + "\n"
+    manager.stream_channel = FakeChannel([frame[:100].encode(), frame[100:].encode()])
+    stats = manager.read_stream_sample()
+    assert stats["cpu"] == EXEC_FRAME[0]
+    assert len(stats["cores"]) == 4
+    assert stats["hires"].shape == (2, 5)
+    assert stats["hires"][1, 1] == pytest.approx(60)
+    assert manager.stream_last_build_us == 850
+    assert manager.stream_frames == 1
+    assert manager.stream_frame == ["cpu 1"]
+
+def test_jiffies_matrix():
+    matrix = jiffies_matrix([EXEC_FRAME[0], EXEC_FRAME[2], ""])
+    assert matrix.dtype == np.int64
+    assert matrix.shape == (2, 10)
+    assert matrix[1, 0] == 1000
+
+@pytest.mark.parametrize("lines", [
+    ["cpu 10 20 30 40 50 60 70 80", "cpu0 80 1 2 3 4 5"],
+    ["cpu 10 20 30 40 50 60", "cpu0 1 2 3 4 5 6 7 8"],
+    ["cpu 10 20 30 40", "cpu0 1 2 3 4", "cpu1 1 2"],
+])
+def test_jiffies_matrix_rejects_ragged_lines(lines):
+    with pytest.raises(ValueError):
+        jiffies_matrix(lines)
+
+def test_ragged_tick_is_dropped():
+    monitor = HostMonitor("recalbox", history_csv=None)
+    monitor.update_cpu_usage(EXEC_FRAME[0], EXEC_FRAME[1:5])
+    previous = monitor.prev_jiffies
+    monitor.update_cpu_usage("cpu 10 20 30 40 50 60 70 80", ["cpu0 80 1 2 3 4 5"])
+    assert monitor.core_count == 4
+    assert monitor.prev_jiffies is previous
+
+@pytest.mark.parametrize("resolution, low, high", [(0.1, 20.0, 95.0), (1.0, 600.0, 2000.0)])
+def test_accumulator_matches_numpy(resolution, low, high):
+    values = np.random.default_rng(7).uniform(low, high, 5000)
+    accumulator = MetricAccumulator(resolution=resolution, upper=high * 1.5)
+    for value in values.tolist():
+        accumulator.add(value)
+    assert accumulator.mean() == pytest.approx(values.mean())
+    assert accumulator.std() == pytest.approx(values.std())
+    assert accumulator.summary()[1:] == (values.min(), values.max())
+    for q in (0.01, 0.5, 0.9, 0.95, 0.99):
+        expected = np.percentile(values, q * 100, method="inverted_cdf")
+        assert abs(accumulator.quantile(q) - expected) <= resolution
+
+def test_incremental_rollups_match_full_recompute(tmp_path):
+    rng = random.Random(3)
+    history = HistoryStore(str(tmp_path / "historique.db"))
+    for i in range(150):
+        history.insert(history_row(i, rng))
+    incremental = rollup_snapshot(history)
+    with history.conn:
+        history.conn.execute("DELETE FROM rollups")
+        history.update_rollups(0)
+    assert_same_rollups(incremental, rollup_snapshot(history))
+    history.close()
+
+def test_rollups_rebuilt_on_open(tmp_path):
+    rng = random.Random(5)
+    path = str(tmp_path / "historique.db")
+    history = HistoryStore(path)
+    for i in range(40):
+        history.insert(history_row(i, rng))
+    expected = rollup_snapshot(history)
+    with history.conn:
+        history.conn.execute("DROP TABLE rollups")
+    history.close()
+    history = HistoryStore(path)
+    assert_same_rollups(rollup_snapshot(history), expected)
+    history.close()
+
+def test_fleet_snapshot_follows_the_adaptive_interval():
+    config = {"refresh_interval": 1000, "idle_interval": 5000}
+    collectors = {
+        "idle": idle_collector(config, 6),
+        "stale": idle_collector(config, 30),
+        "reconnecting": idle_collector(config, 1, reconnecting=True),
+    }
+    assert collectors["idle"].scheduler.mode == "ralenti"
+    fleet = FleetCollector(collectors, config)
+    try:
+        overview = fleet.snapshot()
+    finally:
+        fleet.pool.shutdown()
+    assert {host: state["online"] for host, state in overview.items()} == {
+        "idle": True, "stale": False, "reconnecting": False}
+
+def test_exporter_reports_ssh_health_without_new_samples():
+    config = {"refresh_interval": 1000}
+    health = {"latency_ms": 12.0, "errors": 0, "timeouts": 0}
+    collector = idle_collector(config, 0)
+    collector.ssh_manager = SimpleNamespace(health=lambda: dict(health))
+    collector.monitor.process(parse_stats_frame(EXEC_FRAME))
+    exporter = MetricsExporter({"recalbox": collector}, config)
+    first = scrape_values(exporter)
+    assert first["recalbox_up"] == 1
+    assert first["recalbox_ssh_errors_total"] == 0
+    assert first["recalbox_ssh_latency_seconds"] == pytest.approx(0.012)
+    assert exporter.render() is exporter.render()
+
+    version = collector.monitor.version
+    health.update(errors=7, timeouts=3, latency_ms=None)
+    collector.reconnecting = True
+    outage = scrape_values(exporter)
+    assert collector.monitor.version == version
+    assert outage["recalbox_up"] == 0
+    assert outage["recalbox_ssh_errors_total"] == 10
+    assert "recalbox_ssh_latency_seconds" not in outage
+    assert outage["recalbox_cpu_temperature_celsius"] == first["recalbox_cpu_temperature_celsius"]
+
+def test_scorer_refreshes_incrementally(tmp_path):
+    rng = random.Random(11)
+    history = HistoryStore(str(tmp_path / "historique.db"))
+    for i in range(30):
+        history.insert(history_row(i, rng))
+    scorer = SessionScorer(history)
+    ids, scores = scorer.refresh()
+    assert len(ids) == 30
+    assert np.all((scores >= 0) & (scores <= 100))
+    for i in range(30, 45):
+        history.insert(history_row(i, rng))
+    ids, scores = scorer.refresh()
+    full = SessionScorer(history).refresh()
+    assert np.array_equal(ids, full[0])
+    assert scores == pytest.approx(full[1])
+    lookup = scorer.lookup(np.array([ids[3], 10**6]))
+    assert lookup[0] == pytest.approx(scores[3])
+    assert np.isnan(lookup[1])
+    history.close()
+
+def test_scorer_invalidated_by_model_and_clear(tmp_path):
+    rng = random.Random(13)
+    history = HistoryStore(str(tmp_path / "historique.db"))
+    for i in range(20):
+        history.insert(history_row(i, rng))
+    scorer = SessionScorer(history)
+    default = scorer.refresh()[1].copy()
+    scorer.set_model({"avg_cpu": {"weight": 1.0, "best": 0, "worst": 100}, "unknown": {"weight": 1.0}})
+    assert scorer.fields == ["avg_cpu"]
+    columns = history.columns(["avg_cpu"])
+    assert scorer.refresh()[1] == pytest.approx(100.0 - columns["avg_cpu"])
+    assert not np.allclose(scorer.scores, default)
+
+    history.clear()
+    assert len(scorer.refresh()[0]) == 0
+    history.insert(history_row(0, rng))
+    ids, scores = scorer.refresh()
+    assert len(ids) == 1
+    assert scores[0] == pytest.approx(100.0 - history.columns(["avg_cpu"])["avg_cpu"][0])
+    history.close()
+
+def test_replay_is_deterministic():
+    entries = replay_entries(["pi-a", "pi-b"], 40)
+    players = [ReplayPlayer(entries, {}, speed=0) for _ in range(2)]
+    for player in players:
+        for entry in entries:
+            player.feed(entry)
+    assert players[0].played == len(entries)
+    assert replay_state(players[0]) == replay_state(players[1])
+    assert players[0].collectors["pi-a"].monitor.version == 40
+    assert players[0].collectors["pi-a"].latest()[1]["game"] == "aof3.zip"
+
+def test_replay_seek_back_matches_playing_forward():
+    entries = replay_entries(["pi-a", "pi-b"], 40)
+    player = ReplayPlayer(entries, {}, speed=0)
+    for entry in entries:
+        player.feed(entry)
+    middle = player.start_time + 15
+    player.seek(middle)
+    assert player.position == middle
+    assert player.index == 32
+    assert [stats for _, stats in player.collectors["pi-a"].samples] == [None]
+
+    forward = ReplayPlayer(entries, {}, speed=0)
+    for entry in entries[:32]:
+        forward.feed(entry)
+    assert replay_state(player) == replay_state(forward)